@@ -1,9 +1,18 @@
+from .batch import apply_drop_ins, apply_services
+from .coalesce import RestartCoalescer
+from .critical_chain import critical_chain
+from .enablement import disable_units, enable_units
 from .file_type import File, FileType
+from .graph import DependencyGraph
+from .impact import Impact
+from .resolver import UnitResolver
+from .rolling import RollingRestart
 from .sections import (
     Automount,
     Install,
     Mount,
     Path,
+    ResourceControl,
     Scope,
     ServiceSection,
     Slice,
@@ -14,16 +23,26 @@ from .sections import (
 )
 from .service import Service
 from .service_location import ServiceLocation
+from .slices import SliceTree
+from .template import TemplateService
 
 __all__ = [
     "Service",
     "ServiceLocation",
+    "TemplateService",
     "File",
     "FileType",
+    "Impact",
+    "DependencyGraph",
+    "UnitResolver",
+    "RollingRestart",
+    "RestartCoalescer",
+    "SliceTree",
     "Automount",
     "Install",
     "Mount",
     "Path",
+    "ResourceControl",
     "Scope",
     "ServiceSection",
     "Slice",
@@ -31,4 +50,9 @@ __all__ = [
     "Swap",
     "Timer",
     "Unit",
+    "apply_drop_ins",
+    "apply_services",
+    "critical_chain",
+    "disable_units",
+    "enable_units",
 ]
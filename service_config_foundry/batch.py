@@ -0,0 +1,72 @@
+from .impact import Impact
+from .utils import SYSTEMCTL_CHUNK_SIZE, chunks, run_command
+
+
+# Runs a systemctl verb over many units, chunked into batched calls.
+def systemctl(verb, units):
+    for chunk in chunks(units, SYSTEMCTL_CHUNK_SIZE):
+        run_command(f"systemctl {verb} {' '.join(chunk)}")
+
+
+# Applies the impacts of services that were already written, with as few
+# systemctl calls as possible: a single daemon-reload, then one batched call
+# each for the units that need a restart, a reload, a re-enable or an enable.
+# Each service only gets the actions its change requires, following its
+# `auto_start` and `enable_at_startup` settings. `written` maps service names
+# to (service, impacts) pairs. Units in `restart` and `reload` (e.g. template
+# instances with changed drop-ins) join the batched calls; a unit that is
+# restarted is not reloaded as well.
+# `daemon_reload=True` forces the daemon-reload, e.g. when other unit files
+# were written alongside the services.
+# Returns the impacts of every service, keyed by service name.
+def apply_impacts(written, daemon_reload=False, restart=(), reload=()):
+    if daemon_reload or any(impacts - {Impact.NONE} for _, impacts in written.values()):
+        run_command("systemctl daemon-reload")
+
+    restart, reload, reenable, enable = list(restart), list(reload), [], []
+    for service, impacts in written.values():
+        if service._auto_start:
+            if Impact.RESTART in impacts:
+                restart += service.restart_units()
+            elif Impact.RELOAD in impacts:
+                reload += service.reload_units()
+
+        if service._enable_at_startup:
+            if Impact.REENABLE in impacts:
+                reenable += service.startup_units()
+            else:
+                enable += service.startup_units()
+
+    restart = list(dict.fromkeys(restart))
+    reload = [unit for unit in dict.fromkeys(reload) if unit not in restart]
+    systemctl("restart", restart)
+    systemctl("reload-or-restart", reload)
+    systemctl("reenable", reenable)
+    systemctl("enable", enable)
+
+    return {name: impacts for name, (_, impacts) in written.items()}
+
+
+# Writes many services at once and applies the changes with `apply_impacts`,
+# so that all of them share a single daemon-reload and batched calls.
+# Returns the impacts of every service, keyed by service name.
+def apply_services(services, daemon_reload=False):
+    written = {service.name: (service, service.write()) for service in services}
+    return apply_impacts(written, daemon_reload)
+
+
+# Writes directives of many services as a named drop-in fragment of each unit
+# (e.g. `name.service.d/<drop_in>.conf`) and applies the changes with
+# `apply_impacts`. Unlike `apply_services`, the unit files and other drop-ins
+# are left untouched, so directives on disk that were never loaded into a
+# service object are kept. `drop_ins` is a list of (service, file) pairs.
+# Returns the impacts of every service, keyed by service name.
+def apply_drop_ins(drop_ins, drop_in="override", daemon_reload=False):
+    written = {}
+    for service, file in drop_ins:
+        _, impacts = written.get(service.name, (service, set()))
+        written[service.name] = (
+            service,
+            impacts | service.stage_drop_in(file, drop_in),
+        )
+    return apply_impacts(written, daemon_reload)
@@ -0,0 +1,279 @@
+import os
+import re
+
+from .batch import apply_drop_ins
+from .file_type import File, FileType
+from .numeric import np, require_numpy
+from .slices import slice_unit
+
+# Multipliers of the size suffixes systemd accepts (base 1024).
+SIZE_SUFFIXES = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+# Range systemd accepts for `CPUWeight=`; 100 is the default.
+CPU_WEIGHT_RANGE = (1, 10000)
+
+
+# Parses a systemd size (e.g. "512M", "2G" or a number of bytes) into bytes.
+def parse_size(size):
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)\s*", str(size).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(match.group(1)) * SIZE_SUFFIXES[match.group(2)])
+
+
+# Formats a number of bytes as a size in whole megabytes for systemd. Sizes are
+# rounded up, since "0M" would leave the unit no memory at all.
+def _megabytes(size):
+    return f"{max(-(-int(size) // SIZE_SUFFIXES['M']), 1)}M"
+
+
+# `HostCapacity` describes the CPUs and memory (in bytes) of a host shape.
+class HostCapacity:
+    def __init__(self, cpus, memory):
+        self.cpus = cpus
+        self.memory = parse_size(memory)
+
+    def __repr__(self):
+        return f"HostCapacity(cpus={self.cpus}, memory={self.memory})"
+
+
+# Reads the capacity of the host from `/proc/cpuinfo` and `/proc/meminfo`,
+# optionally below another `root` (e.g. a recorded fixture).
+def read_host_capacity(root="/"):
+    with open(os.path.join(root, "proc/cpuinfo")) as file:
+        cpus = sum(1 for line in file if line.startswith("processor"))
+
+    with open(os.path.join(root, "proc/meminfo")) as file:
+        for line in file:
+            if line.startswith("MemTotal:"):
+                memory = int(line.split()[1]) * SIZE_SUFFIXES["K"]
+                break
+        else:
+            raise ValueError("MemTotal not found in /proc/meminfo")
+
+    return HostCapacity(cpus, memory)
+
+
+# Computes CPU and memory budgets for many units on one or more host shapes.
+# Every unit first gets its minimum; the rest of the usable capacity (after
+# holding back `reserve` for the system) is shared in proportion to the
+# weights. All arithmetic is vectorized, with hosts along the first axis and
+# units along the second.
+# `groups` optionally splits the units into independent groups (e.g. the
+# members of different slices), numbered from 0: each group shares its own
+# capacity, and `cpus` and `memory` then have shape (hosts, groups).
+# Returns a dictionary of arrays of shape (hosts, units):
+# - CPUQuota: percent of one CPU (100 per core)
+# - CPUWeight: weights scaled so that the average unit of a group gets the
+#   default 100
+# - MemoryHigh: bytes, the unit's share of memory
+# - MemoryMax: bytes, MemoryHigh with `memory_headroom`, capped at the usable
+#   memory
+# and a boolean array "feasible" of shape (hosts,) that is False for hosts
+# whose capacity does not cover the minimums of every group.
+def plan_budgets(
+    weights,
+    cpus,
+    memory,
+    cpu_minimums=None,
+    memory_minimums=None,
+    reserve=0.1,
+    memory_headroom=1.25,
+    groups=None,
+):
+    require_numpy()
+    weights = np.asarray(weights, dtype=float)
+    if (weights <= 0).any():
+        raise ValueError("Weights must be positive")
+    groups = (
+        np.zeros(len(weights), dtype=np.int64) if groups is None else np.asarray(groups)
+    )
+    counts = np.bincount(groups)
+    group_weights = np.bincount(groups, weights)
+    shares = weights / group_weights[groups]
+    cpu_minimums = np.zeros_like(weights) if cpu_minimums is None else cpu_minimums
+    memory_minimums = (
+        np.zeros_like(weights) if memory_minimums is None else memory_minimums
+    )
+    cpu_minimums = np.asarray(cpu_minimums, dtype=float)
+    memory_minimums = np.asarray(memory_minimums, dtype=float)
+
+    # Capacities of shape (hosts, groups).
+    usable_cpus = np.reshape(np.asarray(cpus, dtype=float), (-1, len(counts)))
+    usable_memory = np.reshape(np.asarray(memory, dtype=float), (-1, len(counts)))
+    usable_cpus = usable_cpus * (1 - reserve)
+    usable_memory = usable_memory * (1 - reserve)
+    spare_cpus = usable_cpus - np.bincount(groups, cpu_minimums)
+    spare_memory = usable_memory - np.bincount(groups, memory_minimums)
+
+    cpu = cpu_minimums + np.maximum(spare_cpus, 0)[:, groups] * shares
+    memory_high = memory_minimums + np.maximum(spare_memory, 0)[:, groups] * shares
+    memory_max = np.minimum(memory_high * memory_headroom, usable_memory[:, groups])
+    mean_weights = (group_weights / counts)[groups]
+    cpu_weight = np.clip(np.rint(weights / mean_weights * 100), *CPU_WEIGHT_RANGE)
+
+    return {
+        "CPUQuota": np.maximum(np.floor(cpu * 100), 1).astype(np.int64),
+        "CPUWeight": np.broadcast_to(cpu_weight, cpu.shape).astype(np.int64),
+        "MemoryHigh": np.floor(memory_high).astype(np.int64),
+        "MemoryMax": np.floor(memory_max).astype(np.int64),
+        "feasible": ((spare_cpus >= 0) & (spare_memory >= 0)).all(axis=1),
+    }
+
+
+# `BudgetPlanner` collects services and slices with their weights and
+# minimums, plans their CPU and memory budgets for a host, and writes the
+# resulting `CPUQuota=`, `CPUWeight=`, `MemoryHigh=` and `MemoryMax=` in one
+# batched update.
+# The plan follows the slice tree: targets inside a planned slice (services
+# assigned to it or to one of its sub-slices, and nested slices) share that
+# slice's budget, and only the outermost targets share the host. Services must
+# be assigned to their slices before planning.
+class BudgetPlanner:
+    # Initializes the planner for a host. Without a `capacity`, the capacity
+    # of the running host is read when planning.
+    def __init__(self, capacity=None, reserve=0.1, memory_headroom=1.25):
+        self.capacity = capacity
+        self.reserve = reserve
+        self.memory_headroom = memory_headroom
+        # Services, or paths of slices in a `SliceTree`.
+        self._targets = []
+        self._weights = []
+        self._cpu_minimums = []
+        self._memory_minimums = []
+
+    # Adds a service, or the path of a slice (e.g. "prod/db"), to the plan.
+    # `cpu_minimum` is a number of CPUs and `memory_minimum` a size.
+    def add(self, target, weight=100, cpu_minimum=0, memory_minimum=0):
+        self._targets.append(target)
+        self._weights.append(weight)
+        self._cpu_minimums.append(cpu_minimum)
+        self._memory_minimums.append(parse_size(memory_minimum))
+
+    # Returns the index of the planned slice each target belongs to, or -1
+    # for targets directly below the host. A target belongs to the nearest
+    # planned slice among the slices containing it.
+    def __parents(self):
+        planned = {
+            slice_unit(target): index
+            for index, target in enumerate(self._targets)
+            if isinstance(target, str)
+        }
+        parents = []
+        for target in self._targets:
+            # Slice units are named after their path, so the slices containing
+            # a target are the prefixes of its slice's name.
+            if isinstance(target, str):
+                parts = slice_unit(target).rsplit(".", 1)[0].split("-")[:-1]
+            else:
+                unit = target.service_file.service.slice
+                parts = unit.rsplit(".", 1)[0].split("-") if unit else []
+            units = [
+                "-".join(parts[:depth]) + ".slice" for depth in range(1, 1 + len(parts))
+            ]
+            parents.append(
+                next((planned[unit] for unit in reversed(units) if unit in planned), -1)
+            )
+        return np.array(parents, dtype=np.int64)
+
+    # Plans the budgets for one or more host shapes, defaulting to the
+    # planner's host. See `plan_budgets` for the result. The targets below
+    # the host are planned against its capacity, less the reserve, and the
+    # members of a slice against the `CPUQuota=` and `MemoryHigh=` planned for
+    # it. Every depth of the slice tree is planned in one vectorized pass, with
+    # the members of each slice as a group. A host is only feasible if every
+    # slice covers the minimums of its members.
+    def plan(self, capacities=None):
+        require_numpy()
+        if capacities is None:
+            capacities = [self.capacity or read_host_capacity()]
+        weights = np.array(self._weights, dtype=float)
+        cpu_minimums = np.array(self._cpu_minimums, dtype=float)
+        memory_minimums = np.array(self._memory_minimums, dtype=float)
+
+        # The depth of every target below the host, found by following all
+        # parents one level per step.
+        parents = self.__parents()
+        depths = np.zeros(len(parents), dtype=np.int64)
+        ancestors = parents
+        while (ancestors >= 0).any():
+            depths += ancestors >= 0
+            ancestors = np.where(ancestors >= 0, parents[ancestors], -1)
+
+        shape = (len(capacities), len(self._targets))
+        plan = {
+            key: np.zeros(shape, dtype=np.int64)
+            for key in ("CPUQuota", "CPUWeight", "MemoryHigh", "MemoryMax")
+        }
+        plan["feasible"] = np.ones(len(capacities), dtype=bool)
+        host_cpus = np.array([[capacity.cpus] for capacity in capacities], dtype=float)
+        host_memory = np.array([[capacity.memory] for capacity in capacities])
+
+        # Parents are planned one depth before their members.
+        for depth in range(depths.max() + 1 if len(depths) else 0):
+            members = np.flatnonzero(depths == depth)
+            slices, groups = np.unique(parents[members], return_inverse=True)
+            if depth == 0:
+                cpus, memory, reserve = host_cpus, host_memory, self.reserve
+            else:
+                cpus = plan["CPUQuota"][:, slices] / 100
+                memory = plan["MemoryHigh"][:, slices]
+                reserve = 0
+
+            level = plan_budgets(
+                weights[members],
+                cpus,
+                memory,
+                cpu_minimums[members],
+                memory_minimums[members],
+                reserve,
+                self.memory_headroom,
+                groups,
+            )
+            for key in ("CPUQuota", "CPUWeight", "MemoryHigh", "MemoryMax"):
+                plan[key][:, members] = level[key]
+            plan["feasible"] &= level["feasible"]
+        return plan
+
+    # Returns the planned directives for every target on the planner's host,
+    # as attribute names of the resource-control sections.
+    def directives(self):
+        plan = self.plan()
+        if not plan["feasible"][0]:
+            raise ValueError("Minimums exceed the capacity of the host")
+
+        return [
+            (
+                target,
+                {
+                    "c_p_u_quota": f"{plan['CPUQuota'][0, index]}%",
+                    "c_p_u_weight": int(plan["CPUWeight"][0, index]),
+                    "memory_high": _megabytes(plan["MemoryHigh"][0, index]),
+                    "memory_max": _megabytes(plan["MemoryMax"][0, index]),
+                },
+            )
+            for index, target in enumerate(self._targets)
+        ]
+
+    # Applies the planned budgets as `budget` drop-ins of the services (and
+    # of the slices of `tree`), so that every other directive on disk is kept,
+    # with a single daemon-reload. The services and the tree are kept in sync
+    # with the drop-ins. Slice targets require the `SliceTree` they belong to.
+    # Returns the impacts of every service, keyed by service name.
+    def write(self, tree=None):
+        services, slices = [], {}
+        for target, directives in self.directives():
+            if isinstance(target, str):
+                if tree is None:
+                    raise ValueError(f"Slice {target} requires a SliceTree")
+                slices[target] = directives
+                continue
+
+            file = File(FileType.SERVICE)
+            for key, value in directives.items():
+                setattr(file.service, key, value)
+                setattr(target.service_file.service, key, value)
+            services.append((target, file))
+
+        changed = tree.write_drop_ins(slices, "budget") if slices else False
+        return apply_drop_ins(services, "budget", daemon_reload=changed)
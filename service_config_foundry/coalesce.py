@@ -0,0 +1,94 @@
+import threading
+
+from .batch import apply_impacts
+
+
+# `RestartCoalescer` collects the restarts, reloads and enables that written
+# services need, and applies them together once `window` seconds have passed
+# since the first pending request. Services writing several times within the
+# window are restarted once, and all pending services share a single
+# daemon-reload and batched systemctl calls (see `apply_impacts`).
+# Passed to `Service(coalescer=...)` or `TemplateService(coalescer=...)`, it
+# takes over the lifecycle actions of `create()`, `replace()`, `update()` and
+# `override_instances()`. Usable as a context manager that flushes on exit.
+class RestartCoalescer:
+    def __init__(self, window=2.0):
+        self.window = window
+        self._condition = threading.Condition()
+        # Service name -> (latest service object, union of pending impacts).
+        self._pending = {}
+        # Individual units to restart or reload, in submission order.
+        self._restart = {}
+        self._reload = {}
+        self._daemon_reload = False
+        # Number of flushes applying their actions right now.
+        self._flushing = 0
+        self._timer = None
+
+    # Starts the window unless it is already running. Called with the
+    # condition held.
+    def __start_window(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # Records the impacts of a written service, starting the window if
+    # nothing is pending yet.
+    def submit(self, service, impacts):
+        with self._condition:
+            _, pending = self._pending.get(service.name, (service, set()))
+            self._pending[service.name] = (service, pending | set(impacts))
+            self.__start_window()
+
+    # Records individual units to restart or reload, and whether unit files
+    # changed on disk, e.g. for per-instance drop-ins of a template.
+    def submit_units(self, restart=(), reload=(), daemon_reload=False):
+        with self._condition:
+            self._restart.update(dict.fromkeys(restart))
+            self._reload.update(dict.fromkeys(reload))
+            self._daemon_reload = self._daemon_reload or daemon_reload
+            self.__start_window()
+
+    # Returns the names of the services and units with pending actions.
+    def pending(self):
+        with self._condition:
+            return list(dict.fromkeys([*self._pending, *self._restart, *self._reload]))
+
+    # Applies all pending actions now. Returns the impacts of every service,
+    # keyed by service name.
+    def flush(self):
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            restart, self._restart = list(self._restart), {}
+            reload, self._reload = list(self._reload), {}
+            daemon_reload, self._daemon_reload = self._daemon_reload, False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not (pending or restart or reload or daemon_reload):
+                return {}
+            self._flushing += 1
+
+        try:
+            return apply_impacts(pending, daemon_reload, restart, reload)
+        finally:
+            with self._condition:
+                self._flushing -= 1
+                self._condition.notify_all()
+
+    # Waits until nothing is pending and every flush, including the one run
+    # when the window ends, has applied its actions. Returns False if
+    # `timeout` seconds passed first.
+    def wait(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._flushing and self._timer is None, timeout
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+        self.wait()
@@ -1,6 +1,9 @@
+import sys
 from collections import OrderedDict, defaultdict
 from configparser import ConfigParser
 
+from .utils import normalize_values
+
 
 class CaseSensitiveConfigParser(ConfigParser):
     def __init__(self, *args, **kwargs):
@@ -80,3 +83,33 @@ class CaseSensitiveConfigParser(ConfigParser):
                         value = str(value).lower()
                     fp.write(f"{key}={value}\n")
             fp.write("\n")
+
+
+# Reads a unit file into a dictionary of sections, mapping every directive to
+# the list of values assigned to it (in file order).
+def read_config(path):
+    config = CaseSensitiveConfigParser()
+    config.read(path)
+    return {
+        section: {key: list(values) for key, values in options.items()}
+        for section, options in config._sections.items()
+    }
+
+
+# Writes a configuration dictionary to a unit file. Directives holding a list
+# are written once per value.
+def write_config(path, config_dict):
+    try:
+        with open(path, "w") as f:
+            for section, options in config_dict.items():
+                f.write(f"[{section}]\n")
+                for key, values in options.items():
+                    for value in normalize_values(values):
+                        f.write(f"{key}={value}\n")
+                f.write("\n")
+    except PermissionError:
+        print(
+            f"Permission denied: cannot write to {path}. "
+            "Try running as root or using sudo."
+        )
+        sys.exit(1)
@@ -0,0 +1,118 @@
+from collections import defaultdict
+
+from .utils import run_command
+
+# Properties read from `systemctl show` to measure activation durations.
+TIMESTAMP_PROPERTIES = [
+    "Id",
+    "InactiveExitTimestampMonotonic",
+    "ActiveEnterTimestampMonotonic",
+]
+
+
+# Parses the output of `systemctl show -p Id,InactiveExitTimestampMonotonic,
+# ActiveEnterTimestampMonotonic <units>` into activation durations in seconds,
+# keyed by unit. Units that never finished activating are skipped.
+def durations_from_show(output):
+    durations = {}
+    for block in output.strip().split("\n\n"):
+        properties = dict(
+            line.split("=", 1) for line in block.splitlines() if "=" in line
+        )
+        unit = properties.get("Id")
+        started = int(properties.get("InactiveExitTimestampMonotonic") or 0)
+        active = int(properties.get("ActiveEnterTimestampMonotonic") or 0)
+        if unit and started and active >= started:
+            durations[unit] = (active - started) / 1_000_000
+    return durations
+
+
+# Measures the activation durations of units from their recorded timestamps
+# with a single `systemctl show` call.
+def measure_durations(units):
+    result = run_command(
+        f"systemctl show -p {','.join(TIMESTAMP_PROPERTIES)} {' '.join(units)}",
+        use_sudo=False,
+    )
+    return durations_from_show(result.stdout or "")
+
+
+# `CriticalChain` is the result of a critical-path analysis:
+# - path: The chain of units that bounds the time until the target is reached.
+# - duration: Time in seconds until the target is reached.
+# - earliest_start / earliest_finish: Per unit, the earliest time it can start
+#   and finish when every unit starts as soon as its predecessors finished.
+# - slack: Per unit, how long it could be delayed without delaying the target.
+#   Units on the critical path have no slack.
+class CriticalChain:
+    def __init__(self, path, duration, earliest_start, earliest_finish, slack):
+        self.path = path
+        self.duration = duration
+        self.earliest_start = earliest_start
+        self.earliest_finish = earliest_finish
+        self.slack = slack
+
+
+# Computes the critical chain towards `target` from a dependency graph and
+# per-unit activation durations in seconds (measured, recorded or supplied).
+# Units without a duration, such as targets, take no time. Only units the
+# target transitively waits for are considered.
+def critical_chain(graph, durations, target="multi-user.target"):
+    if target not in graph.nodes():
+        raise ValueError(f"{target} is not part of the dependency graph")
+
+    # Reverse the ordering edges once, so that looking up the predecessors of
+    # a unit does not scan the whole graph.
+    waited_for = defaultdict(list)
+    for unit in graph.nodes():
+        for successor in graph.successors(unit):
+            waited_for[successor].append(unit)
+
+    # Collect the units the target waits for, directly or transitively.
+    predecessors = {}
+    pending = [target]
+    while pending:
+        unit = pending.pop()
+        if unit in predecessors:
+            continue
+        predecessors[unit] = waited_for[unit]
+        pending.extend(predecessors[unit])
+
+    order = [
+        unit
+        for layer in graph.layers(managed_only=False)
+        for unit in layer
+        if unit in predecessors
+    ]
+
+    # Forward pass: earliest start and finish times.
+    earliest_start, earliest_finish = {}, {}
+    for unit in order:
+        earliest_start[unit] = max(
+            (earliest_finish[p] for p in predecessors[unit]), default=0.0
+        )
+        earliest_finish[unit] = earliest_start[unit] + durations.get(unit, 0.0)
+
+    # Backward pass: latest finish times that do not delay the target.
+    latest_finish = {target: earliest_finish[target]}
+    for unit in reversed(order):
+        latest_start = latest_finish[unit] - durations.get(unit, 0.0)
+        for predecessor in predecessors[unit]:
+            latest_finish[predecessor] = min(
+                latest_finish.get(predecessor, latest_start), latest_start
+            )
+
+    slack = {
+        unit: latest_finish[unit] - earliest_finish[unit] for unit in earliest_start
+    }
+
+    # Walk back from the target along the predecessors that finish last.
+    path = [target]
+    while predecessors[path[0]]:
+        path.insert(
+            0, max(predecessors[path[0]], key=lambda unit: earliest_finish[unit])
+        )
+
+    return CriticalChain(
+        path, earliest_finish[target], earliest_start, earliest_finish, slack
+    )
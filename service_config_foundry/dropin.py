@@ -0,0 +1,207 @@
+import os
+import sys
+
+from .config_parser import read_config, write_config
+
+# Resource-control directives that accept a list of values, shared by the
+# [Service], [Slice] and [Scope] sections.
+RESOURCE_CONTROL_LIST_DIRECTIVES = {
+    "IODeviceWeight",
+    "IOReadBandwidthMax",
+    "IOWriteBandwidthMax",
+    "IOReadIOPSMax",
+    "IOWriteIOPSMax",
+    "IODeviceLatencyTargetSec",
+    "IPAddressAllow",
+    "IPAddressDeny",
+    "SocketBindAllow",
+    "SocketBindDeny",
+    "DeviceAllow",
+    "DisableControllers",
+}
+
+# Directives that accept a list of values. Assignments to them accumulate
+# across the unit file and its drop-ins, and an empty assignment resets the
+# list. Every other directive is a single value that the last assignment wins.
+LIST_DIRECTIVES = {
+    "Unit": {
+        "Documentation",
+        "Requires",
+        "Requisite",
+        "Wants",
+        "BindsTo",
+        "PartOf",
+        "Upholds",
+        "Conflicts",
+        "Before",
+        "After",
+        "OnFailure",
+        "OnSuccess",
+    },
+    "Install": {"WantedBy", "RequiredBy", "Alias", "Also"},
+    "Service": {
+        "ExecCondition",
+        "ExecStart",
+        "ExecStartPre",
+        "ExecStartPost",
+        "ExecReload",
+        "ExecStop",
+        "ExecStopPost",
+        "Environment",
+        "EnvironmentFile",
+        "SuccessExitStatus",
+        "RestartPreventExitStatus",
+        "RestartForceExitStatus",
+        "Sockets",
+        "OpenFile",
+        "CPUAffinity",
+    }
+    | RESOURCE_CONTROL_LIST_DIRECTIVES,
+    "Slice": RESOURCE_CONTROL_LIST_DIRECTIVES,
+    "Scope": RESOURCE_CONTROL_LIST_DIRECTIVES,
+    "Socket": {
+        "ListenStream",
+        "ListenDatagram",
+        "ListenSequentialPacket",
+        "ListenFIFO",
+    },
+    "Timer": {
+        "OnActiveSec",
+        "OnBootSec",
+        "OnStartupSec",
+        "OnUnitActiveSec",
+        "OnUnitInactiveSec",
+        "OnCalendar",
+    },
+}
+
+
+# Checks if a directive accepts a list of values. Conditions and assertions
+# always do.
+def is_list_directive(section, key):
+    if section == "Unit" and key.startswith(("Condition", "Assert")):
+        return True
+    return key in LIST_DIRECTIVES.get(section, ())
+
+
+# Returns the drop-in directory of a unit.
+# Example: "worker@1.service" -> "<directory>/worker@1.service.d"
+def drop_in_directory(directory, unit):
+    return os.path.join(directory, f"{unit}.d")
+
+
+# Returns the path of a named drop-in fragment of a unit.
+# Example: "worker@1.service", "override" ->
+# "<directory>/worker@1.service.d/override.conf"
+def drop_in_path(directory, unit, name):
+    return os.path.join(drop_in_directory(directory, unit), f"{name}.conf")
+
+
+# Prepends an empty assignment to every list directive in a configuration so
+# that the drop-in replaces the list instead of appending to it.
+def reset_lists(config_dict):
+    reset = {}
+    for section, options in config_dict.items():
+        reset[section] = {}
+        for key, values in options.items():
+            if is_list_directive(section, key):
+                values = values if isinstance(values, list) else [values]
+                if not values or values[0] != "":
+                    values = [""] + values
+            reset[section][key] = values
+    return reset
+
+
+# Writes a drop-in fragment for a unit, creating its drop-in directory. With
+# `replace_lists=True` list directives replace the values of the unit file
+# instead of extending them.
+# Returns the path of the fragment.
+def write_drop_in(directory, unit, config_dict, name="override", replace_lists=False):
+    path = drop_in_path(directory, unit, name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    except PermissionError:
+        print(
+            f"Permission denied: cannot write to {path}. "
+            "Try running as root or using sudo."
+        )
+        sys.exit(1)
+
+    if replace_lists:
+        config_dict = reset_lists(config_dict)
+
+    write_config(path, config_dict)
+    return path
+
+
+# Removes a named drop-in fragment of a unit, and the drop-in directory once it
+# is empty. Returns whether the fragment existed.
+def remove_drop_in(directory, unit, name="override"):
+    path = drop_in_path(directory, unit, name)
+    if not os.path.isfile(path):
+        return False
+
+    try:
+        os.remove(path)
+        if not os.listdir(os.path.dirname(path)):
+            os.rmdir(os.path.dirname(path))
+    except PermissionError:
+        print(
+            f"Permission denied: cannot write to {path}. "
+            "Try running as root or using sudo."
+        )
+        sys.exit(1)
+    return True
+
+
+# Returns the drop-in fragments of a unit as a list of (name, config) pairs,
+# in the order systemd applies them (sorted by file name).
+def read_drop_ins(directory, unit):
+    drop_in_dir = drop_in_directory(directory, unit)
+    if not os.path.isdir(drop_in_dir):
+        return []
+
+    return [
+        (file[: -len(".conf")], read_config(os.path.join(drop_in_dir, file)))
+        for file in sorted(os.listdir(drop_in_dir))
+        if file.endswith(".conf")
+    ]
+
+
+# Applies a drop-in fragment on top of a configuration and returns the result
+# without modifying either. List directives accumulate and are reset by an
+# empty assignment; single-value directives take the last assignment, and an
+# empty one removes the directive.
+def merge_drop_in(config, fragment):
+    merged = {
+        section: {key: list(values) for key, values in options.items()}
+        for section, options in config.items()
+    }
+    for section, options in fragment.items():
+        merged_options = merged.setdefault(section, {})
+        for key, values in options.items():
+            if is_list_directive(section, key):
+                current = merged_options.get(key, [])
+                for value in values:
+                    if value == "":
+                        current = []
+                    else:
+                        current.append(value)
+            else:
+                current = values[-1:] if values and values[-1] != "" else []
+
+            if current:
+                merged_options[key] = current
+            else:
+                merged_options.pop(key, None)
+    return merged
+
+
+# Returns the effective configuration of a unit: its unit file with every
+# drop-in fragment applied in order.
+def effective_config(directory, unit):
+    path = os.path.join(directory, unit)
+    config = read_config(path) if os.path.isfile(path) else {}
+    for _, fragment in read_drop_ins(directory, unit):
+        config = merge_drop_in(config, fragment)
+    return config
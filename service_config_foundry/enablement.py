@@ -0,0 +1,224 @@
+import os
+import re
+import sys
+
+from .config_parser import read_config
+from .service_location import ServiceLocation
+from .utils import run_command
+
+# Maps the [Install] directives that pull a unit into another unit to the
+# suffix of the directory the symlink is placed in.
+DEPENDENCY_DIRECTORIES = {
+    "WantedBy": ".wants",
+    "RequiredBy": ".requires",
+}
+
+
+# Returns the unit name with a `.service` suffix when no type is given.
+# Example: "example" -> "example.service"
+def unit_file_name(name):
+    return name if "." in name else f"{name}.service"
+
+
+# Returns the directory a location maps to, prefixed with `root` when the
+# units are managed offline (e.g. inside an image build root).
+def location_directory(service_location, root=None):
+    directory = os.path.expanduser(service_location.directory())
+    if not root or root == "/":
+        return directory
+    return os.path.join(root, directory.lstrip("/"))
+
+
+# Returns the directories searched for unit files, in order of precedence.
+# Units enabled in the administrator location may be provided by packages or
+# generated at runtime, so those locations are searched as well.
+def _search_directories(service_location, root):
+    locations = [service_location]
+    if service_location == ServiceLocation.GLOBAL:
+        locations += [ServiceLocation.RUNTIME, ServiceLocation.DEFAULT]
+    return [location_directory(location, root) for location in locations]
+
+
+# Finds the file backing a unit. Instances of a template unit
+# (e.g. `worker@1.service`) are backed by the template (`worker@.service`).
+def _find_unit_file(unit, directories):
+    candidates = [unit]
+    prefix, at, rest = unit.partition("@")
+    if at and not rest.startswith("."):
+        candidates.append(f"{prefix}@.{rest.rpartition('.')[2]}")
+
+    for candidate in candidates:
+        for directory in directories:
+            path = os.path.join(directory, candidate)
+            if os.path.isfile(path):
+                return path
+
+    raise ValueError(f"Unit file for {unit} not found")
+
+
+# Returns the symlink target for a unit file, as seen from inside `root`.
+def _link_target(path, root):
+    if not root or root == "/":
+        return os.path.abspath(path)
+    return "/" + os.path.relpath(path, root)
+
+
+# Reverses the escaping of systemd unit names: `-` stands for `/` and
+# `\xNN` for an escaped character.
+# Example: "var-lib\x2dapp" -> "var/lib-app"
+def _unescape(name):
+    return re.sub(
+        r"\\x([0-9a-fA-F]{2})",
+        lambda match: chr(int(match.group(1), 16)),
+        name.replace("-", "/"),
+    )
+
+
+# Expands the unit name specifiers systemd allows in [Install] values for
+# `unit`: `%n`, `%N`, `%p`, `%P`, `%i`, `%I` and `%%`. Other specifiers are
+# left as they are.
+# Example: ("getty@%i.service", "serial@ttyS0.service") -> "getty@ttyS0.service"
+def _expand_specifiers(value, unit):
+    name = unit.rpartition(".")[0]
+    prefix, at, instance = name.partition("@")
+    specifiers = {
+        "n": unit,
+        "N": _unescape(name),
+        "p": prefix,
+        "P": _unescape(prefix),
+        "i": instance,
+        "I": _unescape(instance),
+        "%": "%",
+    }
+    return re.sub(
+        r"%(.)",
+        lambda match: specifiers.get(match.group(1), match.group(0)),
+        value,
+    )
+
+
+# Returns the link paths the [Install] section of a unit asks for, and the
+# units named in `Also=`, with specifiers expanded for the unit. A bare
+# template (e.g. `worker@.service`) is linked under its `DefaultInstance=`,
+# and not at all without one.
+def _install_links(unit, install, directory):
+    prefix, at, rest = unit.partition("@")
+    if at and rest.startswith("."):
+        default_instance = install.get("DefaultInstance")
+        if not default_instance:
+            return [], []
+        unit = f"{prefix}@{default_instance[-1]}{rest}"
+
+    def names(directive):
+        return [
+            name
+            for value in install.get(directive, [])
+            for name in _expand_specifiers(value, unit).split()
+        ]
+
+    links = []
+    for directive, suffix in DEPENDENCY_DIRECTORIES.items():
+        for target in names(directive):
+            links.append(os.path.join(directory, f"{target}{suffix}", unit))
+
+    for alias in names("Alias"):
+        links.append(os.path.join(directory, alias))
+
+    return links, names("Also")
+
+
+# Yields the link paths and symlink targets for all requested units, following
+# `Also=` to the units that must be enabled or disabled together.
+def _walk_units(units, service_location, root):
+    directories = _search_directories(service_location, root)
+    directory = directories[0]
+    pending = [unit_file_name(unit) for unit in units]
+    visited = set()
+    while pending:
+        unit = pending.pop()
+        if unit in visited:
+            continue
+        visited.add(unit)
+
+        path = _find_unit_file(unit, directories)
+        install = read_config(path).get("Install", {})
+        links, also = _install_links(unit, install, directory)
+        target = _link_target(path, root)
+        for link in links:
+            yield link, target
+        pending.extend(unit_file_name(name) for name in also)
+
+
+# Enables units natively by creating the symlinks their [Install] sections
+# describe, instead of running `systemctl enable` once per unit. A single
+# daemon-reload is issued at the end when operating on the live system; with
+# an offline `root` no systemd is contacted at all.
+# Like `systemctl enable`, a link path that is taken by a link to another unit
+# raises a ValueError, and one taken by a regular file is skipped with a
+# message. With `force=True` both are replaced, like `systemctl enable --force`.
+# Returns the list of symlinks that were created.
+def enable_units(
+    units, service_location=ServiceLocation.GLOBAL, root=None, force=False
+):
+    created = []
+    for link, target in _walk_units(units, service_location, root):
+        if os.path.islink(link):
+            if os.readlink(link) == target:
+                continue
+            if not force:
+                raise ValueError(f"{link} already links to {os.readlink(link)}")
+        elif os.path.lexists(link):
+            if _link_target(link, root) == target:
+                continue
+            if not force:
+                print(f"{link} already exists and is not a symlink, skipping.")
+                continue
+
+        try:
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            if os.path.lexists(link):
+                # Replace the file atomically, so the link never disappears.
+                temporary = f"{link}.tmp"
+                if os.path.lexists(temporary):
+                    os.remove(temporary)
+                os.symlink(target, temporary)
+                os.replace(temporary, link)
+            else:
+                os.symlink(target, link)
+        except PermissionError:
+            print(
+                f"Permission denied: cannot write to {link}. "
+                "Try running as root or using sudo."
+            )
+            sys.exit(1)
+        created.append(link)
+
+    if created and (not root or root == "/"):
+        run_command("systemctl daemon-reload")
+
+    return created
+
+
+# Disables units natively by removing the symlinks their [Install] sections
+# describe. Mirrors `enable_units`, including the single daemon-reload.
+# Returns the list of symlinks that were removed.
+def disable_units(units, service_location=ServiceLocation.GLOBAL, root=None):
+    removed = []
+    for link, _ in _walk_units(units, service_location, root):
+        if not os.path.islink(link):
+            continue
+
+        try:
+            os.remove(link)
+        except PermissionError:
+            print(
+                f"Permission denied: cannot write to {link}. "
+                "Try running as root or using sudo."
+            )
+            sys.exit(1)
+        removed.append(link)
+
+    if removed and (not root or root == "/"):
+        run_command("systemctl daemon-reload")
+
+    return removed
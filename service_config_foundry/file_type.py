@@ -5,7 +5,9 @@ from .sections import (
     Install,
     Mount,
     Path,
+    Scope,
     ServiceSection,
+    Slice,
     Socket,
     Swap,
     Timer,
@@ -107,7 +109,7 @@ class FileType(enum.Enum):
         elif self == FileType.SLICE:
             return section in ["Unit", "Slice"]
         elif self == FileType.SCOPE:
-            return section in ["Unit"]
+            return section in ["Unit", "Scope"]
 
     # Checks if the required sections are present in the provided
     # configuration dictionary.
@@ -135,6 +137,8 @@ class File:
         self._swap = None
         self._path = None
         self._timer = None
+        self._slice = None
+        self._scope = None
 
     # Creates a configuration parser from the object's attributes and
     # validates the requirements if specified.
@@ -151,6 +155,8 @@ class File:
             "_swap",
             "_path",
             "_timer",
+            "_slice",
+            "_scope",
         ]
         for section, unit in self.__dict__.items():
             if section in whitelist and unit:
@@ -256,3 +262,21 @@ class File:
 
         self._timer = self._timer or Timer()
         return self._timer
+
+    # Lazy-loaded property that provides access to the `Slice` section.
+    @property
+    def slice(self):
+        if not self._file_type.is_allowed("Slice"):
+            raise ValueError(f"Slice is not allowed in {self} file")
+
+        self._slice = self._slice or Slice()
+        return self._slice
+
+    # Lazy-loaded property that provides access to the `Scope` section.
+    @property
+    def scope(self):
+        if not self._file_type.is_allowed("Scope"):
+            raise ValueError(f"Scope is not allowed in {self} file")
+
+        self._scope = self._scope or Scope()
+        return self._scope
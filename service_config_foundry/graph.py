@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+from .utils import normalize_values, run_command
+
+# [Unit] directives that pull other units in. They do not order anything on
+# their own: systemd starts required units in parallel unless an ordering
+# directive says otherwise.
+REQUIREMENT_DIRECTIVES = ["Requires", "Wants", "BindsTo"]
+
+
+# Splits the values of a directive into unit names. Values may hold several
+# space-separated units and may be assigned several times.
+def _unit_names(values):
+    return [name for value in normalize_values(values) for name in value.split()]
+
+
+# `DependencyGraph` is built from the [Unit], [Install], [Socket] and [Timer]
+# sections of a set of services. Ordering edges point from the unit that has
+# to be started first to the unit that waits for it. They come from:
+# - `After=`/`Before=`.
+# - `WantedBy=`/`RequiredBy=`, since targets are implicitly ordered after the
+#   units they pull in.
+# - `Socket.Service=` and `Timer.Unit=` (or the unit of the same name), since
+#   sockets and timers are implicitly ordered before the unit they activate.
+# Requirement edges (`Requires=`, `Wants=`, `BindsTo=`) are recorded
+# separately. Units that are referenced but not managed (e.g.
+# `network.target`) are part of the graph so that ordering through them is
+# preserved, but they are never started.
+class DependencyGraph:
+    def __init__(self):
+        self._ordering = defaultdict(set)
+        self._requirements = defaultdict(set)
+        self._nodes = set()
+        self._managed = set()
+        # Units activated by a managed timer; they are started by their timer.
+        self._triggered = set()
+
+    # Builds a graph from a list of services.
+    @classmethod
+    def from_services(cls, services):
+        graph = cls()
+        for service in services:
+            graph.add_service(service)
+        return graph
+
+    # Adds an ordering edge: `first` has to be started before `then`.
+    def add_ordering(self, first, then):
+        self._nodes.update((first, then))
+        self._ordering[first].add(then)
+
+    # Adds a requirement edge: `unit` pulls in `dependency`.
+    def add_requirement(self, unit, dependency):
+        self._nodes.update((unit, dependency))
+        self._requirements[unit].add(dependency)
+
+    # Adds all units configured on a service.
+    def add_service(self, service):
+        for unit, config in service.unit_configs().items():
+            self.add_unit(unit, config)
+
+    # Adds a single unit from its configuration dictionary.
+    def add_unit(self, unit, config):
+        self._nodes.add(unit)
+        self._managed.add(unit)
+        name, _, unit_type = unit.rpartition(".")
+
+        unit_section = config.get("Unit", {})
+        for directive in REQUIREMENT_DIRECTIVES:
+            for dependency in _unit_names(unit_section.get(directive)):
+                self.add_requirement(unit, dependency)
+        for dependency in _unit_names(unit_section.get("After")):
+            self.add_ordering(dependency, unit)
+        for dependent in _unit_names(unit_section.get("Before")):
+            self.add_ordering(unit, dependent)
+
+        install_section = config.get("Install", {})
+        for directive in ("WantedBy", "RequiredBy"):
+            for target in _unit_names(install_section.get(directive)):
+                self.add_requirement(target, unit)
+                self.add_ordering(unit, target)
+
+        if unit_type == "socket":
+            activated = _unit_names(config.get("Socket", {}).get("Service"))
+            for service in activated or [f"{name}.service"]:
+                self.add_ordering(unit, service)
+        elif unit_type == "timer":
+            activated = _unit_names(config.get("Timer", {}).get("Unit"))
+            for service in activated or [f"{name}.service"]:
+                self.add_ordering(unit, service)
+                self._triggered.add(service)
+
+    # Returns all units in the graph.
+    def nodes(self):
+        return sorted(self._nodes)
+
+    # Returns the units that have to be started before a unit.
+    def predecessors(self, unit):
+        return sorted(first for first, thens in self._ordering.items() if unit in thens)
+
+    # Returns the units that wait for a unit to be started.
+    def successors(self, unit):
+        return sorted(self._ordering.get(unit, ()))
+
+    # Returns the units a unit pulls in.
+    def requirements(self, unit):
+        return sorted(self._requirements.get(unit, ()))
+
+    # Returns a list of units forming an ordering cycle, or None if the
+    # ordering is acyclic. The first unit is repeated at the end.
+    def find_cycle(self):
+        # Iterative depth-first search, coloring nodes as unvisited (absent),
+        # on the current path (1) or finished (2).
+        state = {}
+        for start in sorted(self._nodes):
+            if start in state:
+                continue
+            path = [start]
+            stack = [iter(sorted(self._ordering.get(start, ())))]
+            state[start] = 1
+            while stack:
+                following = next(stack[-1], None)
+                if following is None:
+                    state[path.pop()] = 2
+                    stack.pop()
+                elif state.get(following) == 1:
+                    return path[path.index(following) :] + [following]
+                elif following not in state:
+                    state[following] = 1
+                    path.append(following)
+                    stack.append(iter(sorted(self._ordering.get(following, ()))))
+        return None
+
+    # Raises a ValueError describing the first ordering cycle, if any.
+    def check_cycles(self):
+        cycle = self.find_cycle()
+        if cycle:
+            raise ValueError(f"Ordering cycle detected: {' -> '.join(cycle)}")
+
+    # Returns the units grouped into layers: every unit only waits for units
+    # in earlier layers, so the units of a layer can be started in parallel.
+    # By default only managed units are returned (layers that would only hold
+    # unmanaged units are dropped, the ordering through them is kept).
+    def layers(self, managed_only=True):
+        self.check_cycles()
+
+        in_degree = {node: 0 for node in self._nodes}
+        for thens in self._ordering.values():
+            for then in thens:
+                in_degree[then] += 1
+
+        layers = []
+        current = sorted(node for node, degree in in_degree.items() if not degree)
+        while current:
+            layers.append(current)
+            following = set()
+            for node in current:
+                for then in self._ordering.get(node, ()):
+                    in_degree[then] -= 1
+                    if not in_degree[then]:
+                        following.add(then)
+            current = sorted(following)
+
+        if managed_only:
+            layers = [[u for u in layer if u in self._managed] for layer in layers]
+            layers = [layer for layer in layers if layer]
+        return layers
+
+    # Starts (or restarts) all managed units layer by layer. Each layer is a
+    # single systemctl call, which starts its units in parallel and returns
+    # once their jobs finished, so every layer waits for the previous one.
+    # Units activated by a managed timer are left to their timer, matching
+    # `Service.start_service`.
+    def start(self, restart=True):
+        verb = "restart" if restart else "start"
+        for layer in self.layers():
+            units = [unit for unit in layer if unit not in self._triggered]
+            if units:
+                run_command(f"systemctl {verb} {' '.join(units)}")
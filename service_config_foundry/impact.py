@@ -0,0 +1,100 @@
+import enum
+
+from .sections import ResourceControl
+from .utils import convert_to_camel_case, normalize_values
+
+
+# `Impact` describes what has to happen for a configuration change to take
+# effect on a live system. Values are ordered from cheapest to most disruptive.
+class Impact(enum.IntEnum):
+    # Enumeration values for the different impacts:
+    # - NONE: Nothing changed, so nothing needs to happen at runtime.
+    # - DAEMON_RELOAD: systemd has to re-read the unit file. The running
+    #   process keeps running and picks the change up on its next transition.
+    # - RELOAD: The running process has to reload via its `ExecReload` command.
+    # - REENABLE: The [Install] symlinks have to be recreated.
+    # - RESTART: The unit has to be restarted.
+    NONE, DAEMON_RELOAD, RELOAD, REENABLE, RESTART = range(5)
+
+
+# Resource-control directives. systemd applies them to the cgroup of a running
+# unit on daemon-reload, except for delegation, which changes the cgroup layout.
+RESOURCE_CONTROL_DIRECTIVES = {
+    convert_to_camel_case(key) for key in vars(ResourceControl())
+} - {"Delegate", "DisableControllers"}
+
+# Impact of changing a directive, keyed by section and then by directive name.
+# Directives that are missing from a section fall back to the section default
+# in `SECTION_IMPACT`.
+DIRECTIVE_IMPACT = {
+    "Service": {
+        **dict.fromkeys(RESOURCE_CONTROL_DIRECTIVES, Impact.DAEMON_RELOAD),
+        # These only govern how systemd supervises, stops or reloads the
+        # process, so a daemon-reload is enough for the running instance.
+        "ExecReload": Impact.DAEMON_RELOAD,
+        "ExecStop": Impact.DAEMON_RELOAD,
+        "ExecStopPost": Impact.DAEMON_RELOAD,
+        "Restart": Impact.DAEMON_RELOAD,
+        "RestartMode": Impact.DAEMON_RELOAD,
+        "RestartSec": Impact.DAEMON_RELOAD,
+        "RestartSteps": Impact.DAEMON_RELOAD,
+        "RestartMaxDelaySec": Impact.DAEMON_RELOAD,
+        "RestartPreventExitStatus": Impact.DAEMON_RELOAD,
+        "RestartForceExitStatus": Impact.DAEMON_RELOAD,
+        "SuccessExitStatus": Impact.DAEMON_RELOAD,
+        "TimeoutStopSec": Impact.DAEMON_RELOAD,
+        "TimeoutAbortSec": Impact.DAEMON_RELOAD,
+        "TimeoutStartFailureMode": Impact.DAEMON_RELOAD,
+        "RuntimeMaxSec": Impact.DAEMON_RELOAD,
+        "RuntimeRandomizedExtraSec": Impact.DAEMON_RELOAD,
+        "OOMPolicy": Impact.DAEMON_RELOAD,
+        # The file the process re-reads when it is told to reload.
+        "ReloadFile": Impact.RELOAD,
+    },
+    "Scope": dict.fromkeys(RESOURCE_CONTROL_DIRECTIVES, Impact.DAEMON_RELOAD),
+}
+
+# Default impact of changing any directive in a section.
+SECTION_IMPACT = {
+    # Dependencies, ordering, conditions and metadata are only evaluated on
+    # the next state transition.
+    "Unit": Impact.DAEMON_RELOAD,
+    # [Install] is only read by `systemctl enable`.
+    "Install": Impact.REENABLE,
+    # Slices hold no processes of their own; the new limits reach the units
+    # inside them on daemon-reload.
+    "Slice": Impact.DAEMON_RELOAD,
+}
+
+
+# Returns the impact of changing a single directive in a section.
+def classify_directive(section, key):
+    impact = DIRECTIVE_IMPACT.get(section, {}).get(key)
+    if impact is not None:
+        return impact
+
+    return SECTION_IMPACT.get(section, Impact.RESTART)
+
+
+# Compares two configuration dictionaries of the same file and returns the set
+# of impacts needed for the new one to take effect. A `previous` of `None`
+# means the file is new, and a `current` of `None` means the file was removed;
+# both require a restart.
+def classify_changes(previous, current):
+    if previous is None and current is None:
+        return set()
+
+    if previous is None or current is None:
+        return {Impact.RESTART}
+
+    impacts = set()
+    for section in set(previous).union(current):
+        previous_options = previous.get(section, {})
+        current_options = current.get(section, {})
+        for key in set(previous_options).union(current_options):
+            if normalize_values(previous_options.get(key)) != normalize_values(
+                current_options.get(key)
+            ):
+                impacts.add(classify_directive(section, key))
+
+    return impacts
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import tempfile
+
+
+# Builds the journalctl command that prints the entries of `units` as JSON,
+# one entry per line. Arguments are passed without a shell, since cursors
+# contain characters such as ";" and "=".
+# - `cursor`: only entries after this cursor (`--after-cursor`)
+# - `since`: only entries since this time (e.g. "-1h" or "2024-01-01")
+# - `lines`: only the last `lines` entries
+# - `follow`: keep waiting for new entries
+def journal_command(
+    units, cursor=None, since=None, lines=None, follow=False, use_sudo=False
+):
+    command = ["sudo"] if use_sudo else []
+    command += ["journalctl", "--output=json", "--no-pager"]
+    for unit in units:
+        command += ["--unit", unit]
+    if cursor:
+        command += ["--after-cursor", cursor]
+    if since:
+        command += ["--since", since]
+    if lines is not None:
+        command += ["--lines", str(lines)]
+    if follow:
+        command.append("--follow")
+    return command
+
+
+# Decodes a journal field. journalctl prints fields that are not valid UTF-8
+# text as arrays of byte values.
+def _decode_field(value):
+    if isinstance(value, list) and all(isinstance(byte, int) for byte in value):
+        return bytes(value).decode(errors="replace")
+    return value
+
+
+# Streams the journal entries of one or more units from a single journalctl
+# process. Entries are parsed and yielded one line at a time, so memory stays
+# bounded however long the history is. Every entry is a dictionary of journal
+# fields; its `__CURSOR` can be stored and passed back as `cursor` to resume
+# after it. See `journal_command` for the options.
+# Raises a RuntimeError with journalctl's error output when it fails (e.g. for
+# an invalid cursor or missing permissions), so that a failure is not mistaken
+# for the absence of new entries. The journalctl process is terminated when
+# the generator is closed.
+def journal_entries(units, **options):
+    # Errors go to a file rather than a pipe, so a chatty journalctl cannot
+    # block on a full pipe while the entries are being read.
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        process = subprocess.Popen(
+            journal_command(units, **options),
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+        )
+        try:
+            for line in process.stdout:
+                if line.strip():
+                    entry = json.loads(line)
+                    yield {key: _decode_field(value) for key, value in entry.items()}
+            # The output ended, so let journalctl exit on its own.
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.terminate()
+            process.stdout.close()
+            process.wait()
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(
+                f"journalctl failed with exit status {process.returncode}: "
+                f"{stderr.read().strip()}"
+            )
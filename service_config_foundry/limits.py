@@ -0,0 +1,125 @@
+import math
+import os
+
+from .batch import apply_drop_ins
+from .budget import parse_size, read_host_capacity
+from .file_type import File, FileType
+
+
+# Reads an integer from a file below `root`.
+def _read_int(root, path):
+    with open(os.path.join(root, path)) as file:
+        return int(file.read().split()[0])
+
+
+# `LimitCapacity` describes the kernel-wide limits and memory of a host that
+# bound the per-service process limits.
+class LimitCapacity:
+    def __init__(self, file_max, nr_open, threads_max, memory):
+        self.file_max = file_max
+        self.nr_open = nr_open
+        self.threads_max = threads_max
+        self.memory = parse_size(memory)
+
+    def __repr__(self):
+        return (
+            f"LimitCapacity(file_max={self.file_max}, nr_open={self.nr_open}, "
+            f"threads_max={self.threads_max}, memory={self.memory})"
+        )
+
+    # Reads the capacity from `/proc/sys/fs/file-max`, `/proc/sys/fs/nr_open`,
+    # `/proc/sys/kernel/threads-max` and `/proc/meminfo`, optionally below
+    # another `root` (e.g. a recorded fixture).
+    @classmethod
+    def read(cls, root="/"):
+        return cls(
+            _read_int(root, "proc/sys/fs/file-max"),
+            _read_int(root, "proc/sys/fs/nr_open"),
+            _read_int(root, "proc/sys/kernel/threads-max"),
+            read_host_capacity(root).memory,
+        )
+
+
+# Computes process limits for one of `services` services that serve up to
+# `connections` concurrent connections each, with up to `threads` threads.
+# - LimitNOFILE: one descriptor per connection (times `fds_per_connection`)
+#   plus `base_fds` for files and libraries, times `headroom`.
+# - TasksMax: `threads` times `headroom`.
+# - LimitNPROC: TasksMax for the whole group, since the process limit counts
+#   all processes of the user the services run as.
+# Together the services may claim no more than `share` of the host's
+# `file-max`, `threads-max` and of the memory, where every descriptor is
+# assumed to pin `memory_per_fd` of kernel memory (socket buffers).
+# `LimitNOFILE=` can never exceed `nr_open`.
+# Raises a ValueError when the host cannot provide the required limits.
+# Returns the limits as attribute names of `ServiceSection`.
+def compute_limits(
+    capacity,
+    connections,
+    services=1,
+    threads=64,
+    fds_per_connection=1,
+    base_fds=1024,
+    headroom=2.0,
+    memory_per_fd="16K",
+    share=0.5,
+):
+    if services < 1:
+        raise ValueError("Limits need at least one service")
+
+    nofile = math.ceil((connections * fds_per_connection + base_fds) * headroom)
+    nofile_cap = min(
+        capacity.nr_open,
+        int(capacity.file_max * share) // services,
+        int(capacity.memory * share) // parse_size(memory_per_fd) // services,
+    )
+    if nofile > nofile_cap:
+        raise ValueError(
+            f"{services} services need LimitNOFILE={nofile}, "
+            f"but the host allows at most {nofile_cap} each"
+        )
+
+    tasks = math.ceil(threads * headroom)
+    tasks_cap = int(capacity.threads_max * share) // services
+    if tasks > tasks_cap:
+        raise ValueError(
+            f"{services} services need TasksMax={tasks}, "
+            f"but the host allows at most {tasks_cap} each"
+        )
+
+    return {
+        "limit_n_o_f_i_l_e": nofile,
+        "limit_n_p_r_o_c": tasks * services,
+        "tasks_max": tasks,
+    }
+
+
+# Computes the limits for a group of services and writes them as a `limits`
+# drop-in of each service, leaving the unit files and every other directive on
+# disk alone, with a single daemon-reload and batched restarts. `connections`
+# is either one count for all services or a dictionary keyed by service name.
+# Without a `capacity`, the limits of the running host are read. Further
+# keyword arguments are passed to `compute_limits`. With `write=False` the
+# services are only updated in memory.
+# Returns the impacts of every service, keyed by service name, or None when
+# nothing was written.
+def apply_limits(services, connections, capacity=None, write=True, **options):
+    services = list(services)
+    if not services:
+        return {} if write else None
+
+    capacity = capacity or LimitCapacity.read()
+    drop_ins = []
+    for service in services:
+        expected = (
+            connections[service.name] if isinstance(connections, dict) else connections
+        )
+        limits = compute_limits(capacity, expected, len(services), **options)
+        file = File(FileType.SERVICE)
+        for key, value in limits.items():
+            setattr(file.service, key, value)
+            setattr(service.service_file.service, key, value)
+        drop_ins.append((service, file))
+
+    if write:
+        return apply_drop_ins(drop_ins, "limits")
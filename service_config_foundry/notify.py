@@ -0,0 +1,210 @@
+import array
+import os
+import socket
+import threading
+import time
+
+from .timespan import parse_timespan
+
+# File descriptors passed by systemd start at this number (see sd_listen_fds(3)).
+LISTEN_FDS_START = 3
+
+
+# Returns the address of the notification socket in `NOTIFY_SOCKET`, or None
+# when the process was not started by systemd with notification enabled.
+# A leading "@" denotes a socket in the abstract namespace.
+def _notify_address():
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return None
+    if address.startswith("@"):
+        return "\0" + address[1:]
+    if not address.startswith("/"):
+        raise ValueError(f"Unsupported NOTIFY_SOCKET: {address}")
+    return address
+
+
+# Sends a state notification to systemd, like sd_pid_notify_with_fds(3).
+# `state` is a newline-separated list of assignments such as "READY=1", and
+# `fds` are file descriptors passed along with it. Returns False when there is
+# no notification socket (e.g. the process runs outside systemd), and True
+# once the message was sent.
+def notify(state, fds=()):
+    address = _notify_address()
+    if address is None:
+        return False
+
+    ancillary = []
+    if fds:
+        ancillary = [
+            (socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds).tobytes())
+        ]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.sendmsg([state.encode()], ancillary, 0, address)
+    return True
+
+
+# Tells systemd that the service finished starting up (`READY=1`), with an
+# optional status text.
+def ready(status=None):
+    return notify("READY=1" + (f"\nSTATUS={status}" if status else ""))
+
+
+# Tells systemd that the service is reloading its configuration. Services of
+# `Type=notify-reload` send `ready()` once the reload is complete.
+def reloading():
+    monotonic = int(time.clock_gettime(time.CLOCK_MONOTONIC) * 1e6)
+    return notify(f"RELOADING=1\nMONOTONIC_USEC={monotonic}")
+
+
+# Tells systemd that the service is shutting down.
+def stopping():
+    return notify("STOPPING=1")
+
+
+# Sets the status text shown by `systemctl status`.
+def set_status(text):
+    return notify(f"STATUS={text}")
+
+
+# Sends a keep-alive ping to the watchdog (`WATCHDOG=1`).
+def ping_watchdog():
+    return notify("WATCHDOG=1")
+
+
+# Asks systemd to extend the current start, reload or stop timeout by
+# `timeout`, a systemd time span or a number of seconds.
+def extend_timeout(timeout):
+    return notify(f"EXTEND_TIMEOUT_USEC={int(parse_timespan(timeout) * 1e6)}")
+
+
+# Returns the watchdog timeout of the service in seconds from `WATCHDOG_USEC`,
+# or None when the watchdog is disabled or meant for another process.
+def watchdog_timeout():
+    usec = os.environ.get("WATCHDOG_USEC")
+    pid = os.environ.get("WATCHDOG_PID")
+    if not usec or (pid and int(pid) != os.getpid()):
+        return None
+    return int(usec) / 1e6
+
+
+# `Watchdog` pings the systemd watchdog from a background thread. The
+# cadence defaults to half of `WatchdogSec=`, as recommended by
+# sd_watchdog_enabled(3); without a watchdog nothing is started.
+# Usable as a context manager.
+class Watchdog:
+    # Initializes the pinger with an `interval` (a time span or seconds), or
+    # `fraction` of the watchdog timeout of the service.
+    def __init__(self, interval=None, fraction=0.5):
+        if interval is None:
+            timeout = watchdog_timeout()
+            interval = timeout * fraction if timeout else None
+        self.interval = None if interval is None else parse_timespan(interval)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    # Pings until stopped.
+    def __run(self):
+        while not self._stopped.wait(self.interval):
+            ping_watchdog()
+
+    # Starts pinging in a daemon thread. Returns False when no watchdog is
+    # configured.
+    def start(self):
+        if self.interval is None:
+            return False
+
+        ping_watchdog()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.start()
+        return True
+
+    # Stops pinging and waits for the thread to finish.
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+# Returns the file descriptors passed to the process by systemd, like
+# sd_listen_fds_with_names(3), as a list of (fd, name) pairs. These are the
+# sockets of socket units and the file descriptors restored from the file
+# descriptor store. The environment variables are removed unless
+# `unset_environment` is False, so child processes do not inherit them.
+def listen_fds(unset_environment=True):
+    pid = os.environ.get("LISTEN_PID")
+    count = os.environ.get("LISTEN_FDS")
+    names = os.environ.get("LISTEN_FDNAMES")
+    if unset_environment:
+        for variable in ["LISTEN_PID", "LISTEN_FDS", "LISTEN_FDNAMES"]:
+            os.environ.pop(variable, None)
+
+    if not pid or not count or int(pid) != os.getpid():
+        return []
+
+    count = int(count)
+    names = names.split(":") if names else []
+    names += ["unknown"] * (count - len(names))
+    return [(LISTEN_FDS_START + index, names[index]) for index in range(count)]
+
+
+# Hands file descriptors to systemd's file descriptor store under `name`
+# (`FDSTORE=1`). systemd keeps them across restarts of the service and passes
+# them back on the next start, where `listen_fds` returns them.
+def store_fds(fds, name):
+    return notify(f"FDSTORE=1\nFDNAME={name}", fds)
+
+
+# Removes the file descriptors stored under `name` from the store.
+def remove_fds(name):
+    return notify(f"FDSTOREREMOVE=1\nFDNAME={name}")
+
+
+# Returns the listening socket stored under `name` by a previous run of the
+# service, or creates one with `create()` and stores it. A restart therefore
+# reuses the socket the kernel kept accepting connections on, instead of
+# closing it and dropping the connections in its backlog.
+def stored_socket(name, create):
+    for fd, fd_name in listen_fds(unset_environment=False):
+        if fd_name == name:
+            return socket.socket(fileno=fd)
+
+    sock = create()
+    store_fds([sock.fileno()], name)
+    return sock
+
+
+# Configures a [Service] section for a service that uses this client:
+# `Type=notify` (or `notify-reload` with `reload=True`), a `NotifyAccess=`
+# that lets the notifications through, and an optional `WatchdogSec=`. Without
+# `watchdog_sec`, a `WatchdogSec=` the section already has is kept.
+def configure_notify(section, watchdog_sec=None, notify_access="main", reload=False):
+    if notify_access == "none":
+        raise ValueError("NotifyAccess=none discards all notifications")
+
+    section.type = "notify-reload" if reload else "notify"
+    section.notify_access = notify_access
+    if watchdog_sec is not None:
+        section.watchdog_sec = watchdog_sec
+    return section
+
+
+# Configures a [Service] section for restarts that hand over file descriptors
+# through the store: the service must notify systemd (`Type=notify`), may
+# store up to `max_fds` descriptors, and keeps them while it restarts
+# (`preserve="restart"`) or even while it is stopped (`preserve="yes"`).
+def configure_fd_store(section, max_fds=16, preserve="restart"):
+    if section.type not in ("notify", "notify-reload"):
+        configure_notify(section)
+    section.file_descriptor_store_max = max_fds
+    section.file_descriptor_store_preserve = preserve
+    return section
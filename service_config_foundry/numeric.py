@@ -0,0 +1,17 @@
+# numpy is an optional dependency of the planning modules. It is imported here
+# rather than in `utils`, so that modules without planning (such as the
+# service-side notify client) never pay for importing it.
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+# Raises an ImportError when numpy, which the planning modules need, is not
+# installed.
+def require_numpy():
+    if np is None:
+        raise ImportError(
+            "numpy is required for planning. "
+            "Install it with `pip install service_config_foundry[planning]`."
+        )
@@ -0,0 +1,158 @@
+import os
+
+from .file_type import File, FileType
+
+
+# Parses a kernel CPU or node list into a sorted list of indices.
+# Example: "0-3,8" -> [0, 1, 2, 3, 8]
+def parse_cpu_list(text):
+    indices = set()
+    for item in text.replace(" ", ",").split(","):
+        if not item.strip():
+            continue
+        first, _, last = item.partition("-")
+        indices.update(range(int(first), int(last or first) + 1))
+    return sorted(indices)
+
+
+# Formats indices as a compact CPU or node list.
+# Example: [0, 1, 2, 3, 8] -> "0-3,8"
+def format_cpu_list(indices):
+    ranges = []
+    for index in sorted(indices):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}" for first, last in ranges
+    )
+
+
+# Reads a single line from a sysfs file, or returns None if it does not exist.
+def _read(path):
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+# `CpuTopology` describes the NUMA nodes of a host and the physical cores on
+# each node, every core being the list of its hardware threads.
+class CpuTopology:
+    # Initializes the topology from a mapping of node to cores.
+    # Example: {0: [[0, 4], [1, 5]], 1: [[2, 6], [3, 7]]}
+    def __init__(self, nodes):
+        self.nodes = {node: sorted(cores) for node, cores in sorted(nodes.items())}
+
+    # Reads the topology from `/sys/devices/system/cpu` and
+    # `/sys/devices/system/node`, optionally below another `root` (e.g. a
+    # recorded fixture). Hosts without NUMA information form a single node.
+    @classmethod
+    def read(cls, root="/"):
+        system = os.path.join(root, "sys/devices/system")
+        online = _read(os.path.join(system, "cpu/online"))
+        if online is None:
+            raise ValueError(f"No CPU topology found below {root}")
+
+        node_of = {}
+        nodes = _read(os.path.join(system, "node/online"))
+        for node in parse_cpu_list(nodes) if nodes else []:
+            cpulist = _read(os.path.join(system, f"node/node{node}/cpulist"))
+            for cpu in parse_cpu_list(cpulist or ""):
+                node_of[cpu] = node
+
+        cores = {}
+        for cpu in parse_cpu_list(online):
+            topology = os.path.join(system, f"cpu/cpu{cpu}/topology")
+            core = (
+                _read(os.path.join(topology, "physical_package_id")),
+                _read(os.path.join(topology, "core_id")) or f"cpu{cpu}",
+            )
+            cores.setdefault((node_of.get(cpu, 0), core), []).append(cpu)
+
+        topology = {}
+        for (node, _), threads in cores.items():
+            topology.setdefault(node, []).append(threads)
+        return cls(topology)
+
+    # Returns the number of physical cores on the host.
+    def core_count(self):
+        return sum(len(cores) for cores in self.nodes.values())
+
+
+# `Placement` is the CPUs and NUMA node assigned to one instance.
+class Placement:
+    def __init__(self, cpus, node):
+        self.cpus = cpus
+        self.node = node
+
+    def __repr__(self):
+        return f"Placement(cpus={format_cpu_list(self.cpus)!r}, node={self.node})"
+
+    # Returns a service file holding the placement as `CPUAffinity=`,
+    # `NUMAPolicy=` and `NUMAMask=`, suitable for a drop-in.
+    def to_file(self):
+        file = File(FileType.SERVICE)
+        file.service.c_p_u_affinity = format_cpu_list(self.cpus)
+        file.service.n_u_m_a_policy = "bind"
+        file.service.n_u_m_a_mask = str(self.node)
+        return file
+
+
+# Places instances on whole physical cores so that no two instances share a
+# core (including its hyperthreads), and every instance stays on one NUMA
+# node. Instances are spread over the nodes, each going to the node with the
+# most free cores. Without `cores_per_instance`, every instance gets the most
+# cores that still let all instances fit within the nodes.
+# Returns a dictionary mapping instances to `Placement` objects.
+def plan_placement(topology, instances, cores_per_instance=None):
+    instances = list(instances)
+    if not instances:
+        return {}
+
+    if cores_per_instance is None:
+        largest_node = max(len(cores) for cores in topology.nodes.values())
+        cores_per_instance = max(
+            (
+                count
+                for count in range(1, largest_node + 1)
+                if sum(len(cores) // count for cores in topology.nodes.values())
+                >= len(instances)
+            ),
+            default=1,
+        )
+
+    free = {node: list(cores) for node, cores in topology.nodes.items()}
+    placements = {}
+    for instance in instances:
+        node = max(free, key=lambda node: (len(free[node]), -node))
+        if len(free[node]) < cores_per_instance:
+            raise ValueError(
+                f"Cannot place {len(instances)} instances with "
+                f"{cores_per_instance} cores each without sharing cores or "
+                "spanning NUMA nodes"
+            )
+
+        cores = free[node][:cores_per_instance]
+        free[node] = free[node][cores_per_instance:]
+        cpus = sorted(cpu for core in cores for cpu in core)
+        placements[instance] = Placement(cpus, node)
+    return placements
+
+
+# Plans the placement of the instances of a `TemplateService` and writes it as
+# per-instance drop-ins, restarting only the instances whose placement
+# changed. The drop-ins reset `CPUAffinity=`, which systemd otherwise merges
+# with the affinity of the template. Without a `topology`, the topology of the
+# running host is read. Returns the placements.
+def place_instances(template, topology=None, cores_per_instance=None):
+    topology = topology or CpuTopology.read()
+    placements = plan_placement(topology, template.instances, cores_per_instance)
+    template.override_instances(
+        {instance: placement.to_file() for instance, placement in placements.items()},
+        name="placement",
+        replace_lists=True,
+    )
+    return placements
@@ -0,0 +1,77 @@
+from .batch import apply_drop_ins
+from .file_type import File, FileType
+
+# Performance profiles for the [Service] section, as attribute names and
+# values of `ServiceSection`.
+PROFILES = {
+    # Interactive and request-serving processes: a higher priority under the
+    # default scheduler, the highest best-effort I/O priority, protection from
+    # the OOM killer and tight timers.
+    "latency-critical": {
+        "nice": -10,
+        "c_p_u_scheduling_policy": "other",
+        "i_o_scheduling_class": "best-effort",
+        "i_o_scheduling_priority": 0,
+        "o_o_m_score_adjust": -500,
+        "timer_slack_n_sec": 1000,
+    },
+    # Opt-in variant of "latency-critical" with a round-robin real-time
+    # policy that children do not inherit. Real-time tasks run ahead of every
+    # other task and ignore `Nice=`, so a busy one can starve the host; only
+    # use it for services whose CPU use is bounded, e.g. by `CPUQuota=`.
+    "latency-critical-rt": {
+        "c_p_u_scheduling_policy": "rr",
+        "c_p_u_scheduling_priority": 10,
+        "c_p_u_scheduling_reset_on_fork": True,
+        "i_o_scheduling_class": "best-effort",
+        "i_o_scheduling_priority": 0,
+        "o_o_m_score_adjust": -500,
+        "timer_slack_n_sec": 1000,
+    },
+    # CPU-bound batch work: longer time slices with fewer preemptions, low
+    # best-effort I/O priority and coalesced timers.
+    "throughput-batch": {
+        "nice": 10,
+        "c_p_u_scheduling_policy": "batch",
+        "i_o_scheduling_class": "best-effort",
+        "i_o_scheduling_priority": 7,
+        "o_o_m_score_adjust": 300,
+        "timer_slack_n_sec": 50000000,
+    },
+    # Housekeeping that should only use otherwise idle CPU and disk time, and
+    # is the first to go when memory runs out.
+    "background": {
+        "nice": 19,
+        "c_p_u_scheduling_policy": "idle",
+        "i_o_scheduling_class": "idle",
+        "o_o_m_score_adjust": 800,
+        "timer_slack_n_sec": 100000000,
+    },
+}
+
+
+# Applies a profile (a name from `PROFILES` or a dictionary of directives) to
+# the [Service] section of many services and writes it as a `profile` drop-in
+# of each, leaving the unit files and every other directive on disk alone.
+# All drop-ins share a single daemon-reload and batched restarts. With
+# `write=False` the services are only updated in memory.
+# Returns the impacts of every service, keyed by service name, or None when
+# nothing was written.
+def apply_profile(services, profile, write=True):
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile}")
+        profile = PROFILES[profile]
+
+    drop_ins = []
+    for service in services:
+        file = File(FileType.SERVICE)
+        for key, value in profile.items():
+            if not hasattr(file.service, key):
+                raise ValueError(f"Unknown Service directive: {key}")
+            setattr(file.service, key, value)
+            setattr(service.service_file.service, key, value)
+        drop_ins.append((service, file))
+
+    if write:
+        return apply_drop_ins(drop_ins, "profile")
@@ -0,0 +1,58 @@
+import shlex
+
+from .impact import RESOURCE_CONTROL_DIRECTIVES
+from .utils import convert_to_camel_case, normalize_values, run_command
+
+
+# Returns the `systemctl set-property` assignments for resource-control
+# directives given as attribute names (e.g. `c_p_u_quota="50%"`). Directives
+# with several values are assigned once per value.
+# Raises a ValueError for directives that cannot be changed at runtime.
+def property_assignments(directives):
+    assignments = []
+    for key, value in directives.items():
+        directive = convert_to_camel_case(key)
+        if directive not in RESOURCE_CONTROL_DIRECTIVES:
+            raise ValueError(f"{directive} cannot be changed with set-property")
+        assignments += [f"{directive}={item}" for item in normalize_values(value)]
+    return assignments
+
+
+# Changes resource-control settings of running units with
+# `systemctl set-property`, without rewriting unit files or restarting
+# anything. `changes` maps services (or unit names) to their directives as
+# attribute names. A service's directives go to all of its units (every
+# managed instance of a template) and are also set on its [Service] section,
+# so the model matches what systemd runs.
+# With `runtime=True` the change is lost on reboot; otherwise systemd persists
+# it in a drop-in of its own below `/etc/systemd/system.control`.
+# systemctl accepts a single unit per call, so every unit gets one call with
+# all of its properties. A failed call does not stop the others, but only the
+# services whose units were all changed are updated, and a RuntimeError lists
+# the units that failed with systemctl's error output.
+def set_properties(changes, runtime=False):
+    calls = []
+    for target, directives in changes.items():
+        assignments = " ".join(
+            shlex.quote(assignment) for assignment in property_assignments(directives)
+        )
+        units = [target] if isinstance(target, str) else target.reload_units()
+        calls += [(target, unit, assignments) for unit in units]
+
+    flag = " --runtime" if runtime else ""
+    failures, failed_targets = [], []
+    for target, unit, assignments in calls:
+        result = run_command(
+            f"systemctl set-property{flag} {shlex.quote(unit)} {assignments}"
+        )
+        if result.returncode != 0:
+            failures.append(f"{unit}: {(result.stderr or '').strip()}")
+            failed_targets.append(target)
+
+    for target, directives in changes.items():
+        if not isinstance(target, str) and target not in failed_targets:
+            for key, value in directives.items():
+                setattr(target.service_file.service, key, value)
+
+    if failures:
+        raise RuntimeError("systemctl set-property failed for " + "; ".join(failures))
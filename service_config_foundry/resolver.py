@@ -0,0 +1,190 @@
+import copy
+import os
+
+from .config_parser import read_config
+from .dropin import merge_drop_in
+from .enablement import location_directory
+from .service_location import ServiceLocation
+
+# Locations systemd loads system units from, in order of precedence.
+SYSTEM_LOCATIONS = [
+    ServiceLocation.GLOBAL,
+    ServiceLocation.RUNTIME,
+    ServiceLocation.DEFAULT,
+]
+
+
+# Returns the template a unit instance is created from, or None for units
+# that are not instances.
+# Example: "worker@1.service" -> "worker@.service"
+def template_of(unit):
+    prefix, at, rest = unit.partition("@")
+    if not at or rest.startswith("."):
+        return None
+    return f"{prefix}@.{rest.rpartition('.')[2]}"
+
+
+# Returns the modification time of a path, or None if it does not exist.
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# `UnitResolver` answers which unit file wins for a unit and what its merged
+# effective configuration is, across all unit locations at once. Directory
+# listings, the precedence index and effective configurations are cached.
+# A lookup stats the unit directories, the unit's drop-in directories and the
+# files involved; a directory whose modification time changed is listed again
+# on its own, and only the units it contains are re-resolved.
+class UnitResolver:
+    # Initializes the resolver for the given locations (highest precedence
+    # first), optionally inside an offline `root`.
+    def __init__(self, locations=None, root=None):
+        locations = SYSTEM_LOCATIONS if locations is None else locations
+        self._directories = [location_directory(loc, root) for loc in locations]
+        # Per directory: modification time at the last scan, and the unit
+        # files and drop-in directories it contained.
+        self._mtimes = {}
+        self._unit_files = {directory: {} for directory in self._directories}
+        self._drop_in_dirs = {directory: {} for directory in self._directories}
+        # Unit name -> path of the unit file that wins by precedence.
+        self._index = {}
+        # Drop-in directory -> (modification time, `.conf` file names).
+        self._fragments = {}
+        # Unit name -> (validation stamp, effective configuration).
+        self._effective = {}
+
+    # Scans a single directory and returns the unit names whose unit file or
+    # drop-in directory appeared or disappeared.
+    def __scan(self, directory):
+        unit_files, drop_in_dirs = {}, {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".d") and entry.is_dir():
+                        drop_in_dirs[entry.name[: -len(".d")]] = entry.path
+                    elif "." in entry.name and not entry.is_dir():
+                        unit_files[entry.name] = entry.path
+        except FileNotFoundError:
+            pass
+
+        changed = set(unit_files).symmetric_difference(self._unit_files[directory])
+        changed |= set(drop_in_dirs).symmetric_difference(self._drop_in_dirs[directory])
+        self._unit_files[directory] = unit_files
+        self._drop_in_dirs[directory] = drop_in_dirs
+        return changed
+
+    # Re-resolves the winning unit file for the given unit names.
+    def __reindex(self, units):
+        for unit in units:
+            self._effective.pop(unit, None)
+            for directory in self._directories:
+                path = self._unit_files[directory].get(unit)
+                if path:
+                    self._index[unit] = path
+                    break
+            else:
+                self._index.pop(unit, None)
+
+    # Rescans the directories whose modification time changed since the last
+    # scan. Called automatically by every lookup.
+    def refresh(self):
+        for directory in self._directories:
+            mtime = _mtime(directory)
+            if mtime == self._mtimes.get(directory, -1):
+                continue
+            self._mtimes[directory] = mtime
+            self.__reindex(self.__scan(directory))
+
+    # Drops cached effective configurations (of one unit, or all units).
+    def invalidate(self, unit=None):
+        if unit is None:
+            self._effective.clear()
+        else:
+            self._effective.pop(unit, None)
+
+    # Returns the names of all units that have a unit file.
+    def units(self):
+        self.refresh()
+        return sorted(self._index)
+
+    # Returns the winning unit file of a unit from the index, falling back to
+    # the template for instances.
+    def __resolve(self, unit):
+        path = self._index.get(unit)
+        if path is None and template_of(unit):
+            path = self._index.get(template_of(unit))
+        return path
+
+    # Returns the `.conf` file names in a drop-in directory, listing it again
+    # only when its modification time changed.
+    def __list_fragments(self, drop_in_dir):
+        mtime = _mtime(drop_in_dir)
+        cached = self._fragments.get(drop_in_dir)
+        if cached is None or cached[0] != mtime:
+            try:
+                files = [f for f in os.listdir(drop_in_dir) if f.endswith(".conf")]
+            except FileNotFoundError:
+                files = []
+            cached = self._fragments[drop_in_dir] = (mtime, files)
+        return cached[1]
+
+    # Returns the drop-in fragments of a unit from the index. Like systemd,
+    # the fragments of the template and of the instance are sorted by file
+    # name in one pass, and a file name is taken from the highest precedence
+    # location, preferring the instance over the template within a location.
+    def __drop_ins(self, unit):
+        names = list(filter(None, [template_of(unit), unit]))
+        by_name = {}
+        for directory in reversed(self._directories):
+            for name in names:
+                drop_in_dir = self._drop_in_dirs[directory].get(name)
+                if not drop_in_dir:
+                    continue
+                for file in self.__list_fragments(drop_in_dir):
+                    by_name[file] = os.path.join(drop_in_dir, file)
+        return [by_name[file] for file in sorted(by_name)]
+
+    # Returns the path of the unit file that wins for a unit, falling back to
+    # the template for instances. Returns None for unknown units.
+    def resolve(self, unit):
+        self.refresh()
+        return self.__resolve(unit)
+
+    # Checks if a unit is masked (its winning unit file links to /dev/null).
+    def is_masked(self, unit):
+        path = self.resolve(unit)
+        return path is not None and os.path.realpath(path) == os.devnull
+
+    # Returns the drop-in fragments of a unit in the order systemd applies
+    # them: sorted by file name across the template's and the instance's
+    # drop-in directories. A fragment name in a higher precedence location
+    # hides the same name in lower ones, and an instance fragment hides the
+    # template fragment of the same name.
+    def drop_ins(self, unit):
+        self.refresh()
+        return self.__drop_ins(unit)
+
+    # Returns the effective configuration of a unit: the winning unit file
+    # with all of its drop-ins applied. Returns None for unknown or masked
+    # units. The result is cached until one of the files involved changes;
+    # callers get a copy they may modify.
+    def effective_config(self, unit):
+        self.refresh()
+        path = self.__resolve(unit)
+        if path is None or os.path.realpath(path) == os.devnull:
+            return None
+
+        fragments = self.__drop_ins(unit)
+        stamp = [(file, _mtime(file)) for file in [path] + fragments]
+        cached = self._effective.get(unit)
+        if cached and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+
+        config = read_config(path)
+        for fragment in fragments:
+            config = merge_drop_in(config, read_config(fragment))
+        self._effective[unit] = (stamp, config)
+        return copy.deepcopy(config)
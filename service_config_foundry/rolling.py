@@ -0,0 +1,167 @@
+import sys
+
+from .batch import systemctl
+from .status import show_units, wait_for_state
+from .utils import run_command
+
+
+# `RollingRestart` restarts a fleet of services in waves, so that only part of
+# the fleet is down at any time. Waves are made of the units the services
+# restart (see `restart_units`, e.g. every instance of a template), and
+# `batch_size` and `max_unavailable` both count units. Each wave writes the
+# configuration of the services it touches for the first time (unless
+# `write=False`), restarts its units in one batched call, and must become
+# active and pass the `health` check before the next wave starts.
+# At most `batch_size` units are restarted per wave, and never so many that
+# more than `max_unavailable` units are down at once. Only units that were
+# active when the rollout started count: units that were already stopped,
+# such as oneshot or timer-driven services, are restarted but neither use up
+# the budget nor have to become active, as long as they do not fail.
+# If a wave fails, the rollout stops and the files of every service written so
+# far are restored and restarted.
+class RollingRestart:
+    # Initializes the rollout. `health` is called with each restarted service
+    # and returns whether it is healthy; it may block until the service is
+    # ready. `timeout` bounds the wait for a wave to become active.
+    def __init__(
+        self,
+        services,
+        batch_size=1,
+        max_unavailable=None,
+        health=None,
+        timeout=60,
+        write=True,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if max_unavailable is None:
+            max_unavailable = batch_size
+
+        self.services = list(services)
+        self.batch_size = batch_size
+        self.max_unavailable = max_unavailable
+        self.health = health
+        self.timeout = timeout
+        self.write = write
+        # Units that were active when the rollout started.
+        self._active = set()
+
+    # Returns the number of units to restart in the next wave: at most
+    # `batch_size`, and as many as the unavailability budget still allows.
+    def __wave_size(self):
+        states = show_units(sorted(self._active))
+        unavailable = sum(
+            1 for state in states.values() if state["ActiveState"] != "active"
+        )
+        return min(self.batch_size, self.max_unavailable - unavailable)
+
+    # Returns the services of a wave that are not healthy: units that were
+    # active before have to become active again, and no unit may fail.
+    def __unhealthy(self, wave):
+        units = [unit for _, unit in wave]
+        down = set(
+            wait_for_state(
+                [unit for unit in units if unit in self._active], timeout=self.timeout
+            )
+        )
+        others = [unit for unit in units if unit not in self._active]
+        down.update(
+            unit
+            for unit, state in show_units(others).items()
+            if state["ActiveState"] == "failed"
+        )
+
+        services = list({service.name: service for service, _ in wave}.values())
+        return [
+            service.name
+            for service in services
+            if any(unit in down for other, unit in wave if other is service)
+            or (self.health and not self.health(service))
+        ]
+
+    # Restores the files of the written services and restarts them.
+    def __rollback(self, snapshots):
+        if not snapshots:
+            return
+
+        for service, snapshot in snapshots:
+            try:
+                service.restore(snapshot)
+            except PermissionError:
+                print(
+                    f"Permission denied: cannot restore {service.name}. "
+                    "Try running as root or using sudo."
+                )
+                sys.exit(1)
+        run_command("systemctl daemon-reload")
+        systemctl(
+            "restart",
+            [unit for service, _ in snapshots for unit in service.restart_units()],
+        )
+
+    # Writes the services of a wave that were not written yet. A service whose
+    # units change when written (e.g. a new timer) restarts all of its new
+    # units in this wave. Returns the wave and the units still to restart.
+    def __write(self, wave, queue, snapshots):
+        written = {service.name for service, _ in snapshots}
+        new = list(
+            {
+                service.name: service
+                for service, _ in wave
+                if service.name not in written
+            }.values()
+        )
+        for service in new:
+            snapshots.append((service, service.snapshot()))
+            service.write()
+        if new:
+            run_command("systemctl daemon-reload")
+
+        for service in new:
+            units = service.restart_units()
+            planned = [unit for other, unit in wave + queue if other is service]
+            if units != planned:
+                wave = [pair for pair in wave if pair[0] is not service]
+                wave += [(service, unit) for unit in units]
+                queue = [pair for pair in queue if pair[0] is not service]
+        return wave, queue
+
+    # Runs the rollout. Returns the waves as lists of unit names.
+    # Raises a RuntimeError after rolling back when a wave fails, or when the
+    # fleet has no unavailability budget left for another wave.
+    def run(self):
+        queue = [
+            (service, unit)
+            for service in self.services
+            for unit in service.restart_units()
+        ]
+        states = show_units([unit for _, unit in queue])
+        self._active = {
+            unit for unit, state in states.items() if state["ActiveState"] == "active"
+        }
+
+        snapshots, waves = [], []
+        while queue:
+            size = self.__wave_size()
+            if size < 1:
+                self.__rollback(snapshots)
+                raise RuntimeError(
+                    f"Too many units are unavailable (max_unavailable="
+                    f"{self.max_unavailable}), stopped after {len(waves)} waves"
+                )
+
+            wave, queue = queue[:size], queue[size:]
+            if self.write:
+                wave, queue = self.__write(wave, queue, snapshots)
+            waves.append([unit for _, unit in wave])
+            systemctl("restart", waves[-1])
+
+            unhealthy = self.__unhealthy(wave)
+            if unhealthy:
+                self.__rollback(snapshots)
+                raise RuntimeError(
+                    f"Wave {len(waves)} failed for {', '.join(unhealthy)}, "
+                    f"rolled back {len(snapshots)} services"
+                )
+
+        return waves
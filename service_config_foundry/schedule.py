@@ -0,0 +1,404 @@
+import functools
+import hashlib
+import math
+
+from .numeric import np, require_numpy
+from .timespan import TIMESPAN_UNITS, parse_timespan  # noqa: F401
+from .utils import normalize_values
+
+# Calendar shortcuts and the normalized expressions they stand for.
+CALENDAR_SHORTCUTS = {
+    "minutely": "*-*-* *:*:00",
+    "hourly": "*-*-* *:00:00",
+    "daily": "*-*-* 00:00:00",
+    "weekly": "Mon *-*-* 00:00:00",
+    "monthly": "*-*-01 00:00:00",
+    "yearly": "*-01-01 00:00:00",
+    "annually": "*-01-01 00:00:00",
+    "quarterly": "*-01,04,07,10-01 00:00:00",
+    "semiannually": "*-01,07-01 00:00:00",
+}
+
+# Weekday names, Monday first, matching numpy's weekday arithmetic below.
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+# Parses a single calendar field (e.g. "1,15", "8..17", "*/15", "Mon..Fri")
+# into a sorted list of values, or None when it matches every value.
+def _parse_field(text, low, high, names=None):
+    if text == "*":
+        return None
+
+    def value(token):
+        if names and token[:3].lower() in names:
+            return names.index(token[:3].lower())
+        number = int(token.split(".")[0])
+        if not low <= number <= high:
+            raise ValueError(f"Value {number} out of range {low}..{high}")
+        return number
+
+    values = set()
+    for item in text.split(","):
+        item, _, step = item.partition("/")
+        step = int(step) if step else 1
+        if item == "*":
+            first, last = low, high
+        elif ".." in item:
+            first, last = (value(token) for token in item.split("..", 1))
+        elif names and "-" in item:
+            first, last = (value(token) for token in item.split("-", 1))
+        else:
+            first = value(item)
+            last = high if step > 1 else first
+        values.update(range(first, last + 1, step))
+    return sorted(values)
+
+
+# `CalendarSpec` is a compiled `OnCalendar=` expression. Every field holds the
+# sorted values it matches, or None for "any".
+class CalendarSpec:
+    def __init__(self, weekdays, years, months, days, hours, minutes, seconds):
+        self.weekdays = weekdays
+        self.years = years
+        self.months = months
+        self.days = days
+        self.hours = hours if hours is not None else list(range(24))
+        self.minutes = minutes if minutes is not None else list(range(60))
+        self.seconds = seconds if seconds is not None else list(range(60))
+
+    # Returns a tuple identifying the schedule, shared by equivalent
+    # expressions (e.g. "daily" and "*-*-* 00:00:00").
+    def key(self):
+        return tuple(
+            None if field is None else tuple(field)
+            for field in (
+                self.weekdays,
+                self.years,
+                self.months,
+                self.days,
+                self.hours,
+                self.minutes,
+                self.seconds,
+            )
+        )
+
+    # Returns the firing offsets within a matching day, in seconds.
+    @functools.lru_cache(maxsize=None)
+    def day_offsets(self):
+        hours = np.array(self.hours, dtype=np.int64)
+        minutes = np.array(self.minutes, dtype=np.int64)
+        seconds = np.array(self.seconds, dtype=np.int64)
+        return (
+            hours[:, None, None] * 3600
+            + minutes[None, :, None] * 60
+            + seconds[None, None, :]
+        ).ravel()
+
+    # Returns a boolean mask of the days in `grid` this schedule fires on.
+    def day_mask(self, grid):
+        mask = np.ones(len(grid.days), dtype=bool)
+        for values, component, size in (
+            (self.weekdays, grid.weekday, 7),
+            (self.months, grid.month, 13),
+            (self.days, grid.day, 32),
+        ):
+            if values is not None:
+                lookup = np.zeros(size, dtype=bool)
+                lookup[values] = True
+                mask &= lookup[component]
+        if self.years is not None:
+            mask &= np.isin(grid.year, self.years)
+        return mask
+
+    # Returns up to `count` elapse times (in seconds since the epoch) after
+    # `start_seconds` found within `grid`.
+    def elapses(self, grid, start_seconds, count):
+        offsets = self.day_offsets()
+        days = grid.day_seconds[self.day_mask(grid)]
+        days = days[: count // len(offsets) + 2]
+        candidates = (days[:, None] + offsets[None, :]).ravel()
+        return candidates[candidates > start_seconds][:count]
+
+
+# `_DayGrid` holds the calendar components of a range of days as numpy
+# arrays. It is computed once and shared by every schedule being planned.
+class _DayGrid:
+    def __init__(self, start_day, length):
+        self.days = np.arange(start_day, start_day + length, dtype="datetime64[D]")
+        months = self.days.astype("datetime64[M]")
+        self.year = self.days.astype("datetime64[Y]").astype(np.int64) + 1970
+        self.month = months.astype(np.int64) % 12 + 1
+        self.day = (self.days - months).astype(np.int64) + 1
+        # 1970-01-01 was a Thursday; shift so that Monday is 0.
+        self.weekday = (self.days.astype(np.int64) + 3) % 7
+        self.day_seconds = self.days.astype("datetime64[s]").astype(np.int64)
+
+
+# Compiles an `OnCalendar=` expression. Results are cached, so compiling the
+# same expression for thousands of timers parses it once. Times are naive and
+# interpreted in the caller's time zone; a trailing "UTC" is accepted.
+@functools.lru_cache(maxsize=None)
+def compile_calendar(expression):
+    text = CALENDAR_SHORTCUTS.get(expression.strip().lower(), expression)
+    tokens = text.split()
+    if tokens and tokens[-1].upper() == "UTC":
+        tokens.pop()
+
+    weekdays, date, time = None, "*-*-*", "00:00:00"
+    if tokens and tokens[0][:3].lower() in WEEKDAYS:
+        weekdays = _parse_field(tokens.pop(0), 0, 6, WEEKDAYS)
+    for token in tokens:
+        if ":" in token:
+            time = token
+        elif "-" in token:
+            date = token
+        else:
+            raise ValueError(f"Invalid calendar expression: {expression}")
+
+    date_parts = date.split("-")
+    if len(date_parts) == 2:
+        date_parts = ["*"] + date_parts
+    if len(date_parts) != 3 or "~" in date:
+        raise ValueError(f"Unsupported calendar expression: {expression}")
+
+    time_parts = time.split(":")
+    if len(time_parts) == 2:
+        time_parts.append("00")
+    if len(time_parts) != 3:
+        raise ValueError(f"Invalid calendar expression: {expression}")
+
+    return CalendarSpec(
+        weekdays,
+        _parse_field(date_parts[0], 1970, 2199),
+        _parse_field(date_parts[1], 1, 12),
+        _parse_field(date_parts[2], 1, 31),
+        _parse_field(time_parts[0], 0, 23),
+        _parse_field(time_parts[1], 0, 59),
+        _parse_field(time_parts[2], 0, 59),
+    )
+
+
+# Computes the next `count` elapse times after `start` for many `OnCalendar=`
+# expressions at once. Returns a numpy array of shape
+# (len(expressions), count) with dtype datetime64[s], padded with NaT when an
+# expression does not elapse often enough within `max_years`.
+# Equivalent expressions are computed once, and the calendar components of
+# the planning horizon are computed once for all of them.
+def next_elapses(expressions, start, count=1, max_years=100):
+    require_numpy()
+    start_seconds = np.datetime64(start, "s").astype(np.int64)
+    start_day = np.datetime64(start, "D")
+
+    rows = {}
+    specs = {}
+    for index, expression in enumerate(expressions):
+        spec = compile_calendar(expression)
+        rows.setdefault(spec.key(), []).append(index)
+        specs[spec.key()] = spec
+
+    result = np.full((len(expressions), count), np.datetime64("NaT", "s"))
+    pending = list(specs)
+    horizon = 400
+    while pending:
+        grid = _DayGrid(start_day, horizon)
+        exhausted = horizon >= max_years * 366
+        unfinished = []
+        for key in pending:
+            elapses = specs[key].elapses(grid, start_seconds, count)
+            if len(elapses) < count and not exhausted:
+                unfinished.append(key)
+                continue
+            result[rows[key], : len(elapses)] = elapses.astype("datetime64[s]")
+        pending = unfinished
+        horizon = min(horizon * 4, max_years * 366)
+    return result
+
+
+# Computes the next `count` elapse times of monotonic timers for many timers
+# at once: the first elapse is `OnBootSec=` after `boot`, and every further one
+# follows `OnUnitActiveSec=` after the previous one. Spans may be given as
+# systemd time spans or seconds. Returns a datetime64[s] array of shape
+# (len(on_boot_sec), count); timers without `OnUnitActiveSec=` elapse once.
+def monotonic_elapses(boot, on_boot_sec, on_unit_active_sec=None, count=1):
+    require_numpy()
+    first = np.array([parse_timespan(span) for span in on_boot_sec])
+    if on_unit_active_sec is None:
+        on_unit_active_sec = [None] * len(first)
+    period = np.array(
+        [
+            np.nan if span is None else parse_timespan(span)
+            for span in on_unit_active_sec
+        ]
+    )
+
+    offsets = first[:, None] + np.arange(count)[None, :] * period[:, None]
+    offsets[:, 0] = first
+    boot_seconds = np.datetime64(boot, "s").astype(np.int64)
+    elapses = np.full(offsets.shape, np.datetime64("NaT", "s"))
+    valid = ~np.isnan(offsets)
+    elapses[valid] = (boot_seconds + offsets[valid].astype(np.int64)).astype(
+        "datetime64[s]"
+    )
+    return elapses
+
+
+# Computes the next `count` calendar elapses for the timers of many services.
+# Timers with several `OnCalendar=` expressions get the earliest elapses of
+# all of them. Returns a dictionary mapping timer unit names to arrays.
+def plan_timers(services, start, count=1):
+    require_numpy()
+    owners, expressions = [], []
+    for service in services:
+        for expression in normalize_values(service.timer_file.timer.on_calendar):
+            owners.append(f"{service.name}.timer")
+            expressions.append(expression)
+
+    elapses = next_elapses(expressions, start, count)
+    plans = {}
+    for owner, row in zip(owners, elapses):
+        plans[owner] = (
+            row if owner not in plans else np.concatenate([plans[owner], row])
+        )
+    return {owner: np.sort(row)[:count] for owner, row in plans.items()}
+
+
+# Returns a hash of a unit name that is stable across processes and hosts.
+def _stable_hash(unit):
+    return int.from_bytes(hashlib.sha256(unit.encode()).digest()[:8], "big")
+
+
+# Returns an `OnCalendar=` expression shifted later by `offset` seconds. The
+# minute and second must be fixed; the offset may carry into the hour only
+# when the hour is fixed as well.
+# Example: ("hourly", 754) -> "*-*-* *:12:34"
+def shift_calendar(expression, offset):
+    spec = compile_calendar(expression)
+    if len(spec.minutes) != 1 or len(spec.seconds) != 1:
+        raise ValueError(f"Cannot shift {expression}: minute and second vary")
+
+    hour_fixed = len(spec.hours) == 1
+    shifted = spec.minutes[0] * 60 + spec.seconds[0] + offset
+    shifted += spec.hours[0] * 3600 if hour_fixed else 0
+    if shifted >= (86400 if hour_fixed else 3600):
+        raise ValueError(f"Cannot shift {expression} by {offset}s")
+
+    tokens = CALENDAR_SHORTCUTS.get(expression.strip().lower(), expression).split()
+    time = next((token for token in tokens if ":" in token), "00:00")
+    hour = f"{shifted // 3600:02d}" if hour_fixed else time.split(":")[0]
+    shifted_time = f"{hour}:{shifted // 60 % 60:02d}:{shifted % 60:02d}"
+
+    date = [token for token in tokens if ":" not in token and token != "UTC"]
+    return " ".join(date + [shifted_time] + (["UTC"] if "UTC" in tokens else []))
+
+
+# Returns the `OnCalendar=` expressions of a timer as a list.
+def _calendar_list(value):
+    return list(normalize_values(value)) if value is not None else []
+
+
+# Spreads a group of timers sharing a schedule across `window` to avoid
+# thundering-herd wakeups, and returns the offset assigned to each timer unit.
+# Every timer is shifted by a deterministic offset derived from a hash of its
+# unit name, probing later slots until no more than `max_per_interval` timers
+# elapse in any `interval`. A timer elapses anywhere within its
+# `AccuracySec=` window, so it occupies every interval that window covers;
+# timers without one get `AccuracySec=` set to `interval`, as the systemd
+# default of one minute would undo the spreading.
+# The offsets are applied to `base`, the unshifted schedule (an expression or
+# a list of them), which defaults to the schedule the timers share. Timers
+# that were spread before no longer share one, so pass `base` to spread them
+# again; the result is the same for the same timers and base.
+# All timers are planned before any is changed, so a ValueError (timers with
+# different schedules, a window too small, or a schedule that cannot be
+# shifted) leaves every timer untouched.
+# With `randomized=True` systemd spreads the timers instead, using
+# `RandomizedDelaySec=` with `FixedRandomDelay=` so that each timer keeps the
+# same delay across restarts. The limit per interval is not guaranteed then,
+# and the returned offsets are None.
+def spread_timers(
+    services,
+    window="1h",
+    max_per_interval=1,
+    interval="1s",
+    randomized=False,
+    base=None,
+):
+    offsets = {}
+    if randomized:
+        for service in services:
+            timer = service.timer_file.timer
+            timer.randomized_delay_sec = window
+            timer.fixed_random_delay = True
+            offsets[f"{service.name}.timer"] = None
+        return offsets
+
+    services = sorted(services, key=lambda service: service.name)
+    if base is None:
+        schedules = {
+            tuple(
+                compile_calendar(expression).key()
+                for expression in _calendar_list(service.timer_file.timer.on_calendar)
+            )
+            for service in services
+        }
+        if len(schedules) > 1:
+            raise ValueError(
+                "Timers do not share one schedule; pass the unshifted schedule "
+                "as base to spread them"
+            )
+        if services:
+            base = services[0].timer_file.timer.on_calendar
+    base = _calendar_list(base)
+    if services and not base:
+        raise ValueError("Timers have no OnCalendar= schedule to spread")
+
+    step = max(int(parse_timespan(interval)), 1)
+    slots = int(parse_timespan(window)) // step
+    occupancy = [0] * slots
+    plans = []
+    for service in services:
+        unit = f"{service.name}.timer"
+        accuracy_sec = service.timer_file.timer.accuracy_sec or interval
+        span = max(math.ceil(parse_timespan(accuracy_sec) / step), 1)
+        candidates = slots - span + 1
+        if candidates < 1:
+            raise ValueError(f"AccuracySec of {unit} is longer than {window}")
+
+        first = _stable_hash(unit) % candidates
+        for probe in range(candidates):
+            slot = (first + probe) % candidates
+            if max(occupancy[slot : slot + span]) < max_per_interval:
+                break
+        else:
+            raise ValueError(
+                f"Cannot fit {unit} into {window} with at most "
+                f"{max_per_interval} timers per {interval}"
+            )
+
+        for covered in range(slot, slot + span):
+            occupancy[covered] += 1
+        shifted = [shift_calendar(expression, slot * step) for expression in base]
+        plans.append((service, accuracy_sec, shifted))
+        offsets[unit] = slot * step
+
+    for service, accuracy_sec, shifted in plans:
+        timer = service.timer_file.timer
+        timer.accuracy_sec = accuracy_sec
+        timer.on_calendar = shifted[0] if len(shifted) == 1 else shifted
+    return offsets
+
+
+# Counts how many elapses fall into the same interval across all timers.
+# `resolution` is a systemd time span, e.g. "1s" or a timer's `AccuracySec=`.
+# Returns the interval start times and the number of elapses in each, sorted
+# by time.
+def firing_counts(elapses, resolution="1s"):
+    require_numpy()
+    width = max(int(parse_timespan(resolution)), 1)
+    if isinstance(elapses, dict):
+        elapses = list(elapses.values())
+    flat = np.concatenate([np.ravel(row) for row in elapses]) if len(elapses) else []
+    flat = np.asarray(flat, dtype="datetime64[s]")
+    seconds = flat[~np.isnat(flat)].astype(np.int64) // width * width
+    times, counts = np.unique(seconds, return_counts=True)
+    return times.astype("datetime64[s]"), counts
@@ -2,6 +2,7 @@ from .automount import Automount
 from .install import Install
 from .mount import Mount
 from .path import Path
+from .resource_control import ResourceControl
 from .scope import Scope
 from .service import ServiceSection
 from .slice import Slice
@@ -15,6 +16,7 @@ __all__ = [
     "Install",
     "Mount",
     "Path",
+    "ResourceControl",
     "Scope",
     "ServiceSection",
     "Slice",
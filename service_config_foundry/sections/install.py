@@ -5,4 +5,4 @@ class Install:
         self.required_by = None
         self.alias = None
         self.also = None
-        self.defaul_instance = None
+        self.default_instance = None
@@ -0,0 +1,56 @@
+# `ResourceControl` holds the resource-control directives shared by the
+# [Service], [Slice] and [Scope] sections (see systemd.resource-control(5)).
+class ResourceControl:
+    def __init__(self):
+        self.c_p_u_accounting = None
+        self.c_p_u_weight = None
+        self.startup_c_p_u_weight = None
+        self.c_p_u_quota = None
+        self.c_p_u_quota_period_sec = None
+        self.allowed_c_p_us = None
+        self.startup_allowed_c_p_us = None
+        self.allowed_memory_nodes = None
+        self.startup_allowed_memory_nodes = None
+        self.memory_accounting = None
+        self.memory_min = None
+        self.memory_low = None
+        self.startup_memory_low = None
+        self.default_startup_memory_low = None
+        self.default_memory_min = None
+        self.default_memory_low = None
+        self.memory_high = None
+        self.startup_memory_high = None
+        self.memory_max = None
+        self.startup_memory_max = None
+        self.memory_swap_max = None
+        self.startup_memory_swap_max = None
+        self.memory_z_swap_max = None
+        self.startup_memory_z_swap_max = None
+        self.memory_z_swap_writeback = None
+        self.tasks_accounting = None
+        self.tasks_max = None
+        self.i_o_accounting = None
+        self.i_o_weight = None
+        self.startup_i_o_weight = None
+        self.i_o_device_weight = None
+        self.i_o_read_bandwidth_max = None
+        self.i_o_write_bandwidth_max = None
+        self.i_o_read_i_o_p_s_max = None
+        self.i_o_write_i_o_p_s_max = None
+        self.i_o_device_latency_target_sec = None
+        self.block_i_o_accounting = None
+        self.i_p_accounting = None
+        self.i_p_address_allow = None
+        self.i_p_address_deny = None
+        self.socket_bind_allow = None
+        self.socket_bind_deny = None
+        self.device_allow = None
+        self.device_policy = None
+        self.delegate = None
+        self.disable_controllers = None
+        self.managed_o_o_m_swap = None
+        self.managed_o_o_m_memory_pressure = None
+        self.managed_o_o_m_memory_pressure_limit = None
+        self.managed_o_o_m_preference = None
+        self.memory_pressure_watch = None
+        self.memory_pressure_threshold_sec = None
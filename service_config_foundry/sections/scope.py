@@ -1,6 +1,11 @@
-class Scope:
+from .resource_control import ResourceControl
+
+
+class Scope(ResourceControl):
     def __init__(self):
         self.unit_name = "Scope"
-        self.c_p_u_accounting = None
-        self.memory_accounting = None
-        self.block_i_o_accounting = None
+        self.slice = None
+        self.runtime_max_sec = None
+        self.runtime_randomized_extra_sec = None
+        self.o_o_m_policy = None
+        super().__init__()
@@ -1,4 +1,7 @@
-class ServiceSection:
+from .resource_control import ResourceControl
+
+
+class ServiceSection(ResourceControl):
     def __init__(self):
         self.unit_name = "Service"
         self.user = None
@@ -42,3 +45,32 @@ class ServiceSection:
         self.o_o_m_policy = None
         self.open_file = None
         self.reload_file = None
+        self.c_p_u_affinity = None
+        self.n_u_m_a_policy = None
+        self.n_u_m_a_mask = None
+        self.nice = None
+        self.c_p_u_scheduling_policy = None
+        self.c_p_u_scheduling_priority = None
+        self.c_p_u_scheduling_reset_on_fork = None
+        self.i_o_scheduling_class = None
+        self.i_o_scheduling_priority = None
+        self.o_o_m_score_adjust = None
+        self.timer_slack_n_sec = None
+        self.limit_c_p_u = None
+        self.limit_f_s_i_z_e = None
+        self.limit_d_a_t_a = None
+        self.limit_s_t_a_c_k = None
+        self.limit_c_o_r_e = None
+        self.limit_r_s_s = None
+        self.limit_n_o_f_i_l_e = None
+        self.limit_a_s = None
+        self.limit_n_p_r_o_c = None
+        self.limit_m_e_m_l_o_c_k = None
+        self.limit_l_o_c_k_s = None
+        self.limit_s_i_g_p_e_n_d_i_n_g = None
+        self.limit_m_s_g_q_u_e_u_e = None
+        self.limit_n_i_c_e = None
+        self.limit_r_t_p_r_i_o = None
+        self.limit_r_t_t_i_m_e = None
+        self.slice = None
+        super().__init__()
@@ -1,6 +1,7 @@
-class Slice:
+from .resource_control import ResourceControl
+
+
+class Slice(ResourceControl):
     def __init__(self):
         self.unit_name = "Slice"
-        self.c_p_u_accounting = None
-        self.memory_accounting = None
-        self.block_i_o_accounting = None
+        super().__init__()
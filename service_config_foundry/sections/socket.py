@@ -10,3 +10,18 @@ class Socket:
         self.socket_group = None
         self.socket_mode = None
         self.service = None
+        self.backlog = None
+        self.bind_i_pv6_only = None
+        self.bind_to_device = None
+        self.free_bind = None
+        self.reuse_port = None
+        self.no_delay = None
+        self.keep_alive = None
+        self.receive_buffer = None
+        self.send_buffer = None
+        self.max_connections = None
+        self.max_connections_per_source = None
+        self.defer_accept_sec = None
+        self.file_descriptor_name = None
+        self.trigger_limit_interval_sec = None
+        self.trigger_limit_burst = None
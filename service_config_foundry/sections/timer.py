@@ -8,6 +8,8 @@ class Timer:
         self.on_unit_inactive_sec = None
         self.on_calendar = None
         self.accuracy_sec = None
+        self.randomized_delay_sec = None
+        self.fixed_random_delay = None
         self.unit = None
         self.persistent = None
         self.wake_system = None
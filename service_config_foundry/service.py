@@ -1,9 +1,24 @@
 import os
+import shutil
 import sys
 
-from .config_parser import CaseSensitiveConfigParser  # type: ignore
+from .config_parser import read_config, write_config  # type: ignore
+from .dropin import (  # type: ignore
+    drop_in_path,
+    effective_config,
+    read_drop_ins,
+    remove_drop_in,
+    reset_lists,
+    write_drop_in,
+)
+from .enablement import disable_units, enable_units, location_directory  # type: ignore
 from .file_type import File, FileType  # type: ignore
+from .impact import Impact, classify_changes  # type: ignore
+from .journal import journal_entries  # type: ignore
+from .properties import set_properties  # type: ignore
 from .service_location import ServiceLocation  # type: ignore
+from .status import async_wait_for_state, wait_for_state  # type: ignore
+from .transient import run_transient  # type: ignore
 from .utils import convert_to_snake_case, merge_dicts, run_command  # type: ignore
 
 
@@ -12,7 +27,9 @@ from .utils import convert_to_snake_case, merge_dicts, run_command  # type: igno
 # and delete these configurations.
 class Service:
     # Initializes a Service instance with a name, location, and overwrite flag.
-    # Sets up default file types associated with the service.
+    # Sets up default file types associated with the service. With a
+    # `RestartCoalescer`, the lifecycle actions after writing are handed to it
+    # instead of running right away.
     def __init__(
         self,
         name,
@@ -20,12 +37,14 @@ class Service:
         auto_start=True,
         enable_at_startup=False,
         force_overwrite=False,
+        coalescer=None,
     ):
         self.name = name
         self._service_location = service_location
         self._force_overwrite = force_overwrite
         self._auto_start = auto_start
         self._enable_at_startup = enable_at_startup
+        self._coalescer = coalescer
         # Define file types associated with the service.
         self.service_file = File(FileType.SERVICE)
         self.socket_file = File(FileType.SOCKET)
@@ -47,9 +66,9 @@ class Service:
             + file._file_type.file_name(self.name)
         )
 
-    # Yields the configurations of all file types, optionally checking requirements.
-    def __file_configs(self, requirement_check=True):
-        for file in [
+    # Returns the files that are written to disk for the service.
+    def __managed_files(self):
+        return [
             self.service_file,
             self.socket_file,
             self.mount_file,
@@ -57,11 +76,59 @@ class Service:
             self.swap_file,
             self.path_file,
             self.timer_file,
-        ]:
+            self.slice_file,
+        ]
+
+    # Yields the configurations of all file types, optionally checking requirements.
+    def __file_configs(self, requirement_check=True):
+        for file in self.__managed_files():
             config = file.get_config(requirement_check=requirement_check)
             if config:
                 yield file, config
 
+    # Returns the configurations of all configured files, keyed by unit name.
+    # Example: {"example.service": {"Unit": {...}, "Service": {...}}}
+    def unit_configs(self):
+        return {
+            file._file_type.file_name(self.name): config
+            for file, config in self.__file_configs(requirement_check=False)
+        }
+
+    # Reads the configurations currently on disk for the managed files, keyed
+    # by path.
+    def __existing_configs(self):
+        configs = {}
+        for file in self.__managed_files():
+            path = self.__get_path(file)
+            config = read_config(path) if os.path.isfile(path) else None
+            if config:
+                configs[path] = config
+        return configs
+
+    # Returns the raw contents of the managed files on disk, keyed by path, with
+    # None for files that do not exist. `restore` puts them back, e.g. to roll
+    # back a change that left the service unhealthy.
+    def snapshot(self):
+        snapshot = {}
+        for file in self.__managed_files():
+            path = self.__get_path(file)
+            try:
+                with open(path) as handle:
+                    snapshot[path] = handle.read()
+            except FileNotFoundError:
+                snapshot[path] = None
+        return snapshot
+
+    # Restores the managed files from a `snapshot`, removing the files that did
+    # not exist when it was taken. The daemon-reload is left to the caller.
+    def restore(self, snapshot):
+        for path, content in snapshot.items():
+            if content is not None:
+                with open(path, "w") as handle:
+                    handle.write(content)
+            elif os.path.exists(path):
+                os.remove(path)
+
     # Checks if any files for the service name already exist in the directory.
     def __service_with_name_exists(self):
         files = []
@@ -70,35 +137,41 @@ class Service:
                 files.append(file)
         return files
 
-    # Adds attributes to a file based on the given configuration.
+    # Adds attributes to a file based on the given configuration. Each section
+    # object is resolved once, so the inner loop only converts the key and
+    # sets the attribute.
     def __add_attributes(self, file, config):
-        file_tag = file.split(".")[-1]
-        for section, unit in config.items():
-            for key, value in unit.items():
-                file_tag_dict = {
-                    "service": self.service_file,
-                    "socket": self.socket_file,
-                    "target": self.target_file,
-                    "mount": self.mount_file,
-                    "automount": self.automount_file,
-                    "swap": self.swap_file,
-                    "path": self.path_file,
-                    "timer": self.timer_file,
-                    "device": self.device_file,
-                    "slice": self.slice_file,
-                    "scope": self.scope_file,
-                }
-
-                file_type = file_tag_dict.get(file_tag, None)
-                if not file_type:
-                    continue
-
-                section_obj = getattr(file_type, section.lower(), None)
-                if section_obj:
-                    setattr(section_obj, convert_to_snake_case(key), value)
-
-    # Enables the service to start at boot time.
-    def enable_service_at_startup(self):
+        for section, options in config.items():
+            if not file._file_type.is_allowed(section):
+                continue
+
+            section_obj = getattr(file, section.lower(), None)
+            if not section_obj:
+                continue
+
+            for key, value in options.items():
+                setattr(section_obj, convert_to_snake_case(key), value)
+
+    # Returns the units enabled at boot for the service: the service itself
+    # and, when one exists, its timer.
+    def startup_units(self, root=None):
+        units = [self.name]
+        timer_path = os.path.join(
+            location_directory(self._service_location, root),
+            self.timer_file._file_type.file_name(self.name),
+        )
+        if os.path.exists(timer_path):
+            units.append(f"{self.name}.timer")
+        return units
+
+    # Enables the service to start at boot time. With `native=True` the
+    # [Install] symlinks are created directly instead of forking
+    # `systemctl enable`, which also works against an offline `root`.
+    def enable_service_at_startup(self, native=False, root=None):
+        if native:
+            enable_units(self.startup_units(root), self._service_location, root)
+            return
+
         run_command(f"systemctl enable {self.name}")
 
         # We may also need to enable the timer if it exists
@@ -106,24 +179,117 @@ class Service:
         if os.path.exists(timer_path):
             run_command(f"systemctl enable {self.name}.timer")
 
-    # Starts the service (or its timer, when the service is timer-driven).
-    def start_service(self):
+    # Disables the service (and its timer) from starting at boot time. Accepts
+    # the same `native` and `root` options as `enable_service_at_startup`.
+    def disable_service_at_startup(self, native=False, root=None):
+        if native:
+            disable_units(self.startup_units(root), self._service_location, root)
+            return
+
+        run_command(f"systemctl disable {self.name}")
+
+        timer_path = self.__get_path(self.timer_file)
+        if os.path.exists(timer_path):
+            run_command(f"systemctl disable {self.name}.timer")
+
+    # Recreates the [Install] symlinks of the service (and its timer) after the
+    # [Install] section changed, dropping links to targets it no longer names.
+    def reenable_service_at_startup(self):
+        run_command(f"systemctl reenable {self.name}")
+
+        timer_path = self.__get_path(self.timer_file)
+        if os.path.exists(timer_path):
+            run_command(f"systemctl reenable {self.name}.timer")
+
+    # Returns the names of the units among `files` whose files exist on disk.
+    def __existing_units(self, files):
+        return [
+            file._file_type.file_name(self.name)
+            for file in files
+            if os.path.exists(self.__get_path(file))
+        ]
+
+    # Returns the units reloaded by `reload_service`: the service, or the
+    # units `restart_units` starts when the service has no .service file.
+    def reload_units(self):
+        if self.__existing_units([self.service_file]):
+            return [self.name]
+        return self.restart_units()
+
+    # Asks the running service to reload its configuration via `ExecReload`,
+    # falling back to a restart when the service does not support reloading.
+    def reload_service(self):
+        run_command(f"systemctl reload-or-restart {' '.join(self.reload_units())}")
+
+    # Returns the units restarted by `start_service`.
+    def restart_units(self):
         # A timer-driven service is activated by starting its .timer unit, which
         # then triggers the service on schedule. Restarting the service unit
         # directly would only run it once now and leave the timer inactive until
         # the next boot, so start the timer instead when one is configured.
-        timer_path = self.__get_path(self.timer_file)
-        if os.path.exists(timer_path):
-            run_command(f"systemctl restart {self.name}.timer")
-        else:
-            # Restart the service to apply the new configurations. This works
-            # even if the service is new.
-            run_command(f"systemctl restart {self.name}")
+        timer = self.__existing_units([self.timer_file])
+        if timer:
+            return timer
+
+        # Restart the service to apply the new configurations. This works
+        # even if the service is new.
+        if self.__existing_units([self.service_file]):
+            return [self.name]
+
+        # Without a .service file, restart the units that were written instead,
+        # e.g. a socket or a mount.
+        units = self.__existing_units(
+            [
+                self.socket_file,
+                self.path_file,
+                self.mount_file,
+                self.automount_file,
+                self.swap_file,
+            ]
+        )
+        return units or [self.name]
+
+    # Starts the service (or its timer, when the service is timer-driven).
+    def start_service(self):
+        run_command(f"systemctl restart {' '.join(self.restart_units())}")
+
+    # Waits until the started units of the service (see `restart_units`) reach
+    # `state`, polling them together with backoff. Returns False when a unit
+    # failed or `timeout` seconds passed first.
+    def wait_until(self, state="active", timeout=30):
+        return not wait_for_state(self.restart_units(), state, timeout)
+
+    # Asynchronous variant of `wait_until`.
+    async def async_wait_until(self, state="active", timeout=30):
+        return not await async_wait_for_state(self.restart_units(), state, timeout)
 
     # Displays the status of the service.
     def status(self):
         run_command(f"systemctl status {self.name}", use_sudo=False)
 
+    # Launches the configuration as a transient unit with systemd-run, without
+    # writing files or reloading systemd: a service, or with `scope=True` a
+    # scope running `command`. Returns the completed systemd-run process. See
+    # `transient_command`.
+    def run_transient(self, scope=False, command=None):
+        return run_transient([self], scope, command)[self.name]
+
+    # Changes resource-control directives of the running service (e.g.
+    # `c_p_u_quota="50%"`) with `systemctl set-property`, without rewriting
+    # its files or restarting it, and keeps this instance in sync. See
+    # `set_properties`.
+    def set_properties(self, runtime=False, **directives):
+        set_properties({self: directives}, runtime)
+
+    # Streams the journal entries of the service (or of all managed instances
+    # of a template) from a single journalctl process. Pass the `__CURSOR` of
+    # the last entry seen as `cursor` to resume after it. See
+    # `journal_command` for the other options.
+    def logs(self, cursor=None, since=None, lines=None, follow=False):
+        return journal_entries(
+            self.reload_units(), cursor=cursor, since=since, lines=lines, follow=follow
+        )
+
     # Creates the service configuration files.
     def create(self):
         if self.__service_with_name_exists() and not self._force_overwrite:
@@ -131,12 +297,18 @@ class Service:
 
         self.replace()
 
-    # Deletes all files associated with the service name.
-    def delete(self):
+    # Deletes all files associated with the service name. Drop-in directories
+    # (e.g. `name.service.d/`) are removed too unless `drop_ins` is False.
+    def delete(self, drop_ins=True):
         for file in os.listdir(self._service_location.directory()):
             if file.startswith(f"{self.name}."):
+                path = os.path.join(self._service_location.directory(), file)
                 try:
-                    os.remove(os.path.join(self._service_location.directory(), file))
+                    if os.path.isdir(path):
+                        if drop_ins:
+                            shutil.rmtree(path)
+                    else:
+                        os.remove(path)
                 except PermissionError:
                     print(
                         f"Permission denied: cannot write to {file}. "
@@ -144,8 +316,89 @@ class Service:
                     )
                     sys.exit(1)
 
+    # Writes the directives set on `file` as a drop-in fragment of the matching
+    # unit (e.g. `name.service.d/<drop_in>.conf`), leaving the unit file itself
+    # untouched. With `replace_lists=True` list directives such as `ExecStart`
+    # replace the values of the unit file instead of extending them. Only the
+    # actions the change requires are performed.
+    def write_drop_in(self, file, drop_in="override", replace_lists=False):
+        self.__apply_impacts(self.stage_drop_in(file, drop_in, replace_lists))
+
+    # Writes a drop-in fragment like `write_drop_in` without acting on the
+    # change, and returns the impacts needed for it to take effect. Used to
+    # write drop-ins of many services before a single daemon-reload.
+    def stage_drop_in(self, file, drop_in="override", replace_lists=False):
+        directory = location_directory(self._service_location)
+        unit = file._file_type.file_name(self.name)
+        path = drop_in_path(directory, unit, drop_in)
+
+        # A missing drop-in overrides nothing, so compare against an empty one
+        # and classify the individual directives.
+        previous = read_config(path) if os.path.isfile(path) else {}
+        config = file.get_config(requirement_check=False) or {}
+        if replace_lists:
+            config = reset_lists(config)
+
+        impacts = classify_changes(previous, config)
+        if impacts:
+            write_drop_in(directory, unit, config, drop_in)
+        return impacts
+
+    # Removes a drop-in fragment of the unit matching `file`.
+    def remove_drop_in(self, file, drop_in="override"):
+        directory = location_directory(self._service_location)
+        unit = file._file_type.file_name(self.name)
+        path = drop_in_path(directory, unit, drop_in)
+
+        previous = read_config(path) if os.path.isfile(path) else {}
+        if remove_drop_in(directory, unit, drop_in):
+            self.__apply_impacts(classify_changes(previous, {}))
+
+    # Returns the drop-in fragments of the unit matching `file` as a list of
+    # (name, config) pairs, in the order systemd applies them.
+    def read_drop_ins(self, file):
+        directory = location_directory(self._service_location)
+        return read_drop_ins(directory, file._file_type.file_name(self.name))
+
+    # Returns the effective configuration of the unit matching `file`: the
+    # unit file with all of its drop-ins applied.
+    def effective_config(self, file):
+        directory = location_directory(self._service_location)
+        return effective_config(directory, file._file_type.file_name(self.name))
+
+    # Performs the cheapest set of actions that makes the given impacts take
+    # effect: nothing, a daemon-reload, a reload, a re-enable or a restart.
+    # With a coalescer, the actions are deferred and batched with others.
+    def __apply_impacts(self, impacts):
+        if self._coalescer is not None:
+            self._coalescer.submit(self, impacts)
+            return
+
+        if impacts - {Impact.NONE}:
+            # Reload the systemd daemon so it sees the changed files
+            run_command("systemctl daemon-reload")
+
+        if self._auto_start:
+            if Impact.RESTART in impacts:
+                self.start_service()
+            elif Impact.RELOAD in impacts:
+                self.reload_service()
+
+        if self._enable_at_startup:
+            if Impact.REENABLE in impacts:
+                self.reenable_service_at_startup()
+            else:
+                # Enabling is idempotent and does not disturb the running unit.
+                self.enable_service_at_startup()
+
     # Replaces the existing service configuration files with new ones.
     def replace(self):
+        self.__apply_impacts(self.write())
+
+    # Replaces the existing service configuration files with new ones without
+    # acting on the change, and returns the impacts needed for it to take
+    # effect. Used to write many services before a single daemon-reload.
+    def write(self):
         config_and_path = {}
 
         # Prepare configurations and paths for atomic replacement
@@ -153,88 +406,60 @@ class Service:
             path = self.__get_path(file)
             config_and_path[path] = config_dict
 
-        # Delete old configurations before writing new ones
-        self.delete()
+        # Remember what is on disk so the change can be classified
+        previous_config_and_path = self.__existing_configs()
+
+        # Delete old configurations before writing new ones, keeping drop-ins
+        self.delete(drop_ins=False)
 
         # Write the new configurations to their respective files
         for path, config_dict in config_and_path.items():
-            try:
-                with open(path, "w") as f:
-                    for section, options in config_dict.items():
-                        f.write(f"[{section}]\n")
-                        for key, values in options.items():
-                            if not isinstance(values, list):
-                                if type(values) is bool:
-                                    values = str(values).lower()
-                                f.write(f"{key}={values}\n")
-                            else:
-                                for value in values:
-                                    if type(value) is bool:
-                                        value = str(value).lower()
-                                    f.write(f"{key}={value}\n")
-                        f.write("\n")
-            except PermissionError:
-                print(
-                    f"Permission denied: cannot write to {path}. "
-                    "Try running as root or using sudo."
+            write_config(path, config_dict)
+
+        # A service with nothing on disk before is being deployed for the
+        # first time, so it always needs a full start.
+        impacts = {Impact.RESTART}
+        if previous_config_and_path:
+            impacts = set()
+            for path in set(config_and_path).union(previous_config_and_path):
+                impacts |= classify_changes(
+                    previous_config_and_path.get(path), config_and_path.get(path)
                 )
-                sys.exit(1)
 
-        # Reload the systemd daemon to apply changes
-        run_command("systemctl daemon-reload")
-
-        if self._auto_start:
-            self.start_service()
-
-        if self._enable_at_startup:
-            self.enable_service_at_startup()
-
-    # Updates the service with new configurations.
+        return impacts
+
+    # Merges the directives set on this instance into the configuration read
+    # from disk without modifying either. Values read from disk that hold a
+    # single assignment are unwrapped so they match what callers set.
+    def __merge_patch(self, previous, patch):
+        merged = {
+            section: {
+                key: values[0] if len(values) == 1 else values
+                for key, values in options.items()
+            }
+            for section, options in (previous or {}).items()
+        }
+        return merge_dicts(merged, patch)
+
+    # Updates the service in place. Only the directives set on this instance
+    # are merged into the files on disk, files without any set directive are
+    # left untouched, and a file is only rewritten when its content changes.
     def update(self):
-        temp_service = Service(
-            name=self.name,
-            service_location=self._service_location,
-            force_overwrite=self._force_overwrite,
-        )
-
-        # Find relevant files associated with the service.
-        relevant_files = []
-        for file in os.listdir(temp_service._service_location.directory()):
-            if file.startswith(f"{temp_service.name}."):
-                relevant_files.append(file)
+        if not self.__service_with_name_exists():
+            raise ValueError(f"No service found for {self.name}")
 
-        if not relevant_files:
-            raise ValueError(f"No service found for {temp_service.name}")
-
-        # Collect current and new configurations.
-        config_and_path = {}
-        for file, config_dict in self.__file_configs(requirement_check=False):
+        impacts = set()
+        for file, patch in self.__file_configs(requirement_check=False):
             path = self.__get_path(file)
-            config_and_path[path] = config_dict
+            previous = read_config(path) if os.path.isfile(path) else None
+            merged = self.__merge_patch(previous, patch)
 
-        # Add attributes from relevant files to the temporary service.
-        for file in relevant_files:
-            config = CaseSensitiveConfigParser()
-            config.read(os.path.join(temp_service._service_location.directory(), file))
-            temp_service.__add_attributes(file, config)
-
-        # Merge the original and new configurations.
-        original_config_and_path = {}
-        for file, config_dict in temp_service.__file_configs(requirement_check=False):
-            path = temp_service.__get_path(file)
-            original_config_and_path[path] = config_dict
-
-        final_config_and_path = {}
-        for path in set(original_config_and_path.keys()).union(
-            set(config_and_path.keys())
-        ):
-            config_dict = config_and_path.get(path, None)
-            temp_config_dict = original_config_and_path.get(path, None)
-            final_config_and_path[path] = merge_dicts(temp_config_dict, config_dict)
-
-        # Update attributes and replace the configuration files.
-        for path, _ in final_config_and_path.items():
-            file = os.path.basename(path)
-            self.__add_attributes(file, final_config_and_path[path])
+            changes = classify_changes(previous, merged)
+            if changes:
+                write_config(path, merged)
+                impacts |= changes
 
-        self.replace()
+            # Keep this instance in sync with what is now on disk.
+            self.__add_attributes(file, merged)
+
+        self.__apply_impacts(impacts)
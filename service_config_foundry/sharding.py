@@ -0,0 +1,138 @@
+import copy
+import os
+
+from .batch import apply_services, systemctl
+from .file_type import File, FileType
+from .impact import Impact
+from .service import Service
+from .service_location import ServiceLocation
+from .template import TemplateService
+
+
+# `ShardedSocket` builds N socket-activated shards of a service that all
+# listen on the same address with `SO_REUSEPORT`, so that the kernel spreads
+# incoming connections across them. Shard N is pinned to CPU N (wrapping
+# around when there are more shards than CPUs), and is only started when its
+# socket receives the first connection.
+# Settings shared by all shards go into `socket_file` and `service_file`.
+# Shards are written either as N socket and service pairs (`name-0.socket`,
+# `name-0.service`, ...), or with `template=True` as a single
+# `name@.socket`/`name@.service` template with one instance per shard.
+class ShardedSocket:
+    # Initializes the shards of `name` listening on `listen` (e.g. "8080" or
+    # "0.0.0.0:443"). Defaults to one shard per CPU.
+    def __init__(
+        self,
+        name,
+        listen,
+        shards=None,
+        template=False,
+        pin_cpus=True,
+        service_location=ServiceLocation.GLOBAL,
+    ):
+        self.name = name
+        self.listen = listen
+        self.shards = shards or os.cpu_count()
+        self.template = template
+        self.pin_cpus = pin_cpus
+        self._service_location = service_location
+        self.socket_file = File(FileType.SOCKET)
+        self.service_file = File(FileType.SERVICE)
+
+    # Returns the socket units of all shards.
+    def socket_units(self):
+        if self.template:
+            return [f"{self.name}@{shard}.socket" for shard in range(self.shards)]
+        return [f"{self.name}-{shard}.socket" for shard in range(self.shards)]
+
+    # Returns the service units of all shards.
+    def service_units(self):
+        return [unit[: -len(".socket")] + ".service" for unit in self.socket_units()]
+
+    # Copies the shared settings into a service and sets what every shard
+    # needs: the listening address with `ReusePort=`, and the socket being
+    # started at boot through sockets.target.
+    def __configure(self, service):
+        service.socket_file = copy.deepcopy(self.socket_file)
+        service.service_file = copy.deepcopy(self.service_file)
+        socket = service.socket_file.socket
+        socket.listen_stream = self.listen
+        socket.reuse_port = True
+        install = service.socket_file.install
+        install.wanted_by = install.wanted_by or "sockets.target"
+        return service
+
+    # Returns the CPU a shard is pinned to.
+    def cpu(self, shard):
+        return shard % os.cpu_count()
+
+    # Returns a service file pinning a template instance to its CPU, written
+    # as a per-instance drop-in.
+    def __affinity_file(self, shard):
+        file = File(FileType.SERVICE)
+        file.service.c_p_u_affinity = self.cpu(shard)
+        return file
+
+    # Returns the services making up the shards: a single `TemplateService`
+    # with one instance per shard, or one `Service` per shard. The CPU of a
+    # template instance cannot be derived from its instance name alone, so
+    # `write` pins template instances with per-instance drop-ins.
+    # Lifecycle actions are left to `write`, since the shards start on demand.
+    def services(self):
+        if self.template:
+            service = self.__configure(
+                TemplateService(
+                    self.name,
+                    instances=range(self.shards),
+                    service_location=self._service_location,
+                    auto_start=False,
+                )
+            )
+            return [service]
+
+        services = []
+        for shard in range(self.shards):
+            service = self.__configure(
+                Service(
+                    f"{self.name}-{shard}",
+                    service_location=self._service_location,
+                    auto_start=False,
+                )
+            )
+            if self.pin_cpus:
+                service.service_file.service.c_p_u_affinity = self.cpu(shard)
+            services.append(service)
+        return services
+
+    # Writes all shards in one batch with a single daemon-reload (plus one for
+    # the affinity drop-ins of template instances when they change). The sockets
+    # of shards that changed are enabled, and restarted when the change
+    # requires it, in batched calls. The services themselves are started by
+    # their sockets, so only the shard services that are already running are
+    # restarted (`try-restart`) when their change requires it; the others pick
+    # the change up on their next connection.
+    # Returns the impacts of every service, keyed by service name.
+    def write(self):
+        services = self.services()
+        impacts = apply_services(services)
+        restart_services = []
+        if self.template and self.pin_cpus:
+            restart_services += services[0].override_instances(
+                {shard: self.__affinity_file(shard) for shard in range(self.shards)},
+                name="affinity",
+                replace_lists=True,
+            )
+
+        changed, restart = [], []
+        for unit, service_unit in zip(self.socket_units(), self.service_units()):
+            name = f"{self.name}@" if self.template else unit[: -len(".socket")]
+            if impacts[name]:
+                changed.append(unit)
+            if Impact.RESTART in impacts[name]:
+                restart.append(unit)
+                restart_services.append(service_unit)
+
+        systemctl("enable", changed)
+        systemctl("restart", restart)
+        systemctl("try-restart", list(dict.fromkeys(restart_services)))
+        return impacts
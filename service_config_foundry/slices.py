@@ -0,0 +1,110 @@
+import os
+
+from .batch import apply_services
+from .config_parser import read_config, write_config
+from .dropin import drop_in_path, write_drop_in
+from .enablement import location_directory
+from .file_type import File, FileType
+from .impact import classify_changes
+from .service_location import ServiceLocation
+
+
+# Returns the unit name of a slice from its path in the slice tree. systemd
+# derives the parent of a slice from its name, so the components are joined
+# with dashes and may not contain dashes themselves.
+# Example: "prod/db" -> "prod-db.slice"
+def slice_unit(path):
+    parts = path.strip("/").split("/")
+    if not all(parts) or any("-" in part for part in parts):
+        raise ValueError(f"Invalid slice path: {path}")
+    return FileType.SLICE.file_name("-".join(parts))
+
+
+# `SliceTree` builds a hierarchy of slice units (e.g. `prod.slice` containing
+# `prod-db.slice`) with resource-control settings, and assigns services to the
+# slices. All slices and services are written in one batch.
+class SliceTree:
+    # Initializes an empty tree whose slices are written to `service_location`.
+    def __init__(self, service_location=ServiceLocation.GLOBAL):
+        self._service_location = service_location
+        # Slice unit name -> File holding its configuration.
+        self._slices = {}
+        self._services = []
+
+    # Adds a slice (and any missing parents) and applies resource-control
+    # settings to it. Returns the [Slice] section for further changes.
+    # Example: tree.add_slice("prod/db", c_p_u_weight=500, memory_max="8G")
+    def add_slice(self, path, description=None, **directives):
+        parts = path.strip("/").split("/")
+        for depth in range(1, len(parts) + 1):
+            unit = slice_unit("/".join(parts[:depth]))
+            self._slices.setdefault(unit, File(FileType.SLICE))
+
+        file = self._slices[slice_unit(path)]
+        if description is not None:
+            file.unit.description = description
+
+        section = file.slice
+        for key, value in directives.items():
+            if not hasattr(section, key):
+                raise ValueError(f"Unknown resource-control directive: {key}")
+            setattr(section, key, value)
+        return section
+
+    # Assigns a service to a slice, adding the slice if necessary.
+    def assign(self, service, path):
+        unit = slice_unit(path)
+        if unit not in self._slices:
+            self.add_slice(path)
+
+        service.service_file.service.slice = unit
+        if service not in self._services:
+            self._services.append(service)
+
+    # Returns the unit names of all slices in the tree, parents first.
+    def slices(self):
+        return sorted(self._slices, key=lambda unit: (unit.count("-"), unit))
+
+    # Sets resource-control directives of many slices, given as a dictionary
+    # mapping slice paths to directives, and writes them as a named drop-in
+    # fragment of each slice unit instead of rewriting the slice files. The
+    # daemon-reload is left to the caller.
+    # Returns whether any drop-in changed.
+    def write_drop_ins(self, changes, drop_in="override"):
+        directory = location_directory(self._service_location)
+        changed = False
+        for path, directives in changes.items():
+            self.add_slice(path, **directives)
+            file = File(FileType.SLICE)
+            for key, value in directives.items():
+                setattr(file.slice, key, value)
+
+            unit = slice_unit(path)
+            previous_path = drop_in_path(directory, unit, drop_in)
+            previous = (
+                read_config(previous_path) if os.path.isfile(previous_path) else {}
+            )
+            config = file.get_config(requirement_check=False) or {}
+            if classify_changes(previous, config):
+                write_drop_in(directory, unit, config, drop_in)
+                changed = True
+        return changed
+
+    # Writes all slices and assigned services, then issues a single
+    # daemon-reload and batched systemctl calls for the services whose change
+    # requires them. Unchanged slice files are not rewritten. Further
+    # `services` outside the tree can be written in the same batch.
+    # Returns the impacts of every service, keyed by service name.
+    def write(self, services=()):
+        directory = location_directory(self._service_location)
+        changed = False
+        for unit in self.slices():
+            path = os.path.join(directory, unit)
+            previous = read_config(path) if os.path.isfile(path) else None
+            config = self._slices[unit].get_config(requirement_check=False) or {}
+            if classify_changes(previous, config):
+                write_config(path, config)
+                changed = True
+
+        services = self._services + [s for s in services if s not in self._services]
+        return apply_services(services, daemon_reload=changed)
@@ -0,0 +1,221 @@
+import asyncio
+import time
+
+from .utils import SYSTEMCTL_CHUNK_SIZE, chunks, convert_to_snake_case, run_command
+
+# Properties read by `status_many` unless others are requested.
+DEFAULT_PROPERTIES = (
+    "LoadState",
+    "ActiveState",
+    "SubState",
+    "MainPID",
+    "ExecMainStatus",
+    "NRestarts",
+    "MemoryCurrent",
+    "CPUUsageNSec",
+    "TasksCurrent",
+    "ActiveEnterTimestampMonotonic",
+)
+
+# systemd prints UINT64_MAX for counters that are not available, such as
+# `MemoryCurrent=` without memory accounting.
+UINT64_MAX = 2**64 - 1
+
+
+# Parses the output of `systemctl show` for several units into one dictionary
+# of properties per unit. systemctl prints a block of KEY=VALUE lines per unit,
+# in the order the units were given, separated by blank lines.
+def parse_show(output):
+    blocks, block = [], {}
+    for line in output.splitlines():
+        if not line.strip():
+            if block:
+                blocks.append(block)
+                block = {}
+            continue
+
+        key, _, value = line.partition("=")
+        block[key] = value
+
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+# Reads `properties` of many units with one `systemctl show` call per chunk.
+# Returns a dictionary mapping every unit to its properties as strings.
+def show_units(units, properties=("ActiveState", "SubState")):
+    result = {}
+    for chunk in chunks(list(units), SYSTEMCTL_CHUNK_SIZE):
+        output = run_command(
+            f"systemctl show -p {','.join(properties)} {' '.join(chunk)}",
+            use_sudo=False,
+        )
+        blocks = parse_show(output.stdout or "")
+        if len(blocks) != len(chunk):
+            raise ValueError(f"Unexpected systemctl show output for {chunk}")
+        result.update(zip(chunk, blocks))
+    return result
+
+
+# Converts a property value printed by `systemctl show` into a Python value:
+# numbers become integers, "yes"/"no" booleans, and unset values (empty,
+# "[not set]" or UINT64_MAX) None. Everything else stays a string.
+def convert_property(value):
+    if value in ("", "[not set]"):
+        return None
+    if value in ("yes", "no"):
+        return value == "yes"
+    if value.isdigit():
+        number = int(value)
+        return None if number == UINT64_MAX else number
+    return value
+
+
+# `UnitStatus` is the runtime status of a unit, with every property available
+# as a snake_case attribute holding its converted value.
+# Example: status.active_state == "active", status.main_p_i_d == 1234
+# Properties whose attribute name is taken by the record itself, such as the
+# `Unit=` property of timers and paths, are only available in `properties`,
+# so `unit` always names the unit that was read.
+class UnitStatus:
+    def __init__(self, unit, properties):
+        self.unit = unit
+        self.properties = {
+            key: convert_property(value) for key, value in properties.items()
+        }
+        for key, value in self.properties.items():
+            name = convert_to_snake_case(key)
+            if not hasattr(self, name):
+                setattr(self, name, value)
+
+    def __repr__(self):
+        return f"UnitStatus({self.unit!r}, {self.properties!r})"
+
+    # Returns whether the unit is active.
+    def is_active(self):
+        return self.properties.get("ActiveState") == "active"
+
+
+# `StatusCache` keeps unit statuses for `ttl` seconds, so that many callers
+# (dashboards, health checks) polling the same units share one
+# `systemctl show` call.
+class StatusCache:
+    def __init__(self, ttl=1.0):
+        self.ttl = ttl
+        # (unit, properties) -> (expiry time, UnitStatus)
+        self._entries = {}
+
+    # Returns the cached status of a unit, or None when it is missing or
+    # expired.
+    def get(self, unit, properties):
+        entry = self._entries.get((unit, tuple(properties)))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    # Stores the statuses read for `properties`.
+    def put(self, statuses, properties):
+        expiry = time.monotonic() + self.ttl
+        for status in statuses:
+            self._entries[(status.unit, tuple(properties))] = (expiry, status)
+
+    # Drops all cached statuses.
+    def clear(self):
+        self._entries.clear()
+
+
+# Cache used by `status_many` unless another one is given.
+DEFAULT_CACHE = StatusCache()
+
+
+# Returns the runtime status of many units as `UnitStatus` records, keyed by
+# unit. Units missing from `cache` are read with one `systemctl show` call per
+# chunk and cached; `cache=None` always reads them.
+def status_many(units, properties=DEFAULT_PROPERTIES, cache=DEFAULT_CACHE):
+    units = list(dict.fromkeys(units))
+    statuses = {}
+    if cache is not None:
+        for unit in units:
+            status = cache.get(unit, properties)
+            if status is not None:
+                statuses[unit] = status
+
+    missing = [unit for unit in units if unit not in statuses]
+    fetched = [
+        UnitStatus(unit, values)
+        for unit, values in show_units(missing, properties).items()
+    ]
+    if cache is not None:
+        cache.put(fetched, properties)
+    statuses.update((status.unit, status) for status in fetched)
+
+    return {unit: statuses[unit] for unit in units}
+
+
+# `_Wait` tracks the units that still have to reach a state, and the delay
+# before the next poll, which doubles from `interval` up to `max_interval` but
+# never overshoots the deadline.
+class _Wait:
+    def __init__(self, units, state, timeout, interval, max_interval):
+        self.pending = list(dict.fromkeys(units))
+        self.failed = []
+        self.state = state
+        self.deadline = time.monotonic() + timeout
+        self.interval = interval
+        self.max_interval = max_interval
+
+    # Removes the units that reached the state, or failed, from the pending
+    # units. Returns the delay before the next poll, or None when done.
+    def update(self, states):
+        pending = []
+        for unit in self.pending:
+            active_state = states[unit]["ActiveState"]
+            if active_state == self.state:
+                continue
+            if active_state == "failed":
+                self.failed.append(unit)
+            else:
+                pending.append(unit)
+        self.pending = pending
+
+        remaining = self.deadline - time.monotonic()
+        if not self.pending or remaining <= 0:
+            return None
+
+        delay = min(self.interval, remaining)
+        self.interval = min(self.interval * 2, self.max_interval)
+        return delay
+
+    # Returns the units that failed or did not reach the state in time.
+    def result(self):
+        return self.failed + self.pending
+
+
+# Waits until all `units` reach the `ActiveState` `state` (e.g. "active" or
+# "inactive"), polling all pending units with one `systemctl show` call per
+# tick and backing off exponentially between ticks. Units entering "failed"
+# stop being waited for.
+# Returns the units that failed or did not reach the state within `timeout`
+# seconds; an empty list means all units did.
+def wait_for_state(units, state="active", timeout=30, interval=0.1, max_interval=2.0):
+    wait = _Wait(units, state, timeout, interval, max_interval)
+    delay = wait.update(show_units(wait.pending))
+    while delay is not None:
+        time.sleep(delay)
+        delay = wait.update(show_units(wait.pending))
+    return wait.result()
+
+
+# Asynchronous variant of `wait_for_state`. The `systemctl show` calls run in
+# the default executor, so the event loop keeps running while waiting.
+async def async_wait_for_state(
+    units, state="active", timeout=30, interval=0.1, max_interval=2.0
+):
+    loop = asyncio.get_running_loop()
+    wait = _Wait(units, state, timeout, interval, max_interval)
+    while True:
+        delay = wait.update(await loop.run_in_executor(None, show_units, wait.pending))
+        if delay is None:
+            return wait.result()
+        await asyncio.sleep(delay)
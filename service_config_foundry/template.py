@@ -0,0 +1,194 @@
+import os
+
+from .config_parser import read_config
+from .dropin import drop_in_path, reset_lists, write_drop_in
+from .enablement import disable_units, enable_units, location_directory
+from .file_type import FileType
+from .impact import Impact, classify_changes
+from .service import Service
+from .service_location import ServiceLocation
+from .utils import SYSTEMCTL_CHUNK_SIZE, chunks, run_command
+
+
+# `TemplateService` manages a template unit (e.g. `worker@.service`) and the
+# instances started from it (`worker@1.service`, `worker@2.service`, ...).
+# All instances share the template files, per-instance differences are written
+# as drop-ins, and lifecycle operations on instances are batched into as few
+# systemctl calls as possible.
+class TemplateService(Service):
+    # Initializes a template with its name (without `@`) and the instances
+    # managed by the lifecycle methods.
+    def __init__(
+        self,
+        name,
+        instances=(),
+        service_location=ServiceLocation.GLOBAL,
+        auto_start=True,
+        enable_at_startup=False,
+        force_overwrite=False,
+        coalescer=None,
+    ):
+        super().__init__(
+            f"{name}@",
+            service_location=service_location,
+            auto_start=auto_start,
+            enable_at_startup=enable_at_startup,
+            force_overwrite=force_overwrite,
+            coalescer=coalescer,
+        )
+        self.template_name = name
+        self.instances = list(instances)
+
+    # Returns the unit name of an instance.
+    # Example: 3 -> "worker@3.service"
+    def instance_name(self, instance, file_type=FileType.SERVICE):
+        return file_type.file_name(f"{self.template_name}@{instance}")
+
+    # Returns the given instances, defaulting to the managed ones.
+    def __instances(self, instances):
+        return self.instances if instances is None else list(instances)
+
+    # Checks if the template is driven by a timer template.
+    def __has_timer(self):
+        return os.path.exists(
+            os.path.join(
+                location_directory(self._service_location),
+                self.timer_file._file_type.file_name(self.name),
+            )
+        )
+
+    # Returns the instance units that are enabled at boot: the services and,
+    # when the template has a timer, the timers.
+    def __startup_units(self, instances):
+        units = [self.instance_name(instance) for instance in instances]
+        if self.__has_timer():
+            units += [
+                self.instance_name(instance, FileType.TIMER) for instance in instances
+            ]
+        return units
+
+    # Runs a systemctl verb over many units, chunked into batched calls.
+    def __systemctl(self, verb, units):
+        for chunk in chunks(units, SYSTEMCTL_CHUNK_SIZE):
+            run_command(f"systemctl {verb} {' '.join(chunk)}")
+
+    # Starts the given instances (or all managed instances).
+    def start_instances(self, instances=None):
+        instances = self.__instances(instances)
+        self.__systemctl("start", [self.instance_name(i) for i in instances])
+
+    # Stops the given instances (or all managed instances).
+    def stop_instances(self, instances=None):
+        instances = self.__instances(instances)
+        self.__systemctl("stop", [self.instance_name(i) for i in instances])
+
+    # Restarts the given instances (or all managed instances).
+    def restart_instances(self, instances=None):
+        instances = self.__instances(instances)
+        self.__systemctl("restart", [self.instance_name(i) for i in instances])
+
+    # Enables the given instances (or all managed instances) at boot, either
+    # with batched `systemctl enable` calls or natively via symlinks.
+    def enable_instances(self, instances=None, native=False, root=None):
+        units = self.__startup_units(self.__instances(instances))
+        if native:
+            enable_units(units, self._service_location, root)
+        else:
+            self.__systemctl("enable", units)
+
+    # Disables the given instances (or all managed instances) at boot.
+    def disable_instances(self, instances=None, native=False, root=None):
+        units = self.__startup_units(self.__instances(instances))
+        if native:
+            disable_units(units, self._service_location, root)
+        else:
+            self.__systemctl("disable", units)
+
+    # Returns the managed instances, or their timers for a timer-driven
+    # template.
+    def restart_units(self):
+        file_type = FileType.TIMER if self.__has_timer() else FileType.SERVICE
+        return [self.instance_name(instance, file_type) for instance in self.instances]
+
+    # Starts all managed instances, or their timers for a timer-driven
+    # template. Restarting picks up new configurations of running instances.
+    def start_service(self):
+        self.__systemctl("restart", self.restart_units())
+
+    # Returns the managed instances.
+    def reload_units(self):
+        return [self.instance_name(instance) for instance in self.instances]
+
+    # Reloads all managed instances via `ExecReload`.
+    def reload_service(self):
+        self.__systemctl("reload-or-restart", self.reload_units())
+
+    # Returns the instance units of all managed instances enabled at boot.
+    def startup_units(self, root=None):
+        return self.__startup_units(self.instances)
+
+    # Enables all managed instances at boot.
+    def enable_service_at_startup(self, native=False, root=None):
+        self.enable_instances(native=native, root=root)
+
+    # Disables all managed instances at boot.
+    def disable_service_at_startup(self, native=False, root=None):
+        self.disable_instances(native=native, root=root)
+
+    # Recreates the [Install] symlinks of all managed instances.
+    def reenable_service_at_startup(self):
+        self.__systemctl("reenable", self.__startup_units(self.instances))
+
+    # Displays the status of all managed instances in a single call.
+    def status(self):
+        units = " ".join(self.instance_name(instance) for instance in self.instances)
+        run_command(f"systemctl status {units}", use_sudo=False)
+
+    # Writes per-instance overrides as drop-ins. `overrides` maps instances to
+    # `File` objects holding only the directives that differ from the template.
+    # Unchanged drop-ins are not rewritten, a single daemon-reload covers all
+    # of them, and only the instances whose change requires it are restarted
+    # or reloaded, in batched calls. With a coalescer, these actions are
+    # deferred and batched with others. `replace_lists` behaves as in
+    # `Service.write_drop_in`.
+    # Returns the units whose change requires a restart, even when they are not
+    # restarted here (e.g. with `auto_start=False`).
+    def override_instances(self, overrides, name="override", replace_lists=False):
+        directory = location_directory(self._service_location)
+        restart, reload = [], []
+        changed = False
+        for instance, file in overrides.items():
+            unit = self.instance_name(instance, file._file_type)
+            path = drop_in_path(directory, unit, name)
+            # A missing drop-in overrides nothing, so compare against an empty
+            # one and classify the individual directives.
+            previous = read_config(path) if os.path.isfile(path) else {}
+            config = file.get_config(requirement_check=False) or {}
+            if replace_lists:
+                config = reset_lists(config)
+
+            impacts = classify_changes(previous, config)
+            if not impacts:
+                continue
+
+            write_drop_in(directory, unit, config, name)
+            changed = True
+            if Impact.RESTART in impacts:
+                restart.append(unit)
+            elif Impact.RELOAD in impacts:
+                reload.append(unit)
+
+        needs_restart = restart
+        if not self._auto_start:
+            restart, reload = [], []
+
+        if self._coalescer is not None:
+            self._coalescer.submit_units(restart, reload, daemon_reload=changed)
+            return needs_restart
+
+        if changed:
+            run_command("systemctl daemon-reload")
+
+        self.__systemctl("restart", restart)
+        self.__systemctl("reload-or-restart", reload)
+        return needs_restart
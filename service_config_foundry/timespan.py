@@ -0,0 +1,59 @@
+import re
+
+# Seconds per time span unit accepted by systemd (see systemd.time(7)).
+TIMESPAN_UNITS = {
+    "usec": 1e-6,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "msec": 1e-3,
+    "ms": 1e-3,
+    "seconds": 1,
+    "second": 1,
+    "sec": 1,
+    "s": 1,
+    "": 1,
+    "minutes": 60,
+    "minute": 60,
+    "min": 60,
+    "m": 60,
+    "hours": 3600,
+    "hour": 3600,
+    "hr": 3600,
+    "h": 3600,
+    "days": 86400,
+    "day": 86400,
+    "d": 86400,
+    "weeks": 604800,
+    "week": 604800,
+    "w": 604800,
+    "months": 2629800,
+    "month": 2629800,
+    "M": 2629800,
+    "years": 31557600,
+    "year": 31557600,
+    "y": 31557600,
+}
+
+_TIMESPAN_PART = re.compile(r"(\d+(?:\.\d*)?|\.\d+)\s*([a-zA-Zµ]*)")
+
+
+# Parses a systemd time span into seconds. This module has no dependencies,
+# so that the service-side notify client stays cheap to import.
+# Example: "1h 30min" -> 5400.0, "500ms" -> 0.5, "90" -> 90.0
+def parse_timespan(text):
+    text = str(text).strip()
+    if text == "infinity":
+        return float("inf")
+
+    total, position = 0.0, 0
+    for match in _TIMESPAN_PART.finditer(text):
+        if text[position : match.start()].strip() or match.group(2) not in (
+            TIMESPAN_UNITS
+        ):
+            raise ValueError(f"Invalid time span: {text}")
+        total += float(match.group(1)) * TIMESPAN_UNITS[match.group(2)]
+        position = match.end()
+
+    if position == 0 or text[position:].strip():
+        raise ValueError(f"Invalid time span: {text}")
+    return total
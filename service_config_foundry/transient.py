@@ -0,0 +1,147 @@
+import shlex
+import subprocess
+import tempfile
+
+from .service_location import ServiceLocation
+from .utils import normalize_values
+
+# systemd-run options for the timer directives that have one. Other timer
+# directives are passed with `--timer-property=`.
+TIMER_OPTIONS = {
+    "OnActiveSec": "--on-active",
+    "OnBootSec": "--on-boot",
+    "OnStartupSec": "--on-startup",
+    "OnUnitActiveSec": "--on-unit-active",
+    "OnUnitInactiveSec": "--on-unit-inactive",
+    "OnCalendar": "--on-calendar",
+}
+
+
+# Returns the systemd-run arguments for the directives of a file: the
+# description, and every other directive as `--property=Key=value`. `skip`
+# lists directives handled by the caller.
+def _property_arguments(config, sections, skip=()):
+    arguments = []
+    for section in sections:
+        for key, value in (config or {}).get(section, {}).items():
+            if key in skip:
+                continue
+            for item in normalize_values(value):
+                if section == "Unit" and key == "Description":
+                    arguments.append(f"--description={item}")
+                else:
+                    arguments.append(f"--property={key}={item}")
+    return arguments
+
+
+# Builds the systemd-run command that launches a service's configuration as a
+# transient unit, without writing files or reloading systemd.
+# - By default, [Unit] and [Service] become the properties of a transient
+#   `name.service` running `ExecStart=`, and a configured [Timer] makes it
+#   timer-driven. The command returns once the unit is queued (`--no-block`).
+# - With `scope=True`, [Unit] and [Scope] become the properties of a
+#   transient `name.scope`, which runs `command` (or `ExecStart=`) in the
+#   foreground until it exits.
+# [Install] is ignored, since transient units cannot be enabled. Units are
+# garbage-collected once they stop, even when they failed (`--collect`), so
+# the name can be reused by the next launch.
+# Returns the command and whether it runs with sudo.
+def transient_command(service, scope=False, command=None):
+    service_config = service.service_file.get_config(requirement_check=False) or {}
+    command = command or service_config.get("Service", {}).get("ExecStart")
+    if not command or isinstance(command, list):
+        raise ValueError(f"Transient unit {service.name} needs exactly one command")
+
+    user = service._service_location == ServiceLocation.USER
+    arguments = ["systemd-run", f"--unit={service.name}", "--collect"]
+    if user:
+        arguments.append("--user")
+
+    if scope:
+        arguments.append("--scope")
+        scope_config = service.scope_file.get_config(requirement_check=False)
+        arguments += _property_arguments(scope_config, ["Unit", "Scope"])
+    else:
+        arguments.append("--no-block")
+        arguments += _property_arguments(
+            service_config, ["Unit", "Service"], skip=["ExecStart"]
+        )
+
+        timer_config = service.timer_file.get_config(requirement_check=False)
+        for key, value in (timer_config or {}).get("Timer", {}).items():
+            for item in normalize_values(value):
+                if key in TIMER_OPTIONS:
+                    arguments.append(f"{TIMER_OPTIONS[key]}={item}")
+                else:
+                    arguments.append(f"--timer-property={key}={item}")
+
+    # The command is split into arguments like systemd splits ExecStart=, and
+    # every argument is quoted, so that the calling shell passes shell syntax
+    # (variables, redirects, `;`) to the unit verbatim instead of running it.
+    arguments += ["--", *shlex.split(command)]
+    return " ".join(shlex.quote(argument) for argument in arguments), not user
+
+
+# Starts a command in its own session, like `run_command`, with its output
+# going to temporary files so that it never blocks on a full pipe while other
+# commands are collected. `start_new_session` is used instead of a
+# `preexec_fn`, which is not safe while other threads are running.
+# Returns the command, the process and its output files.
+def _spawn(line, use_sudo):
+    command = f"sudo {line}" if use_sudo else line
+    stdout = tempfile.TemporaryFile(mode="w+")
+    stderr = tempfile.TemporaryFile(mode="w+")
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        text=True,
+        stdout=stdout,
+        stderr=stderr,
+        start_new_session=True,
+    )
+    return command, process, stdout, stderr
+
+
+# Waits for a command started by `_spawn` and returns it as a completed
+# process, printing its error output like `run_command`.
+def _collect(command, process, stdout, stderr):
+    process.wait()
+    with stdout, stderr:
+        stdout.seek(0)
+        stderr.seek(0)
+        output, error = stdout.read(), stderr.read()
+
+    if error:
+        print(f"Error encountered while running command:\n{error}")
+    return subprocess.CompletedProcess(command, process.returncode, output, error)
+
+
+# Launches many services as transient units (see `transient_command`). All
+# commands are built first, so an invalid service launches nothing. Up to
+# `max_processes` systemd-run processes run at once without any threads, which
+# keeps foreground scopes from waiting for each other; further launches start
+# as the oldest ones finish. Processes still running when launching is
+# interrupted are terminated.
+# Returns the completed systemd-run processes, keyed by service name.
+def run_transient(services, scope=False, command=None, max_processes=16):
+    commands = {
+        service.name: transient_command(service, scope, command) for service in services
+    }
+    running, results = {}, {}
+    try:
+        for name, (line, use_sudo) in commands.items():
+            if len(running) >= max_processes:
+                oldest = next(iter(running))
+                results[oldest] = _collect(*running.pop(oldest))
+            running[name] = _spawn(line, use_sudo)
+
+        while running:
+            oldest = next(iter(running))
+            results[oldest] = _collect(*running.pop(oldest))
+    finally:
+        for _, process, stdout, stderr in running.values():
+            process.terminate()
+            process.wait()
+            stdout.close()
+            stderr.close()
+    return {name: results[name] for name in commands}
@@ -1,10 +1,17 @@
+import functools
 import os
 import signal
 import subprocess
 
+# Maximum number of units passed to a single systemctl invocation, which keeps
+# the command line well below the kernel's argument length limit.
+SYSTEMCTL_CHUNK_SIZE = 256
+
 
 # Converts a string from snake_case to CamelCase.
 # Example: "example_name" -> "ExampleName"
+# Results are cached since the same directive names are converted repeatedly.
+@functools.lru_cache(maxsize=None)
 def convert_to_camel_case(name):
     # Split on underscores, capitalize each part, and join them back together.
     return "".join([i.capitalize() for i in name.split("_")])
@@ -12,6 +19,7 @@ def convert_to_camel_case(name):
 
 # Converts a string from CamelCase to snake_case.
 # Example: "ExampleName" -> "example_name"
+@functools.lru_cache(maxsize=None)
 def convert_to_snake_case(name):
     # Iterate through each character, prepend an underscore if the character is
     # uppercase, and convert it to lowercase. Strip any leading underscores.
@@ -49,6 +57,29 @@ def merge_dicts(dict1, dict2):
     return dict1
 
 
+# Normalizes a directive value into the list of strings written to a unit file.
+# - `None` becomes an empty list.
+# - Scalars become a single-element list.
+# - Booleans are lowercased, since systemd expects `true`/`false`.
+# Example: [True, "a"] -> ["true", "a"]
+def normalize_values(values):
+    if values is None:
+        return []
+
+    if not isinstance(values, list):
+        values = [values]
+
+    return [
+        str(value).lower() if type(value) is bool else str(value) for value in values
+    ]
+
+
+# Splits a list into consecutive chunks of at most `size` items.
+# Example: chunks([1, 2, 3], 2) -> [[1, 2], [3]]
+def chunks(items, size):
+    return [items[index : index + size] for index in range(0, len(items), size)]
+
+
 def run_command(command, use_sudo=True):
     """Run a shell command with proper signal handling and return the result."""
     if use_sudo:
@@ -27,7 +27,11 @@ setup(
     packages=find_packages(),  # Automatically finds packages in the project
     python_requires=">=3.8",
     extras_require={
+        "planning": [
+            "numpy>=1.20",
+        ],
         "test": [
+            "numpy>=1.20",
             "pytest>=7.0.0",
             "pytest-mock>=3.10.0",
             "pytest-cov>=4.0.0",
@@ -36,6 +40,7 @@ setup(
             "isort>=5.12.0",
         ],
         "dev": [
+            "numpy>=1.20",
             "pytest>=7.0.0",
             "pytest-mock>=3.10.0",
             "pytest-cov>=4.0.0",
@@ -0,0 +1,142 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+from service_config_foundry import (
+    File,
+    FileType,
+    Impact,
+    Service,
+    ServiceLocation,
+    TemplateService,
+)
+from service_config_foundry.batch import apply_drop_ins, apply_services, systemctl
+from service_config_foundry.config_parser import read_config
+
+batch_module = sys.modules[apply_services.__module__]
+
+
+def make_service(name, **options):
+    service = Service(name, service_location=ServiceLocation.TEST, **options)
+    service.service_file.service.exec_start = f"/usr/bin/{name}"
+    return service
+
+
+class TestSystemctl:
+    """Test cases for batched systemctl calls."""
+
+    @patch.object(batch_module, "run_command")
+    def test_chunks_units(self, mock_run_command):
+        """Test that many units are split into chunked calls."""
+        systemctl("restart", [f"u{i}.service" for i in range(300)])
+        assert mock_run_command.call_count == 2
+
+    @patch.object(batch_module, "run_command")
+    def test_no_units_no_call(self, mock_run_command):
+        """Test that nothing runs without units."""
+        systemctl("restart", [])
+        mock_run_command.assert_not_called()
+
+
+class TestApplyServices:
+    """Test cases for writing many services in one batch."""
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_single_daemon_reload(
+        self, mock_run_command, mock_service_run_command, mock_service_location
+    ):
+        """Test that new services share one daemon-reload and one restart."""
+        services = [make_service(f"app{i}", enable_at_startup=True) for i in range(3)]
+
+        impacts = apply_services(services)
+
+        assert set(impacts) == {"app0", "app1", "app2"}
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart app0 app1 app2"),
+            call("systemctl enable app0 app1 app2"),
+        ]
+        mock_service_run_command.assert_not_called()
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_only_changed_services_restart(
+        self, mock_run_command, _, mock_service_location
+    ):
+        """Test that unchanged services are neither reloaded nor restarted."""
+        services = [make_service("app0"), make_service("app1")]
+        apply_services(services)
+        mock_run_command.reset_mock()
+
+        services[1].service_file.service.c_p_u_weight = 50
+        apply_services(services)
+
+        assert mock_run_command.call_args_list == [call("systemctl daemon-reload")]
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_unchanged_services_without_reload(
+        self, mock_run_command, _, mock_service_location
+    ):
+        """Test that rewriting identical services runs nothing."""
+        services = [make_service("app0", auto_start=False)]
+        apply_services(services)
+        mock_run_command.reset_mock()
+
+        apply_services(services)
+        mock_run_command.assert_not_called()
+
+        apply_services(services, daemon_reload=True)
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_template_instances(self, mock_run_command, _, mock_service_location):
+        """Test that template services contribute their instances."""
+        template = TemplateService(
+            "worker", instances=[1, 2], service_location=ServiceLocation.TEST
+        )
+        template.service_file.service.exec_start = "/usr/bin/worker %i"
+
+        apply_services([template, make_service("app")])
+
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart worker@1.service worker@2.service app"),
+        ]
+
+
+class TestApplyDropIns:
+    """Test cases for writing drop-ins of many services in one batch."""
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_drop_ins_share_actions(self, mock_run_command, _, mock_service_location):
+        """Test that drop-ins share one daemon-reload and batched restarts."""
+        services = [make_service("app0"), make_service("app1")]
+        apply_services(services)
+        mock_run_command.reset_mock()
+
+        drop_ins = []
+        for service in services:
+            file = File(FileType.SERVICE)
+            file.service.nice = 5
+            drop_ins.append((service, file))
+        impacts = apply_drop_ins(drop_ins, "tuning")
+
+        assert impacts == {"app0": {Impact.RESTART}, "app1": {Impact.RESTART}}
+        assert read_config(
+            os.path.join(mock_service_location, "app0.service.d", "tuning.conf")
+        ) == {"Service": {"Nice": ["5"]}}
+        assert read_config(os.path.join(mock_service_location, "app0.service")) == {
+            "Service": {"ExecStart": ["/usr/bin/app0"]}
+        }
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart app0 app1"),
+        ]
+
+        mock_run_command.reset_mock()
+        apply_drop_ins(drop_ins, "tuning")
+        mock_run_command.assert_not_called()
@@ -0,0 +1,266 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation, SliceTree
+from service_config_foundry.budget import (
+    BudgetPlanner,
+    HostCapacity,
+    parse_size,
+    plan_budgets,
+    read_host_capacity,
+)
+from service_config_foundry.config_parser import read_config
+
+np = pytest.importorskip("numpy")
+
+batch_module = sys.modules["service_config_foundry.batch"]
+
+GIB = 2**30
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    """Create a fixture root with a recorded /proc of a 4-CPU, 16 GiB host."""
+    (tmp_path / "proc").mkdir()
+    (tmp_path / "proc" / "cpuinfo").write_text(
+        "".join(f"processor\t: {cpu}\nmodel name\t: Test CPU\n\n" for cpu in range(4))
+    )
+    (tmp_path / "proc" / "meminfo").write_text(
+        "MemTotal:       16777216 kB\nMemFree:         1024 kB\n"
+    )
+    return str(tmp_path)
+
+
+class TestCapacity:
+    """Test cases for reading host capacity."""
+
+    def test_parse_size(self):
+        """Test parsing sizes with and without suffixes."""
+        assert parse_size("512M") == 512 * 2**20
+        assert parse_size("2G") == 2 * GIB
+        assert parse_size(4096) == 4096
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+    def test_read_host_capacity(self, proc_root):
+        """Test reading CPUs and memory from a fixture root."""
+        capacity = read_host_capacity(proc_root)
+        assert capacity.cpus == 4
+        assert capacity.memory == 16 * GIB
+
+
+class TestPlanBudgets:
+    """Test cases for the vectorized budget arithmetic."""
+
+    def test_shares_follow_weights(self):
+        """Test that spare capacity is split in proportion to the weights."""
+        plan = plan_budgets([100, 300], cpus=10, memory=40 * GIB, reserve=0.2)
+
+        assert plan["CPUQuota"].tolist() == [[200, 600]]
+        assert plan["CPUWeight"].tolist() == [[50, 150]]
+        assert plan["MemoryHigh"].tolist() == [[8 * GIB, 24 * GIB]]
+        assert plan["MemoryMax"].tolist() == [[10 * GIB, 30 * GIB]]
+        assert plan["feasible"].tolist() == [True]
+
+    def test_minimums_come_first(self):
+        """Test that minimums are granted before the weighted shares."""
+        plan = plan_budgets(
+            [100, 100], cpus=4, memory=8 * GIB, cpu_minimums=[2, 0], reserve=0
+        )
+        assert plan["CPUQuota"].tolist() == [[300, 100]]
+
+    def test_many_host_shapes(self):
+        """Test planning thousands of units for several host shapes at once."""
+        weights = np.arange(1, 5001)
+        plan = plan_budgets(
+            weights,
+            cpus=[8, 64, 2],
+            memory=[32 * GIB, 512 * GIB, 4 * GIB],
+            cpu_minimums=np.full(5000, 0.001),
+        )
+
+        assert plan["CPUQuota"].shape == (3, 5000)
+        assert plan["feasible"].tolist() == [True, True, False]
+        assert (plan["MemoryHigh"][1].sum()) <= 512 * GIB * 0.9
+        assert (np.diff(plan["CPUQuota"][1]) >= 0).all()
+
+    def test_groups_share_their_own_capacity(self):
+        """Test that every group splits only its own capacity."""
+        plan = plan_budgets(
+            [100, 300, 100, 100, 100],
+            cpus=[[4, 3], [8, 1]],
+            memory=[[4 * GIB, 3 * GIB], [8 * GIB, 1 * GIB]],
+            cpu_minimums=[0, 0, 0, 0, 2],
+            reserve=0,
+            groups=[0, 0, 1, 1, 1],
+        )
+
+        assert plan["CPUQuota"].tolist() == [
+            [100, 300, 33, 33, 233],
+            [200, 600, 1, 1, 200],
+        ]
+        assert plan["CPUWeight"].tolist()[0] == [50, 150, 100, 100, 100]
+        assert plan["MemoryHigh"][0, 2:].sum() == 3 * GIB
+        assert plan["feasible"].tolist() == [True, False]
+
+    @pytest.mark.parametrize("weights", [[0, 0], [100, 0], [100, -1]])
+    def test_weights_must_be_positive(self, weights):
+        """Test that zero or negative weights are rejected."""
+        with pytest.raises(ValueError, match="Weights must be positive"):
+            plan_budgets(weights, cpus=4, memory=8 * GIB)
+
+
+class TestBudgetPlanner:
+    """Test cases for planning and writing budgets."""
+
+    def test_infeasible_host(self):
+        """Test that minimums exceeding the host raise a ValueError."""
+        planner = BudgetPlanner(HostCapacity(2, "4G"))
+        planner.add(Service("db"), cpu_minimum=4)
+        with pytest.raises(ValueError, match="exceed the capacity"):
+            planner.directives()
+
+    def test_small_memory_is_rounded_up(self):
+        """Test that budgets below one megabyte do not become "0M"."""
+        planner = BudgetPlanner(HostCapacity(1, "3M"), reserve=0)
+        for name in ["a", "b", "c", "d"]:
+            planner.add(Service(name))
+
+        (_, directives), *_ = planner.directives()
+        assert directives["memory_high"] == "1M"
+        assert directives["memory_max"] == "1M"
+
+    def test_slice_requires_tree(self):
+        """Test that slice targets need a SliceTree to be written."""
+        planner = BudgetPlanner(HostCapacity(2, "4G"))
+        planner.add("batch")
+        with pytest.raises(ValueError, match="requires a SliceTree"):
+            planner.write()
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_write_services_and_slices(
+        self, mock_run_command, _, mock_service_location
+    ):
+        """Test writing services and slices in one batch."""
+        services = []
+        for name in ["api", "worker"]:
+            service = Service(name, service_location=ServiceLocation.TEST)
+            service.service_file.service.exec_start = f"/usr/bin/{name}"
+            services.append(service)
+
+        tree = SliceTree(ServiceLocation.TEST)
+        planner = BudgetPlanner(HostCapacity(10, "40G"), reserve=0)
+        planner.add(services[0], weight=200, memory_minimum="4G")
+        planner.add(services[1], weight=100)
+        planner.add("batch", weight=100)
+        planner.write(tree)
+
+        api = services[0].service_file.service
+        assert api.c_p_u_quota == "500%"
+        assert api.c_p_u_weight == 150
+        assert api.memory_high == "22528M"
+        assert tree.add_slice("batch").c_p_u_quota == "250%"
+        assert read_config(
+            os.path.join(mock_service_location, "api.service.d", "budget.conf")
+        ) == {
+            "Service": {
+                "CPUQuota": ["500%"],
+                "CPUWeight": ["150"],
+                "MemoryHigh": ["22528M"],
+                "MemoryMax": ["28160M"],
+            }
+        }
+        path = os.path.join(mock_service_location, "batch.slice.d", "budget.conf")
+        assert read_config(path)["Slice"]["CPUQuota"] == ["250%"]
+        # Resource-control changes only need a daemon-reload.
+        assert mock_run_command.call_args_list == [call("systemctl daemon-reload")]
+
+        mock_run_command.reset_mock()
+        planner.write(tree)
+        mock_run_command.assert_not_called()
+
+    @patch.object(batch_module, "run_command")
+    def test_write_keeps_other_directives(self, _, mock_service_location):
+        """Test that directives on disk that were never loaded are kept."""
+        path = os.path.join(mock_service_location, "api.service")
+        with open(path, "w") as file:
+            file.write("[Service]\nExecStart=/usr/bin/api\nEnvironment=MODE=prod\n")
+
+        planner = BudgetPlanner(HostCapacity(2, "4G"))
+        planner.add(Service("api", service_location=ServiceLocation.TEST))
+        planner.write()
+
+        assert read_config(path) == {
+            "Service": {"ExecStart": ["/usr/bin/api"], "Environment": ["MODE=prod"]}
+        }
+
+    def test_members_share_their_slice(self):
+        """Test that services in a planned slice share the slice's budget."""
+        tree = SliceTree(ServiceLocation.TEST)
+        api, worker = Service("api"), Service("worker")
+        tree.assign(api, "prod")
+        tree.assign(worker, "prod/jobs")
+
+        planner = BudgetPlanner(HostCapacity(10, "40G"), reserve=0)
+        planner.add("prod")
+        planner.add("dev")
+        planner.add(api, weight=300)
+        planner.add(worker, weight=100)
+        directives = dict(
+            (target if isinstance(target, str) else target.name, values)
+            for target, values in planner.directives()
+        )
+
+        assert directives["prod"]["c_p_u_quota"] == "500%"
+        assert directives["prod"]["memory_high"] == "20480M"
+        assert directives["api"]["c_p_u_quota"] == "375%"
+        assert directives["api"]["memory_high"] == "15360M"
+        assert directives["api"]["c_p_u_weight"] == 150
+        assert directives["worker"]["c_p_u_quota"] == "125%"
+        assert directives["worker"]["memory_max"] == "6400M"
+
+    def test_nested_slices(self):
+        """Test that a nested slice is planned within its parent slice."""
+        planner = BudgetPlanner(HostCapacity(8, "16G"), reserve=0.5)
+        planner.add("prod/db", weight=100)
+        planner.add("prod/web", weight=300)
+        planner.add("prod")
+
+        plan = planner.plan()
+
+        assert plan["CPUQuota"].tolist() == [[100, 300, 400]]
+        assert plan["MemoryHigh"][0, 2] == 8 * GIB
+        assert plan["MemoryHigh"][0, :2].sum() == 8 * GIB
+
+    def test_sibling_slices(self):
+        """Test that the members of sibling slices share only their slice."""
+        planner = BudgetPlanner(HostCapacity(8, "16G"), reserve=0)
+        planner.add("prod", weight=300)
+        planner.add("dev", weight=100)
+        planner.add("prod/db")
+        planner.add("prod/web")
+        planner.add("dev/ci", weight=100)
+        planner.add("dev/docs", weight=300)
+        planner.add("prod/db/replica")
+
+        plan = planner.plan()
+
+        assert plan["CPUQuota"].tolist() == [[600, 200, 300, 300, 50, 150, 300]]
+        assert plan["CPUWeight"].tolist() == [[150, 50, 100, 100, 50, 150, 100]]
+
+    def test_member_minimums_exceed_slice(self):
+        """Test that members needing more than their slice are infeasible."""
+        service = Service("db")
+        service.service_file.service.slice = "prod.slice"
+
+        for prod_minimum, feasible in [(0, False), (6, True)]:
+            planner = BudgetPlanner(HostCapacity(8, "16G"), reserve=0)
+            planner.add("prod", cpu_minimum=prod_minimum)
+            planner.add("dev")
+            planner.add(service, cpu_minimum=6)
+
+            assert planner.plan()["feasible"].tolist() == [feasible]
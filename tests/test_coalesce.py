@@ -0,0 +1,150 @@
+import sys
+import threading
+from unittest.mock import call, patch
+
+from service_config_foundry import (
+    File,
+    FileType,
+    RestartCoalescer,
+    Service,
+    ServiceLocation,
+    TemplateService,
+)
+from service_config_foundry.batch import apply_impacts
+
+batch_module = sys.modules[apply_impacts.__module__]
+
+
+def make_service(name, coalescer, **options):
+    service = Service(
+        name, service_location=ServiceLocation.TEST, coalescer=coalescer, **options
+    )
+    service.service_file.service.exec_start = f"/usr/bin/{name}"
+    return service
+
+
+class TestRestartCoalescer:
+    """Test cases for coalescing lifecycle actions."""
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_repeated_replace_restarts_once(
+        self, mock_run_command, mock_service_run_command, mock_service_location
+    ):
+        """Test that several writes of one service lead to a single restart."""
+        coalescer = RestartCoalescer(window=60)
+        service = make_service("web", coalescer)
+        service.replace()
+        service.service_file.service.exec_start = "/usr/bin/web --v2"
+        service.replace()
+        service.service_file.service.environment = "MODE=fast"
+        service.replace()
+
+        mock_run_command.assert_not_called()
+        mock_service_run_command.assert_not_called()
+        assert coalescer.pending() == ["web"]
+
+        coalescer.flush()
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart web"),
+        ]
+        assert coalescer.pending() == []
+
+    @patch.object(batch_module, "run_command")
+    def test_batches_services(self, mock_run_command, mock_service_location):
+        """Test that pending services share one daemon-reload and one restart."""
+        with RestartCoalescer(window=60) as coalescer:
+            for name in ["a", "b", "c"]:
+                make_service(name, coalescer).create()
+
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart a b c"),
+        ]
+
+    @patch.object(batch_module, "run_command")
+    def test_restart_supersedes_reload(self, mock_run_command, mock_service_location):
+        """Test that a reload and a restart of one unit become a restart."""
+        coalescer = RestartCoalescer(window=60)
+        service = make_service("web", coalescer)
+        service.service_file.service.exec_reload = "/bin/kill -HUP $MAINPID"
+        service.replace()
+        coalescer.flush()
+        mock_run_command.reset_mock()
+
+        service.service_file.service.exec_start = "/usr/bin/web --v2"
+        service.replace()
+        service.service_file.service.exec_reload = "/bin/kill -USR1 $MAINPID"
+        service.replace()
+        coalescer.flush()
+        assert call("systemctl restart web") in mock_run_command.call_args_list
+        assert all(
+            "reload-or-restart" not in args[0]
+            for args, _ in mock_run_command.call_args_list
+        )
+
+    @patch.object(batch_module, "run_command")
+    def test_flushes_after_window(self, mock_run_command, mock_service_location):
+        """Test that pending actions are applied once the window passes."""
+        coalescer = RestartCoalescer(window=0.01)
+        make_service("web", coalescer).create()
+        assert coalescer.wait(timeout=5)
+
+        assert coalescer.pending() == []
+        assert call("systemctl restart web") in mock_run_command.call_args_list
+
+    @patch.object(batch_module, "run_command")
+    def test_wait_covers_running_flush(self, mock_run_command, mock_service_location):
+        """Test that wait() returns only after a running flush finished."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_run_command(command):
+            started.set()
+            release.wait(5)
+
+        mock_run_command.side_effect = slow_run_command
+        coalescer = RestartCoalescer(window=0.01)
+        make_service("web", coalescer).create()
+        assert started.wait(5)
+        assert coalescer.pending() == []
+        assert coalescer.wait(timeout=0.05) is False
+
+        release.set()
+        assert coalescer.wait(timeout=5)
+
+    @patch("service_config_foundry.template.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_instance_overrides(
+        self, mock_run_command, mock_template_run_command, mock_service_location
+    ):
+        """Test that per-instance drop-ins share one reload and restart."""
+        coalescer = RestartCoalescer(window=60)
+        template = TemplateService(
+            "worker",
+            instances=[1, 2],
+            service_location=ServiceLocation.TEST,
+            coalescer=coalescer,
+        )
+        for instance in [1, 2]:
+            file = File(FileType.SERVICE)
+            file.service.exec_start = f"/usr/bin/worker --shard {instance}"
+            template.override_instances({instance: file})
+            file = File(FileType.SERVICE)
+            file.service.c_p_u_affinity = instance
+            template.override_instances({instance: file}, name="placement")
+
+        mock_template_run_command.assert_not_called()
+        assert coalescer.pending() == ["worker@1.service", "worker@2.service"]
+
+        coalescer.flush()
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart worker@1.service worker@2.service"),
+        ]
+
+    @patch.object(batch_module, "run_command")
+    def test_flush_without_pending(self, mock_run_command):
+        """Test that flushing with nothing pending does nothing."""
+        assert RestartCoalescer().flush() == {}
+        mock_run_command.assert_not_called()
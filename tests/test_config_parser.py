@@ -1,7 +1,7 @@
 import os
 import tempfile
 
-from service_config_foundry.config_parser import CaseSensitiveConfigParser
+from service_config_foundry.config_parser import CaseSensitiveConfigParser, read_config
 
 
 class TestCaseSensitiveConfigParser:
@@ -176,3 +176,20 @@ After=multi-user.target
 
             # Clean up
             os.unlink(f.name)
+
+
+class TestReadConfig:
+    """Test cases for read_config function."""
+
+    def test_read_config_lists_values(self, tmp_path):
+        """Test that every directive maps to its list of values."""
+        path = tmp_path / "test.service"
+        path.write_text(
+            "[Unit]\nDescription=Test\n\n[Service]\nExecStartPre=/bin/a\n"
+            "ExecStartPre=/bin/b\n"
+        )
+
+        assert read_config(str(path)) == {
+            "Unit": {"Description": ["Test"]},
+            "Service": {"ExecStartPre": ["/bin/a", "/bin/b"]},
+        }
@@ -0,0 +1,120 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from service_config_foundry import DependencyGraph, Service
+from service_config_foundry.critical_chain import (
+    critical_chain,
+    durations_from_show,
+    measure_durations,
+)
+
+critical_chain_module = sys.modules[critical_chain.__module__]
+
+# Recorded output of `systemctl show -p Id,InactiveExitTimestampMonotonic,
+# ActiveEnterTimestampMonotonic` for the units below.
+RECORDED_SHOW = """Id=db.service
+InactiveExitTimestampMonotonic=1000000
+ActiveEnterTimestampMonotonic=5000000
+
+Id=cache.service
+InactiveExitTimestampMonotonic=1000000
+ActiveEnterTimestampMonotonic=2000000
+
+Id=app.service
+InactiveExitTimestampMonotonic=5000000
+ActiveEnterTimestampMonotonic=7500000
+
+Id=metrics.service
+InactiveExitTimestampMonotonic=0
+ActiveEnterTimestampMonotonic=0
+"""
+
+
+def make_service(name, after=None):
+    service = Service(name)
+    service.service_file.service.exec_start = f"/usr/bin/{name}"
+    service.service_file.unit.after = after
+    service.service_file.install.wanted_by = "multi-user.target"
+    return service
+
+
+@pytest.fixture
+def graph():
+    return DependencyGraph.from_services(
+        [
+            make_service("db"),
+            make_service("cache"),
+            make_service("app", after=["db.service", "cache.service"]),
+            make_service("metrics"),
+        ]
+    )
+
+
+class TestDurations:
+    """Test cases for reading activation durations."""
+
+    def test_durations_from_show(self):
+        """Test parsing recorded timestamps into durations."""
+        assert durations_from_show(RECORDED_SHOW) == {
+            "db.service": 4.0,
+            "cache.service": 1.0,
+            "app.service": 2.5,
+        }
+
+    @patch.object(critical_chain_module, "run_command")
+    def test_measure_durations_single_call(self, mock_run_command):
+        """Test that all units are measured with one systemctl call."""
+        mock_run_command.return_value = MagicMock(stdout=RECORDED_SHOW)
+        durations = measure_durations(["db.service", "cache.service"])
+        mock_run_command.assert_called_once_with(
+            "systemctl show -p Id,InactiveExitTimestampMonotonic,"
+            "ActiveEnterTimestampMonotonic db.service cache.service",
+            use_sudo=False,
+        )
+        assert durations["db.service"] == 4.0
+
+
+class TestCriticalChain:
+    """Test cases for the critical-chain analysis."""
+
+    def test_critical_path(self, graph):
+        """Test that the slowest chain to the target is found."""
+        chain = critical_chain(graph, durations_from_show(RECORDED_SHOW))
+        assert chain.path == ["db.service", "app.service", "multi-user.target"]
+        assert chain.duration == 6.5
+
+    def test_slack(self, graph):
+        """Test that slack is reported per unit."""
+        chain = critical_chain(graph, durations_from_show(RECORDED_SHOW))
+        assert chain.slack["db.service"] == 0
+        assert chain.slack["app.service"] == 0
+        assert chain.slack["cache.service"] == 3.0
+        assert chain.slack["metrics.service"] == 6.5
+
+    def test_earliest_times(self, graph):
+        """Test earliest start and finish times."""
+        chain = critical_chain(graph, {"db.service": 4.0, "app.service": 2.5})
+        assert chain.earliest_start["app.service"] == 4.0
+        assert chain.earliest_finish["app.service"] == 6.5
+
+    def test_unknown_target(self, graph):
+        """Test that a target outside the graph raises an error."""
+        with pytest.raises(ValueError, match="graphical.target"):
+            critical_chain(graph, {}, target="graphical.target")
+
+    def test_long_chain_scans_graph_once(self):
+        """Test that predecessors come from one reverse map, not per-unit scans."""
+        graph = DependencyGraph()
+        for index in range(2000):
+            graph.add_ordering(f"u{index}.service", f"u{index + 1}.service")
+        graph.add_ordering("u2000.service", "multi-user.target")
+
+        with patch.object(
+            DependencyGraph, "predecessors", side_effect=AssertionError("rescan")
+        ):
+            chain = critical_chain(graph, {"u0.service": 1.0, "u1999.service": 2.0})
+
+        assert len(chain.path) == 2002
+        assert chain.duration == 3.0
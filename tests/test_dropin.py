@@ -0,0 +1,241 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+from service_config_foundry import File, FileType, Service, ServiceLocation
+from service_config_foundry.dropin import (
+    drop_in_path,
+    effective_config,
+    is_list_directive,
+    merge_drop_in,
+    read_drop_ins,
+    remove_drop_in,
+    reset_lists,
+    write_drop_in,
+)
+
+service_module = sys.modules[Service.__module__]
+
+
+class TestListDirectives:
+    """Test cases for list directive detection."""
+
+    def test_list_directives(self):
+        """Test that accumulating directives are recognized."""
+        assert is_list_directive("Service", "ExecStart")
+        assert is_list_directive("Unit", "After")
+        assert is_list_directive("Unit", "ConditionPathExists")
+
+    def test_cpu_affinity_is_list(self):
+        """Test that CPUAffinity masks merge across drop-ins."""
+        assert is_list_directive("Service", "CPUAffinity")
+
+    def test_single_value_directives(self):
+        """Test that single-value directives are not lists."""
+        assert not is_list_directive("Unit", "Description")
+        assert not is_list_directive("Service", "Type")
+
+    def test_reset_lists(self):
+        """Test that list directives get a leading empty assignment."""
+        config = {"Service": {"ExecStart": "/usr/bin/new", "Type": "simple"}}
+        assert reset_lists(config) == {
+            "Service": {"ExecStart": ["", "/usr/bin/new"], "Type": "simple"}
+        }
+
+    def test_reset_lists_keeps_existing_reset(self):
+        """Test that an explicit reset is not duplicated."""
+        config = {"Service": {"ExecStart": ["", "/usr/bin/new"]}}
+        assert reset_lists(config) == config
+
+
+class TestMergeDropIn:
+    """Test cases for merge_drop_in function."""
+
+    def test_list_directives_accumulate(self):
+        """Test that list directives are appended to."""
+        config = {"Unit": {"After": ["network.target"]}}
+        fragment = {"Unit": {"After": ["db.service"]}}
+        assert merge_drop_in(config, fragment) == {
+            "Unit": {"After": ["network.target", "db.service"]}
+        }
+
+    def test_empty_assignment_resets_list(self):
+        """Test that an empty assignment clears the accumulated list."""
+        config = {"Service": {"ExecStart": ["/usr/bin/old"]}}
+        fragment = {"Service": {"ExecStart": ["", "/usr/bin/new"]}}
+        assert merge_drop_in(config, fragment) == {
+            "Service": {"ExecStart": ["/usr/bin/new"]}
+        }
+
+    def test_cpu_affinity_merges_and_resets(self):
+        """Test that CPUAffinity accumulates unless a drop-in resets it."""
+        config = {"Service": {"CPUAffinity": ["0-3"]}}
+        assert merge_drop_in(config, {"Service": {"CPUAffinity": ["4"]}}) == {
+            "Service": {"CPUAffinity": ["0-3", "4"]}
+        }
+        assert merge_drop_in(config, {"Service": {"CPUAffinity": ["", "4"]}}) == {
+            "Service": {"CPUAffinity": ["4"]}
+        }
+
+    def test_single_value_last_wins(self):
+        """Test that single-value directives are overridden."""
+        config = {"Unit": {"Description": ["Old"]}}
+        fragment = {"Unit": {"Description": ["New"]}}
+        assert merge_drop_in(config, fragment) == {"Unit": {"Description": ["New"]}}
+
+    def test_empty_single_value_removes_directive(self):
+        """Test that an empty single-value assignment removes the directive."""
+        config = {"Service": {"User": ["app"], "Type": ["simple"]}}
+        fragment = {"Service": {"User": [""]}}
+        assert merge_drop_in(config, fragment) == {"Service": {"Type": ["simple"]}}
+
+    def test_inputs_unchanged(self):
+        """Test that merging does not modify its inputs."""
+        config = {"Unit": {"After": ["a.service"]}}
+        merge_drop_in(config, {"Unit": {"After": ["b.service"]}})
+        assert config == {"Unit": {"After": ["a.service"]}}
+
+
+class TestDropInFiles:
+    """Test cases for reading and writing drop-in fragments."""
+
+    def test_write_and_read_drop_ins(self, tmp_path):
+        """Test that fragments are written and read back in order."""
+        directory = str(tmp_path)
+        write_drop_in(directory, "app.service", {"Unit": {"After": "b"}}, "20-b")
+        write_drop_in(directory, "app.service", {"Unit": {"After": "a"}}, "10-a")
+
+        assert read_drop_ins(directory, "app.service") == [
+            ("10-a", {"Unit": {"After": ["a"]}}),
+            ("20-b", {"Unit": {"After": ["b"]}}),
+        ]
+
+    def test_write_drop_in_replace_lists(self, tmp_path):
+        """Test that replace_lists writes an empty assignment first."""
+        path = write_drop_in(
+            str(tmp_path),
+            "app.service",
+            {"Service": {"ExecStart": "/usr/bin/new"}},
+            replace_lists=True,
+        )
+        with open(path) as f:
+            assert f.read() == "[Service]\nExecStart=\nExecStart=/usr/bin/new\n\n"
+
+    def test_effective_config(self, tmp_path):
+        """Test that the unit file and drop-ins are merged."""
+        directory = str(tmp_path)
+        with open(os.path.join(directory, "app.service"), "w") as f:
+            f.write("[Service]\nExecStart=/usr/bin/old\nUser=app\n")
+        write_drop_in(
+            directory,
+            "app.service",
+            {"Service": {"ExecStart": ["", "/usr/bin/new"]}},
+        )
+
+        assert effective_config(directory, "app.service") == {
+            "Service": {"ExecStart": ["/usr/bin/new"], "User": ["app"]}
+        }
+
+    def test_remove_drop_in(self, tmp_path):
+        """Test that removing the last fragment removes the directory."""
+        directory = str(tmp_path)
+        path = write_drop_in(directory, "app.service", {"Unit": {"After": "a"}})
+
+        assert remove_drop_in(directory, "app.service")
+        assert not os.path.exists(os.path.dirname(path))
+        assert not remove_drop_in(directory, "app.service")
+
+    def test_drop_in_path(self):
+        """Test drop-in path generation."""
+        assert drop_in_path("/etc/systemd/system", "app.service", "10-cpu") == (
+            "/etc/systemd/system/app.service.d/10-cpu.conf"
+        )
+
+
+class TestServiceDropIns:
+    """Test cases for the Service drop-in API."""
+
+    def _create(self, directory):
+        with open(os.path.join(directory, "app.service"), "w") as f:
+            f.write("[Service]\nExecStart=/usr/bin/app\n")
+
+    @patch.object(service_module, "run_command")
+    def test_write_drop_in_leaves_unit_file(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that a patch only writes the drop-in."""
+        self._create(mock_service_location)
+        unit_path = os.path.join(mock_service_location, "app.service")
+        mtime = os.stat(unit_path).st_mtime_ns
+
+        service = Service("app", service_location=ServiceLocation.TEST)
+        patch_file = File(FileType.SERVICE)
+        patch_file.unit.description = "Patched"
+        service.write_drop_in(patch_file, "10-description")
+
+        assert os.stat(unit_path).st_mtime_ns == mtime
+        assert service.effective_config(service.service_file) == {
+            "Service": {"ExecStart": ["/usr/bin/app"]},
+            "Unit": {"Description": ["Patched"]},
+        }
+        # A description only needs a daemon-reload.
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
+
+    @patch.object(service_module, "run_command")
+    def test_write_drop_in_replacing_exec_start_restarts(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that a drop-in replacing ExecStart restarts the service."""
+        self._create(mock_service_location)
+
+        service = Service("app", service_location=ServiceLocation.TEST)
+        patch_file = File(FileType.SERVICE)
+        patch_file.service.exec_start = "/usr/bin/new"
+        service.write_drop_in(patch_file, replace_lists=True)
+
+        assert service.effective_config(service.service_file) == {
+            "Service": {"ExecStart": ["/usr/bin/new"]}
+        }
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart app"),
+        ]
+
+    @patch.object(service_module, "run_command")
+    def test_replace_keeps_and_delete_removes_drop_ins(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that replace keeps drop-ins while delete removes them."""
+        self._create(mock_service_location)
+        service = Service(
+            "app", service_location=ServiceLocation.TEST, auto_start=False
+        )
+        patch_file = File(FileType.SERVICE)
+        patch_file.unit.description = "Patched"
+        service.write_drop_in(patch_file)
+
+        service.service_file.service.exec_start = "/usr/bin/app"
+        service.replace()
+        assert [name for name, _ in service.read_drop_ins(service.service_file)] == [
+            "override"
+        ]
+
+        service.delete()
+        assert os.listdir(mock_service_location) == []
+
+    @patch.object(service_module, "run_command")
+    def test_remove_drop_in(self, mock_run_command, mock_service_location):
+        """Test removing a drop-in through the service."""
+        self._create(mock_service_location)
+        service = Service(
+            "app", service_location=ServiceLocation.TEST, auto_start=False
+        )
+        patch_file = File(FileType.SERVICE)
+        patch_file.unit.description = "Patched"
+        service.write_drop_in(patch_file)
+        mock_run_command.reset_mock()
+
+        service.remove_drop_in(patch_file)
+
+        assert service.read_drop_ins(service.service_file) == []
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
@@ -0,0 +1,274 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation
+from service_config_foundry.enablement import (
+    disable_units,
+    enable_units,
+    location_directory,
+    unit_file_name,
+)
+
+enablement_module = sys.modules[enable_units.__module__]
+
+
+def write_unit(directory, name, content):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+class TestHelpers:
+    """Test cases for enablement helpers."""
+
+    def test_unit_file_name_defaults_to_service(self):
+        """Test that names without a type become service units."""
+        assert unit_file_name("example") == "example.service"
+        assert unit_file_name("example.timer") == "example.timer"
+
+    def test_location_directory_with_root(self):
+        """Test that an offline root prefixes the location directory."""
+        assert (
+            location_directory(ServiceLocation.GLOBAL, "/mnt/image")
+            == "/mnt/image/etc/systemd/system"
+        )
+        assert location_directory(ServiceLocation.GLOBAL) == "/etc/systemd/system"
+
+
+class TestEnableUnitsOffline:
+    """Test cases for enabling units against an offline root."""
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_creates_install_links(self, mock_run_command, tmp_path):
+        """Test that WantedBy, RequiredBy and Alias links are created."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(
+            etc,
+            "app.service",
+            "[Service]\nExecStart=/usr/bin/app\n\n[Install]\n"
+            "WantedBy=multi-user.target graphical.target\n"
+            "RequiredBy=app.target\nAlias=web.service\n",
+        )
+
+        created = enable_units(["app"], root=root)
+
+        assert sorted(created) == sorted(
+            [
+                f"{etc}/multi-user.target.wants/app.service",
+                f"{etc}/graphical.target.wants/app.service",
+                f"{etc}/app.target.requires/app.service",
+                f"{etc}/web.service",
+            ]
+        )
+        for link in created:
+            assert os.readlink(link) == "/etc/systemd/system/app.service"
+
+        # No systemd is contacted for an offline root.
+        mock_run_command.assert_not_called()
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_follows_also_and_package_units(self, mock_run_command, tmp_path):
+        """Test that Also= units are enabled, including package-provided ones."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        usr = location_directory(ServiceLocation.DEFAULT, root)
+        write_unit(
+            etc,
+            "app.service",
+            "[Install]\nWantedBy=multi-user.target\nAlso=app.socket\n",
+        )
+        write_unit(usr, "app.socket", "[Install]\nWantedBy=sockets.target\n")
+
+        enable_units(["app.service"], root=root)
+
+        link = f"{etc}/sockets.target.wants/app.socket"
+        assert os.readlink(link) == "/usr/lib/systemd/system/app.socket"
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_template_instance(self, mock_run_command, tmp_path):
+        """Test that instances are linked to their template unit."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "worker@.service", "[Install]\nWantedBy=multi-user.target\n")
+
+        enable_units(["worker@1", "worker@2"], root=root)
+
+        for instance in ("worker@1.service", "worker@2.service"):
+            link = f"{etc}/multi-user.target.wants/{instance}"
+            assert os.readlink(link) == "/etc/systemd/system/worker@.service"
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_template_default_instance(self, mock_run_command, tmp_path):
+        """Test that a bare template is linked under its DefaultInstance."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(
+            etc,
+            "worker@.service",
+            "[Install]\nWantedBy=multi-user.target\nDefaultInstance=main\n",
+        )
+        write_unit(etc, "plain@.service", "[Install]\nWantedBy=multi-user.target\n")
+
+        created = enable_units(["worker@.service", "plain@.service"], root=root)
+
+        assert created == [f"{etc}/multi-user.target.wants/worker@main.service"]
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_is_idempotent(self, mock_run_command, tmp_path):
+        """Test that enabling twice creates nothing the second time."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "app.service", "[Install]\nWantedBy=multi-user.target\n")
+
+        assert len(enable_units(["app"], root=root)) == 1
+        assert enable_units(["app"], root=root) == []
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_conflicting_link(self, mock_run_command, tmp_path):
+        """Test that a link to a different unit file is not overwritten."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "app.service", "[Install]\nAlias=web.service\n")
+        os.symlink("/etc/systemd/system/other.service", f"{etc}/web.service")
+
+        with pytest.raises(ValueError, match="already links to"):
+            enable_units(["app"], root=root)
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_conflicting_link_force(self, mock_run_command, tmp_path):
+        """Test that force replaces a link to a different unit file."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "app.service", "[Install]\nAlias=web.service\n")
+        os.symlink("/etc/systemd/system/other.service", f"{etc}/web.service")
+
+        enable_units(["app"], root=root, force=True)
+
+        assert os.readlink(f"{etc}/web.service") == "/etc/systemd/system/app.service"
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_skips_regular_file(self, mock_run_command, tmp_path, capsys):
+        """Test that a regular file at the link path is left alone."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "app.service", "[Install]\nAlias=web.service\n")
+        write_unit(etc, "web.service", "[Service]\nExecStart=/usr/bin/web\n")
+
+        assert enable_units(["app"], root=root) == []
+        assert not os.path.islink(f"{etc}/web.service")
+        assert "is not a symlink, skipping" in capsys.readouterr().out
+
+        assert enable_units(["app"], root=root, force=True) == [f"{etc}/web.service"]
+        assert os.readlink(f"{etc}/web.service") == "/etc/systemd/system/app.service"
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_expands_instance_specifiers(self, mock_run_command, tmp_path):
+        """Test that %i and %I in [Install] expand to the instance name."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(
+            etc,
+            "worker@.service",
+            "[Install]\nWantedBy=pool@%i.target\nAlias=job@%i.service\n",
+        )
+
+        created = enable_units(["worker@a-b"], root=root)
+
+        assert created == [
+            f"{etc}/pool@a-b.target.wants/worker@a-b.service",
+            f"{etc}/job@a-b.service",
+        ]
+
+    @patch.object(enablement_module, "run_command")
+    def test_enable_unescapes_instance(self, mock_run_command, tmp_path):
+        """Test that %I expands to the unescaped instance name."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "worker@.service", "[Install]\nWantedBy=%I.target %%p\n")
+
+        created = enable_units(["worker@a\\x2db"], root=root)
+
+        assert created == [
+            f"{etc}/a-b.target.wants/worker@a\\x2db.service",
+            f"{etc}/%p.wants/worker@a\\x2db.service",
+        ]
+
+    def test_enable_missing_unit(self, tmp_path):
+        """Test that enabling an unknown unit raises an error."""
+        with pytest.raises(ValueError, match="Unit file for missing.service"):
+            enable_units(["missing"], root=str(tmp_path))
+
+    @patch.object(enablement_module, "run_command")
+    def test_disable_removes_links(self, mock_run_command, tmp_path):
+        """Test that disabling removes the links created by enabling."""
+        root = str(tmp_path)
+        etc = location_directory(ServiceLocation.GLOBAL, root)
+        write_unit(etc, "app.service", "[Install]\nWantedBy=multi-user.target\n")
+        enable_units(["app"], root=root)
+
+        removed = disable_units(["app"], root=root)
+
+        assert removed == [f"{etc}/multi-user.target.wants/app.service"]
+        assert not os.path.lexists(removed[0])
+
+
+class TestEnableUnitsLive:
+    """Test cases for enabling units on the live system."""
+
+    @patch.object(enablement_module, "run_command")
+    def test_single_reload_for_many_units(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that enabling many units issues a single daemon-reload."""
+        for index in range(5):
+            write_unit(
+                mock_service_location,
+                f"app{index}.service",
+                "[Install]\nWantedBy=multi-user.target\n",
+            )
+
+        enable_units(
+            [f"app{index}" for index in range(5)],
+            service_location=ServiceLocation.TEST,
+        )
+
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
+        assert (
+            len(
+                os.listdir(
+                    os.path.join(mock_service_location, "multi-user.target.wants")
+                )
+            )
+            == 5
+        )
+
+    @patch.object(enablement_module, "run_command")
+    def test_service_native_enable_includes_timer(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that Service enables its timer natively when one exists."""
+        write_unit(
+            mock_service_location,
+            "backup.service",
+            "[Service]\nExecStart=/usr/bin/backup\n",
+        )
+        write_unit(
+            mock_service_location,
+            "backup.timer",
+            "[Install]\nWantedBy=timers.target\n",
+        )
+
+        service = Service("backup", service_location=ServiceLocation.TEST)
+        service.enable_service_at_startup(native=True)
+
+        link = os.path.join(mock_service_location, "timers.target.wants/backup.timer")
+        assert os.path.islink(link)
+
+        service.disable_service_at_startup(native=True)
+        assert not os.path.lexists(link)
@@ -135,9 +135,14 @@ class TestFile:
         unit = file.unit
         assert unit.unit_name == "Unit"
 
+        # Should be able to access Slice section
+        assert file.slice.unit_name == "Slice"
+
         # Should not be able to access other sections
         with pytest.raises(ValueError, match="Install is not allowed"):
             _ = file.install
+        with pytest.raises(ValueError, match="Scope is not allowed"):
+            _ = file.scope
 
     def test_scope_file_sections(self):
         """Test accessing sections in a scope file."""
@@ -147,6 +152,9 @@ class TestFile:
         unit = file.unit
         assert unit.unit_name == "Unit"
 
+        # Should be able to access Scope section
+        assert file.scope.unit_name == "Scope"
+
         # Should not be able to access Install section
         with pytest.raises(ValueError, match="Install is not allowed"):
             _ = file.install
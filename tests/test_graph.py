@@ -0,0 +1,150 @@
+import sys
+from unittest.mock import call, patch
+
+import pytest
+
+from service_config_foundry import DependencyGraph, Service
+
+graph_module = sys.modules[DependencyGraph.__module__]
+
+
+def make_service(name, after=None, before=None, wants=None, wanted_by=None):
+    service = Service(name)
+    service.service_file.service.exec_start = f"/usr/bin/{name}"
+    service.service_file.unit.after = after
+    service.service_file.unit.before = before
+    service.service_file.unit.wants = wants
+    service.service_file.install.wanted_by = wanted_by
+    return service
+
+
+class TestDependencyGraphEdges:
+    """Test cases for building the dependency graph."""
+
+    def test_after_and_before(self):
+        """Test that After= and Before= create ordering edges."""
+        graph = DependencyGraph.from_services(
+            [
+                make_service("db"),
+                make_service("app", after="db.service network.target"),
+                make_service("cache", before="app.service"),
+            ]
+        )
+        assert graph.predecessors("app.service") == [
+            "cache.service",
+            "db.service",
+            "network.target",
+        ]
+
+    def test_requirements_do_not_order(self):
+        """Test that Wants= alone does not order units."""
+        graph = DependencyGraph.from_services(
+            [make_service("db"), make_service("app", wants="db.service")]
+        )
+        assert graph.requirements("app.service") == ["db.service"]
+        assert graph.predecessors("app.service") == []
+        assert graph.layers() == [["app.service", "db.service"]]
+
+    def test_wanted_by_orders_before_target(self):
+        """Test that targets are ordered after the units they pull in."""
+        graph = DependencyGraph.from_services(
+            [make_service("app", wanted_by="multi-user.target")]
+        )
+        assert graph.predecessors("multi-user.target") == ["app.service"]
+        assert graph.requirements("multi-user.target") == ["app.service"]
+
+    def test_socket_and_timer_order_before_their_service(self):
+        """Test implicit ordering of sockets and timers."""
+        web = make_service("web")
+        web.socket_file.socket.listen_stream = "8080"
+        web.socket_file.socket.service = "web-handler.service"
+        backup = make_service("backup")
+        backup.timer_file.timer.on_calendar = "daily"
+
+        graph = DependencyGraph.from_services([web, backup])
+
+        assert graph.predecessors("web-handler.service") == ["web.socket"]
+        assert graph.predecessors("backup.service") == ["backup.timer"]
+
+
+class TestDependencyGraphOrdering:
+    """Test cases for cycle detection and layering."""
+
+    def test_layers(self):
+        """Test that independent units share a layer."""
+        graph = DependencyGraph.from_services(
+            [
+                make_service("db"),
+                make_service("cache"),
+                make_service("app", after=["db.service", "cache.service"]),
+                make_service("web", after="app.service"),
+                make_service("metrics"),
+            ]
+        )
+        assert graph.layers() == [
+            ["cache.service", "db.service", "metrics.service"],
+            ["app.service"],
+            ["web.service"],
+        ]
+
+    def test_layers_keep_order_through_unmanaged_units(self):
+        """Test that ordering through unmanaged units is preserved."""
+        graph = DependencyGraph.from_services(
+            [
+                make_service("net", before="network-online.target"),
+                make_service("app", after="network-online.target"),
+            ]
+        )
+        assert graph.layers() == [["net.service"], ["app.service"]]
+        assert graph.layers(managed_only=False) == [
+            ["net.service"],
+            ["network-online.target"],
+            ["app.service"],
+        ]
+
+    def test_cycle_detection(self):
+        """Test that ordering cycles are reported."""
+        graph = DependencyGraph.from_services(
+            [
+                make_service("a", after="c.service"),
+                make_service("b", after="a.service"),
+                make_service("c", after="b.service"),
+            ]
+        )
+        assert graph.find_cycle() == [
+            "a.service",
+            "b.service",
+            "c.service",
+            "a.service",
+        ]
+        with pytest.raises(ValueError, match="Ordering cycle detected"):
+            graph.layers()
+
+    def test_acyclic_graph(self):
+        """Test that acyclic graphs pass the check."""
+        graph = DependencyGraph.from_services(
+            [make_service("a"), make_service("b", after="a.service")]
+        )
+        assert graph.find_cycle() is None
+        graph.check_cycles()
+
+    @patch.object(graph_module, "run_command")
+    def test_start_layers(self, mock_run_command):
+        """Test that each layer is started with a single call."""
+        backup = make_service("backup", after="db.service")
+        backup.timer_file.timer.on_calendar = "daily"
+        graph = DependencyGraph.from_services(
+            [
+                make_service("db"),
+                make_service("cache"),
+                make_service("app", after="db.service"),
+                backup,
+            ]
+        )
+
+        graph.start()
+
+        assert mock_run_command.call_args_list == [
+            call("systemctl restart backup.timer cache.service db.service"),
+            call("systemctl restart app.service"),
+        ]
@@ -0,0 +1,104 @@
+from service_config_foundry.impact import (
+    Impact,
+    classify_changes,
+    classify_directive,
+)
+
+
+class TestClassifyDirective:
+    """Test cases for classify_directive function."""
+
+    def test_unit_metadata_needs_daemon_reload(self):
+        """Test that Unit directives only need a daemon-reload."""
+        assert classify_directive("Unit", "Description") == Impact.DAEMON_RELOAD
+        assert classify_directive("Unit", "After") == Impact.DAEMON_RELOAD
+
+    def test_install_needs_reenable(self):
+        """Test that Install directives need the unit to be re-enabled."""
+        assert classify_directive("Install", "WantedBy") == Impact.REENABLE
+
+    def test_supervision_directive_needs_daemon_reload(self):
+        """Test that supervision directives only need a daemon-reload."""
+        assert classify_directive("Service", "RestartSec") == Impact.DAEMON_RELOAD
+
+    def test_reload_file_needs_reload(self):
+        """Test that the reload file only needs an ExecReload."""
+        assert classify_directive("Service", "ReloadFile") == Impact.RELOAD
+
+    def test_execution_directive_needs_restart(self):
+        """Test that directives of the running process need a restart."""
+        assert classify_directive("Service", "ExecStart") == Impact.RESTART
+        assert classify_directive("Timer", "OnCalendar") == Impact.RESTART
+
+    def test_resource_control_needs_daemon_reload(self):
+        """Test that resource-control directives only need a daemon-reload."""
+        assert classify_directive("Service", "CPUWeight") == Impact.DAEMON_RELOAD
+        assert classify_directive("Scope", "MemoryMax") == Impact.DAEMON_RELOAD
+        assert classify_directive("Slice", "TasksMax") == Impact.DAEMON_RELOAD
+
+    def test_moving_or_delegating_needs_restart(self):
+        """Test that moving a unit or changing delegation needs a restart."""
+        assert classify_directive("Service", "Slice") == Impact.RESTART
+        assert classify_directive("Service", "Delegate") == Impact.RESTART
+
+    def test_impacts_are_ordered(self):
+        """Test that impacts are ordered from cheapest to most disruptive."""
+        assert (
+            Impact.NONE
+            < Impact.DAEMON_RELOAD
+            < Impact.RELOAD
+            < Impact.REENABLE
+            < Impact.RESTART
+        )
+
+
+class TestClassifyChanges:
+    """Test cases for classify_changes function."""
+
+    def test_no_changes(self):
+        """Test that identical configurations have no impact."""
+        config = {"Unit": {"Description": ["Test"]}}
+        assert classify_changes(config, {"Unit": {"Description": "Test"}}) == set()
+
+    def test_new_file_needs_restart(self):
+        """Test that a new file needs a restart."""
+        assert classify_changes(None, {"Unit": {"Description": "Test"}}) == {
+            Impact.RESTART
+        }
+
+    def test_removed_file_needs_restart(self):
+        """Test that a removed file needs a restart."""
+        assert classify_changes({"Unit": {"Description": ["Test"]}}, None) == {
+            Impact.RESTART
+        }
+
+    def test_boolean_values_are_normalized(self):
+        """Test that booleans compare equal to their written form."""
+        previous = {"Timer": {"Persistent": ["true"]}}
+        assert classify_changes(previous, {"Timer": {"Persistent": True}}) == set()
+
+    def test_mixed_changes(self):
+        """Test that every changed directive contributes its impact."""
+        previous = {
+            "Unit": {"Description": ["Old"]},
+            "Service": {"ExecStart": ["/usr/bin/app"]},
+            "Install": {"WantedBy": ["multi-user.target"]},
+        }
+        current = {
+            "Unit": {"Description": "New"},
+            "Service": {"ExecStart": "/usr/bin/app"},
+            "Install": {"WantedBy": "graphical.target"},
+        }
+        assert classify_changes(previous, current) == {
+            Impact.DAEMON_RELOAD,
+            Impact.REENABLE,
+        }
+
+    def test_added_and_removed_directives(self):
+        """Test that added and removed directives are detected."""
+        previous = {"Service": {"ExecStart": ["/usr/bin/app"], "User": ["app"]}}
+        current = {"Service": {"ExecStart": "/usr/bin/app", "RestartSec": "5"}}
+        assert classify_changes(previous, current) == {
+            Impact.RESTART,
+            Impact.DAEMON_RELOAD,
+        }
@@ -0,0 +1,164 @@
+import json
+import sys
+import time
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation, TemplateService
+from service_config_foundry.journal import journal_command, journal_entries
+
+journal_module = sys.modules[journal_entries.__module__]
+
+RECORDED = [
+    {
+        "__CURSOR": "s=abc;i=1;b=boot;m=10;t=100;x=1",
+        "_SYSTEMD_UNIT": "web.service",
+        "MESSAGE": "Started",
+    },
+    {
+        "__CURSOR": "s=abc;i=2;b=boot;m=20;t=200;x=2",
+        "_SYSTEMD_UNIT": "web.service",
+        "MESSAGE": [104, 105, 255],
+    },
+    {
+        "__CURSOR": "s=abc;i=3;b=boot;m=30;t=300;x=3",
+        "_SYSTEMD_UNIT": "db.service",
+        "MESSAGE": "Ready",
+    },
+]
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    """Replay a recorded `journalctl -o json` stream instead of the journal."""
+    path = tmp_path / "journal.json"
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in RECORDED))
+    commands = []
+
+    def replay(units, **options):
+        commands.append(journal_command(units, **options))
+        return ["cat", str(path)]
+
+    monkeypatch.setattr(journal_module, "journal_command", replay)
+    return commands
+
+
+class TestJournalCommand:
+    """Test cases for building journalctl commands."""
+
+    def test_multiple_units(self):
+        """Test that several units share one journalctl process."""
+        assert journal_command(["web.service", "db.service"]) == [
+            "journalctl",
+            "--output=json",
+            "--no-pager",
+            "--unit",
+            "web.service",
+            "--unit",
+            "db.service",
+        ]
+
+    def test_options(self):
+        """Test resuming from a cursor and following."""
+        command = journal_command(
+            ["web.service"],
+            cursor="s=abc;i=2",
+            since="-1h",
+            lines=50,
+            follow=True,
+            use_sudo=True,
+        )
+        assert command[0] == "sudo"
+        assert command[-7:] == [
+            "--after-cursor",
+            "s=abc;i=2",
+            "--since",
+            "-1h",
+            "--lines",
+            "50",
+            "--follow",
+        ]
+
+
+class TestJournalEntries:
+    """Test cases for streaming journal entries."""
+
+    def test_streams_recorded_entries(self, recording):
+        """Test that entries are parsed one by one with their cursors."""
+        entries = list(journal_entries(["web.service", "db.service"]))
+        assert [entry["MESSAGE"] for entry in entries] == [
+            "Started",
+            "hi\ufffd",
+            "Ready",
+        ]
+        assert entries[-1]["__CURSOR"] == RECORDED[-1]["__CURSOR"]
+
+    def test_closing_terminates_process(self, tmp_path, monkeypatch):
+        """Test that a following journalctl is stopped when the reader stops."""
+        path = tmp_path / "journal.json"
+        path.write_text(json.dumps(RECORDED[0]) + "\n")
+        monkeypatch.setattr(
+            journal_module,
+            "journal_command",
+            lambda units, **options: ["sh", "-c", f"cat {path}; exec sleep 60"],
+        )
+
+        started = time.monotonic()
+        entries = journal_entries(["web.service"], follow=True)
+        assert next(entries)["MESSAGE"] == "Started"
+        entries.close()
+        assert time.monotonic() - started < 30
+
+    def test_failure_raises_with_error_output(self, monkeypatch):
+        """Test that a failing journalctl is not mistaken for no new entries."""
+        monkeypatch.setattr(
+            journal_module,
+            "journal_command",
+            lambda units, **options: [
+                "sh",
+                "-c",
+                "echo 'Failed to seek to cursor: Invalid argument' >&2; exit 1",
+            ],
+        )
+        with pytest.raises(RuntimeError, match="Failed to seek to cursor"):
+            list(journal_entries(["web.service"], cursor="bogus"))
+
+    def test_failure_after_entries(self, tmp_path, monkeypatch):
+        """Test that entries read before a failure are still yielded."""
+        path = tmp_path / "journal.json"
+        path.write_text(json.dumps(RECORDED[0]) + "\n")
+        monkeypatch.setattr(
+            journal_module,
+            "journal_command",
+            lambda units, **options: [
+                "sh",
+                "-c",
+                f"cat {path}; echo 'Permission denied' >&2; exit 1",
+            ],
+        )
+        entries = journal_entries(["web.service"])
+        assert next(entries)["MESSAGE"] == "Started"
+        with pytest.raises(RuntimeError, match="exit status 1: Permission denied"):
+            next(entries)
+
+
+class TestServiceLogs:
+    """Test cases for the logs of a service."""
+
+    def test_service_logs(self, recording):
+        """Test that a service reads its own unit from a cursor."""
+        service = Service("web", service_location=ServiceLocation.TEST)
+        entries = list(service.logs(cursor=RECORDED[0]["__CURSOR"]))
+        assert len(entries) == 3
+        assert "--unit" in recording[0] and "web" in recording[0]
+        assert RECORDED[0]["__CURSOR"] in recording[0]
+
+    def test_template_logs_all_instances(self, recording):
+        """Test that a template reads all instances in one process."""
+        template = TemplateService(
+            "worker", instances=[1, 2], service_location=ServiceLocation.TEST
+        )
+        list(template.logs())
+        assert len(recording) == 1
+        assert "worker@1.service" in recording[0]
+        assert "worker@2.service" in recording[0]
@@ -0,0 +1,143 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation
+from service_config_foundry.config_parser import read_config
+from service_config_foundry.limits import LimitCapacity, apply_limits, compute_limits
+
+batch_module = sys.modules["service_config_foundry.batch"]
+
+GIB = 2**30
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    """Create a fixture root with the recorded kernel limits of a 16 GiB host."""
+    (tmp_path / "proc" / "sys" / "fs").mkdir(parents=True)
+    (tmp_path / "proc" / "sys" / "kernel").mkdir(parents=True)
+    (tmp_path / "proc" / "sys" / "fs" / "file-max").write_text("1600000\n")
+    (tmp_path / "proc" / "sys" / "fs" / "nr_open").write_text("1048576\n")
+    (tmp_path / "proc" / "sys" / "kernel" / "threads-max").write_text("120000\n")
+    (tmp_path / "proc" / "cpuinfo").write_text("processor\t: 0\n")
+    (tmp_path / "proc" / "meminfo").write_text("MemTotal:       16777216 kB\n")
+    return str(tmp_path)
+
+
+def make_services(names):
+    services = []
+    for name in names:
+        service = Service(name, service_location=ServiceLocation.TEST)
+        service.service_file.service.exec_start = f"/usr/bin/{name}"
+        services.append(service)
+    return services
+
+
+class TestLimitCapacity:
+    """Test cases for reading the kernel limits."""
+
+    def test_read(self, proc_root):
+        """Test reading the limits from a fixture root."""
+        capacity = LimitCapacity.read(proc_root)
+
+        assert capacity.file_max == 1600000
+        assert capacity.nr_open == 1048576
+        assert capacity.threads_max == 120000
+        assert capacity.memory == 16 * GIB
+
+
+class TestComputeLimits:
+    """Test cases for computing process limits."""
+
+    def test_limits(self):
+        """Test the limits for a high-connection service."""
+        capacity = LimitCapacity(10**7, 1048576, 120000, "64G")
+        limits = compute_limits(capacity, 50000, services=4, threads=100)
+
+        assert limits == {
+            "limit_n_o_f_i_l_e": 102048,
+            "limit_n_p_r_o_c": 800,
+            "tasks_max": 200,
+        }
+
+    def test_nr_open_bounds_nofile(self):
+        """Test that LimitNOFILE cannot exceed nr_open."""
+        capacity = LimitCapacity(10**9, 65536, 120000, "1T")
+        with pytest.raises(ValueError, match="at most 65536"):
+            compute_limits(capacity, 40000)
+
+    def test_memory_bounds_nofile(self):
+        """Test that descriptors are bounded by the kernel memory they pin."""
+        capacity = LimitCapacity(10**9, 10**7, 120000, "1G")
+        with pytest.raises(ValueError, match="at most 32768"):
+            compute_limits(capacity, 20000)
+
+    def test_threads_bound_tasks(self):
+        """Test that TasksMax is bounded by the group's share of threads-max."""
+        capacity = LimitCapacity(10**7, 1048576, 1000, "64G")
+        with pytest.raises(ValueError, match="TasksMax"):
+            compute_limits(capacity, 10, services=4, threads=100)
+
+
+class TestApplyLimits:
+    """Test cases for applying limits to a group of services."""
+
+    def test_per_service_connections(self, proc_root):
+        """Test that connection counts may differ per service."""
+        services = make_services(["api", "cache"])
+        apply_limits(
+            services,
+            {"api": 20000, "cache": 1000},
+            LimitCapacity.read(proc_root),
+            write=False,
+        )
+
+        assert services[0].service_file.service.limit_n_o_f_i_l_e == 42048
+        assert services[1].service_file.service.limit_n_o_f_i_l_e == 4048
+        config = services[0].service_file.get_config(requirement_check=False)
+        assert config["Service"]["LimitNOFILE"] == 42048
+        assert config["Service"]["TasksMax"] == 128
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_batched_write(self, mock_run_command, _, proc_root, mock_service_location):
+        """Test that the group is written in one batch."""
+        services = make_services(["api", "cache"])
+        apply_limits(services, 1000, LimitCapacity.read(proc_root))
+
+        assert [c.args[0] for c in mock_run_command.call_args_list] == [
+            "systemctl daemon-reload",
+            "systemctl restart api cache",
+        ]
+
+    @patch.object(batch_module, "run_command")
+    def test_write_keeps_other_directives(self, _, proc_root, mock_service_location):
+        """Test that the limits are written as a drop-in next to the unit file."""
+        path = os.path.join(mock_service_location, "api.service")
+        with open(path, "w") as file:
+            file.write("[Service]\nExecStart=/usr/bin/api\nUser=api\n")
+
+        apply_limits(
+            [Service("api", service_location=ServiceLocation.TEST)],
+            1000,
+            LimitCapacity.read(proc_root),
+        )
+
+        assert read_config(path) == {
+            "Service": {"ExecStart": ["/usr/bin/api"], "User": ["api"]}
+        }
+        drop_in = os.path.join(mock_service_location, "api.service.d", "limits.conf")
+        assert read_config(drop_in)["Service"]["LimitNOFILE"] == ["4048"]
+
+    @patch.object(batch_module, "run_command")
+    def test_no_services(self, mock_run_command):
+        """Test that an empty group writes nothing."""
+        assert apply_limits([], 1000, LimitCapacity(1000, 1000, 1000, "1G")) == {}
+        mock_run_command.assert_not_called()
+
+    def test_compute_without_services(self):
+        """Test that computing limits for no services raises a ValueError."""
+        with pytest.raises(ValueError, match="at least one service"):
+            compute_limits(LimitCapacity(1000, 1000, 1000, "1G"), 10, services=0)
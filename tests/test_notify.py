@@ -0,0 +1,278 @@
+import array
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from service_config_foundry.notify import (
+    Watchdog,
+    configure_fd_store,
+    configure_notify,
+    extend_timeout,
+    listen_fds,
+    notify,
+    ping_watchdog,
+    ready,
+    reloading,
+    remove_fds,
+    set_status,
+    stopping,
+    store_fds,
+    stored_socket,
+    watchdog_timeout,
+)
+from service_config_foundry.sections import ServiceSection
+
+
+@pytest.fixture
+def notify_socket(tmp_path, monkeypatch):
+    """Create a fake systemd notification socket and point NOTIFY_SOCKET at it."""
+    path = str(tmp_path / "notify")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(path)
+    sock.settimeout(5)
+    monkeypatch.setenv("NOTIFY_SOCKET", path)
+    yield sock
+    sock.close()
+
+
+def receive(sock):
+    """Receive a notification and the file descriptors passed with it."""
+    fds = array.array("i")
+    message, ancillary, _, _ = sock.recvmsg(4096, socket.CMSG_SPACE(16 * fds.itemsize))
+    for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[: len(data) - len(data) % fds.itemsize])
+    return message.decode(), list(fds)
+
+
+class TestNotify:
+    """Test cases for sending notifications."""
+
+    def test_without_notify_socket(self, monkeypatch):
+        """Test that nothing is sent outside systemd."""
+        monkeypatch.delenv("NOTIFY_SOCKET", raising=False)
+        assert notify("READY=1") is False
+
+    def test_unsupported_address(self, monkeypatch):
+        """Test that unsupported socket addresses raise a ValueError."""
+        monkeypatch.setenv("NOTIFY_SOCKET", "vsock:2:1234")
+        with pytest.raises(ValueError, match="Unsupported NOTIFY_SOCKET"):
+            notify("READY=1")
+
+    def test_send_state(self, notify_socket):
+        """Test sending a plain state notification."""
+        assert notify("READY=1") is True
+        assert receive(notify_socket) == ("READY=1", [])
+
+
+class TestStateHelpers:
+    """Test cases for the READY, STATUS, WATCHDOG and EXTEND_TIMEOUT helpers."""
+
+    def test_ready(self, notify_socket):
+        """Test the readiness notification with and without a status."""
+        ready()
+        assert receive(notify_socket)[0] == "READY=1"
+        ready("Serving")
+        assert receive(notify_socket)[0] == "READY=1\nSTATUS=Serving"
+
+    def test_status_and_stopping(self, notify_socket):
+        """Test status and shutdown notifications."""
+        set_status("Draining")
+        stopping()
+        assert receive(notify_socket)[0] == "STATUS=Draining"
+        assert receive(notify_socket)[0] == "STOPPING=1"
+
+    def test_reloading_sends_monotonic_timestamp(self, notify_socket):
+        """Test that reload notifications carry MONOTONIC_USEC."""
+        reloading()
+        first, second = receive(notify_socket)[0].split("\n")
+        assert first == "RELOADING=1"
+        assert int(second.split("=")[1]) > 0
+
+    def test_watchdog_ping(self, notify_socket):
+        """Test a single keep-alive ping."""
+        assert ping_watchdog() is True
+        assert receive(notify_socket)[0] == "WATCHDOG=1"
+
+    def test_extend_timeout(self, notify_socket):
+        """Test that timeouts are sent in microseconds."""
+        extend_timeout("1min 30s")
+        assert receive(notify_socket)[0] == "EXTEND_TIMEOUT_USEC=90000000"
+        extend_timeout(0.5)
+        assert receive(notify_socket)[0] == "EXTEND_TIMEOUT_USEC=500000"
+
+
+class TestWatchdog:
+    """Test cases for the watchdog pinger."""
+
+    def test_timeout_from_environment(self, monkeypatch):
+        """Test reading WATCHDOG_USEC for this process."""
+        monkeypatch.setenv("WATCHDOG_USEC", "30000000")
+        monkeypatch.setenv("WATCHDOG_PID", str(os.getpid()))
+        assert watchdog_timeout() == 30.0
+        assert Watchdog().interval == 15.0
+        assert Watchdog(fraction=0.25).interval == 7.5
+
+    def test_timeout_for_other_process(self, monkeypatch):
+        """Test that a watchdog meant for another process is ignored."""
+        monkeypatch.setenv("WATCHDOG_USEC", "30000000")
+        monkeypatch.setenv("WATCHDOG_PID", str(os.getpid() + 1))
+        assert watchdog_timeout() is None
+
+    def test_disabled_watchdog_does_not_start(self, monkeypatch):
+        """Test that no thread is started without a watchdog."""
+        monkeypatch.delenv("WATCHDOG_USEC", raising=False)
+        watchdog = Watchdog()
+        assert watchdog.interval is None
+        assert watchdog.start() is False
+        watchdog.stop()
+
+    def test_pings_periodically(self, notify_socket):
+        """Test that the pinger keeps pinging until stopped."""
+        with Watchdog(interval=0.01) as watchdog:
+            for _ in range(3):
+                assert receive(notify_socket)[0] == "WATCHDOG=1"
+        assert watchdog._thread is None
+
+
+class TestConfigureNotify:
+    """Test cases for wiring a service section for notifications."""
+
+    def test_notify_with_watchdog(self):
+        """Test that type, notify access and watchdog are set together."""
+        section = configure_notify(ServiceSection(), watchdog_sec="30s")
+        assert section.type == "notify"
+        assert section.notify_access == "main"
+        assert section.watchdog_sec == "30s"
+
+    def test_notify_reload(self):
+        """Test configuring a service that notifies about reloads."""
+        section = configure_notify(ServiceSection(), notify_access="all", reload=True)
+        assert section.type == "notify-reload"
+        assert section.notify_access == "all"
+        assert section.watchdog_sec is None
+
+    def test_existing_watchdog_is_kept(self):
+        """Test that configuring without a watchdog keeps the existing one."""
+        section = ServiceSection()
+        section.watchdog_sec = "30s"
+
+        configure_notify(section, reload=True)
+        assert section.type == "notify-reload"
+        assert section.watchdog_sec == "30s"
+
+    def test_notify_access_none_is_rejected(self):
+        """Test that NotifyAccess=none is rejected."""
+        with pytest.raises(ValueError, match="NotifyAccess=none"):
+            configure_notify(ServiceSection(), notify_access="none")
+
+
+class TestFileDescriptorStore:
+    """Test cases for the file descriptor store client."""
+
+    def test_store_fds(self, notify_socket):
+        """Test that stored file descriptors are passed with SCM_RIGHTS."""
+        read_end, write_end = os.pipe()
+        try:
+            assert store_fds([write_end], "pipe")
+            message, fds = receive(notify_socket)
+
+            assert message == "FDSTORE=1\nFDNAME=pipe"
+            assert len(fds) == 1
+            # The received descriptor refers to the same pipe.
+            os.write(fds[0], b"x")
+            assert os.read(read_end, 1) == b"x"
+            os.close(fds[0])
+        finally:
+            os.close(read_end)
+            os.close(write_end)
+
+    def test_remove_fds(self, notify_socket):
+        """Test removing file descriptors from the store."""
+        remove_fds("pipe")
+        assert receive(notify_socket) == ("FDSTOREREMOVE=1\nFDNAME=pipe", [])
+
+    def test_listen_fds(self, monkeypatch):
+        """Test reading the passed file descriptors and their names."""
+        monkeypatch.setenv("LISTEN_PID", str(os.getpid()))
+        monkeypatch.setenv("LISTEN_FDS", "3")
+        monkeypatch.setenv("LISTEN_FDNAMES", "http:https")
+
+        assert listen_fds() == [(3, "http"), (4, "https"), (5, "unknown")]
+        assert "LISTEN_FDS" not in os.environ
+
+    def test_listen_fds_other_process(self, monkeypatch):
+        """Test that file descriptors passed to another process are ignored."""
+        monkeypatch.setenv("LISTEN_PID", str(os.getpid() + 1))
+        monkeypatch.setenv("LISTEN_FDS", "1")
+        assert listen_fds() == []
+
+    def test_stored_socket_created_and_stored(self, notify_socket, monkeypatch):
+        """Test that a new socket is created and stored on the first start."""
+        monkeypatch.delenv("LISTEN_FDS", raising=False)
+        created = []
+
+        def create():
+            created.append(socket.socket(socket.AF_UNIX, socket.SOCK_STREAM))
+            return created[0]
+
+        sock = stored_socket("http", create)
+        message, fds = receive(notify_socket)
+
+        assert sock is created[0]
+        assert message == "FDSTORE=1\nFDNAME=http"
+        for fd in fds:
+            os.close(fd)
+        sock.close()
+
+    def test_stored_socket_reused(self, monkeypatch):
+        """Test that a socket handed back by systemd is reused."""
+        original = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        passed = os.dup(original.fileno())
+        monkeypatch.setattr(
+            "service_config_foundry.notify.listen_fds",
+            lambda unset_environment: [(passed, "http")],
+        )
+
+        sock = stored_socket("http", lambda: pytest.fail("socket was recreated"))
+
+        assert sock.fileno() == passed
+        sock.close()
+        original.close()
+
+    def test_configure_fd_store(self):
+        """Test configuring a service for file descriptor handoff."""
+        section = configure_fd_store(ServiceSection(), max_fds=4)
+
+        assert section.type == "notify"
+        assert section.notify_access == "main"
+        assert section.file_descriptor_store_max == 4
+        assert section.file_descriptor_store_preserve == "restart"
+
+    def test_configure_fd_store_keeps_watchdog(self):
+        """Test that configuring the store keeps an existing watchdog."""
+        section = ServiceSection()
+        section.watchdog_sec = "10s"
+
+        configure_fd_store(section)
+        assert section.type == "notify"
+        assert section.watchdog_sec == "10s"
+
+
+class TestImport:
+    """Test cases for importing the client inside a service."""
+
+    def test_no_planning_dependencies(self):
+        """Test that the client imports neither numpy nor the planners."""
+        code = (
+            "import sys; import service_config_foundry.notify; "
+            "print(sorted({'numpy', 'service_config_foundry.schedule'} "
+            "& set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == "[]"
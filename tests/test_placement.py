@@ -0,0 +1,163 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+import pytest
+
+from service_config_foundry import ServiceLocation, TemplateService
+from service_config_foundry.config_parser import read_config
+from service_config_foundry.placement import (
+    CpuTopology,
+    format_cpu_list,
+    parse_cpu_list,
+    place_instances,
+    plan_placement,
+)
+
+template_module = sys.modules[TemplateService.__module__]
+
+
+@pytest.fixture
+def sys_root(tmp_path):
+    """Create a fixture root with the sysfs topology of a 2-node host.
+
+    Each node has 4 cores with 2 threads each; CPU n and n + 8 are siblings.
+    Node 0 holds CPUs 0-3 and 8-11, node 1 holds CPUs 4-7 and 12-15.
+    """
+    system = tmp_path / "sys" / "devices" / "system"
+    (system / "cpu").mkdir(parents=True)
+    (system / "cpu" / "online").write_text("0-15\n")
+    for cpu in range(16):
+        topology = system / "cpu" / f"cpu{cpu}" / "topology"
+        topology.mkdir(parents=True)
+        (topology / "core_id").write_text(f"{cpu % 8}\n")
+        (topology / "physical_package_id").write_text(f"{cpu % 8 // 4}\n")
+    (system / "node").mkdir()
+    (system / "node" / "online").write_text("0-1\n")
+    for node, cpulist in [(0, "0-3,8-11"), (1, "4-7,12-15")]:
+        (system / "node" / f"node{node}").mkdir()
+        (system / "node" / f"node{node}" / "cpulist").write_text(f"{cpulist}\n")
+    return str(tmp_path)
+
+
+class TestCpuLists:
+    """Test cases for parsing and formatting CPU lists."""
+
+    def test_parse(self):
+        """Test parsing ranges and single CPUs."""
+        assert parse_cpu_list("0-3,8") == [0, 1, 2, 3, 8]
+        assert parse_cpu_list("5") == [5]
+        assert parse_cpu_list("") == []
+
+    def test_format(self):
+        """Test formatting indices into compact ranges."""
+        assert format_cpu_list([8, 0, 1, 2, 3]) == "0-3,8"
+        assert format_cpu_list([1, 3]) == "1,3"
+
+
+class TestCpuTopology:
+    """Test cases for reading the host topology."""
+
+    def test_read(self, sys_root):
+        """Test reading nodes and hyperthreaded cores from sysfs."""
+        topology = CpuTopology.read(sys_root)
+
+        assert topology.nodes == {
+            0: [[0, 8], [1, 9], [2, 10], [3, 11]],
+            1: [[4, 12], [5, 13], [6, 14], [7, 15]],
+        }
+        assert topology.core_count() == 8
+
+    def test_read_without_numa(self, sys_root):
+        """Test that hosts without NUMA information form a single node."""
+        os.remove(os.path.join(sys_root, "sys/devices/system/node/online"))
+        topology = CpuTopology.read(sys_root)
+        assert list(topology.nodes) == [0]
+        assert topology.core_count() == 8
+
+    def test_read_missing(self, tmp_path):
+        """Test that a root without topology raises a ValueError."""
+        with pytest.raises(ValueError, match="No CPU topology"):
+            CpuTopology.read(str(tmp_path))
+
+
+class TestPlanPlacement:
+    """Test cases for planning instance placement."""
+
+    def test_instances_spread_over_nodes(self, sys_root):
+        """Test that instances alternate between nodes and share no cores."""
+        placements = plan_placement(CpuTopology.read(sys_root), range(4))
+
+        assert [placements[i].node for i in range(4)] == [0, 1, 0, 1]
+        assert placements[0].cpus == [0, 1, 8, 9]
+        assert placements[1].cpus == [4, 5, 12, 13]
+        cpus = [cpu for placement in placements.values() for cpu in placement.cpus]
+        assert len(cpus) == len(set(cpus)) == 16
+
+    def test_instance_never_spans_nodes(self, sys_root):
+        """Test that placements that would span nodes raise a ValueError."""
+        topology = CpuTopology.read(sys_root)
+        with pytest.raises(ValueError, match="spanning NUMA nodes"):
+            plan_placement(topology, range(2), cores_per_instance=5)
+
+    def test_too_many_instances(self, sys_root):
+        """Test that more instances than cores raise a ValueError."""
+        with pytest.raises(ValueError, match="without sharing cores"):
+            plan_placement(CpuTopology.read(sys_root), range(9))
+
+    def test_default_cores_fit_node_layout(self):
+        """Test that the default core count accounts for whole nodes."""
+        nodes = {node: [[node * 8 + core] for core in range(8)] for node in range(2)}
+        placements = plan_placement(CpuTopology(nodes), range(3))
+        assert [len(placement.cpus) for placement in placements.values()] == [4] * 3
+
+        nodes = {node: [[node * 5 + core] for core in range(5)] for node in range(2)}
+        placements = plan_placement(CpuTopology(nodes), range(3))
+        assert [len(placement.cpus) for placement in placements.values()] == [2] * 3
+        assert sorted(placement.node for placement in placements.values()) == [
+            0,
+            0,
+            1,
+        ]
+
+    def test_default_cores_uneven_nodes(self):
+        """Test that a large node can hold several instances."""
+        nodes = {0: [[core] for core in range(6)], 1: [[6], [7]]}
+        placements = plan_placement(CpuTopology(nodes), range(2))
+        assert [len(placement.cpus) for placement in placements.values()] == [3, 3]
+        assert all(placement.node == 0 for placement in placements.values())
+
+    def test_directives(self, sys_root):
+        """Test the directives written for a placement."""
+        placement = plan_placement(CpuTopology.read(sys_root), ["a"])["a"]
+        config = placement.to_file().get_config(requirement_check=False)
+
+        assert config == {
+            "Service": {
+                "CPUAffinity": "0-3,8-11",
+                "NUMAPolicy": "bind",
+                "NUMAMask": "0",
+            }
+        }
+
+
+class TestPlaceInstances:
+    """Test cases for writing placements as drop-ins."""
+
+    @patch.object(template_module, "run_command")
+    def test_writes_drop_ins(self, mock_run_command, sys_root, mock_service_location):
+        """Test that every instance gets a placement drop-in."""
+        template = TemplateService(
+            "worker", instances=[1, 2], service_location=ServiceLocation.TEST
+        )
+        place_instances(template, CpuTopology.read(sys_root))
+
+        path = os.path.join(
+            mock_service_location, "worker@2.service.d", "placement.conf"
+        )
+        assert read_config(path)["Service"]["NUMAMask"] == ["1"]
+        assert read_config(path)["Service"]["CPUAffinity"][0] == ""
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart worker@1.service worker@2.service"),
+        ]
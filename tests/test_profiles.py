@@ -0,0 +1,122 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation
+from service_config_foundry.config_parser import read_config
+from service_config_foundry.profiles import PROFILES, apply_profile
+
+batch_module = sys.modules["service_config_foundry.batch"]
+
+
+def make_services(count):
+    services = []
+    for index in range(count):
+        service = Service(f"app{index}", service_location=ServiceLocation.TEST)
+        service.service_file.service.exec_start = f"/usr/bin/app{index}"
+        services.append(service)
+    return services
+
+
+class TestProfiles:
+    """Test cases for the predefined profiles."""
+
+    @pytest.mark.parametrize("name", sorted(PROFILES))
+    def test_profile_directives_exist(self, name):
+        """Test that every profile only uses known Service directives."""
+        service = make_services(1)[0]
+        apply_profile([service], name, write=False)
+
+        config = service.service_file.get_config(requirement_check=False)
+        assert "CPUSchedulingPolicy" in config["Service"]
+        assert "OOMScoreAdjust" in config["Service"]
+        assert "TimerSlackNSec" in config["Service"]
+
+    def test_latency_critical_is_not_realtime(self):
+        """Test that the default latency-critical profile keeps SCHED_OTHER."""
+        service = make_services(1)[0]
+        apply_profile([service], "latency-critical", write=False)
+
+        config = service.service_file.get_config(requirement_check=False)
+        assert config["Service"]["CPUSchedulingPolicy"] == "other"
+        assert config["Service"]["Nice"] == -10
+        assert "CPUSchedulingPriority" not in config["Service"]
+
+    def test_realtime_profile_directives(self):
+        """Test the directive names written for the opt-in real-time profile."""
+        service = make_services(1)[0]
+        apply_profile([service], "latency-critical-rt", write=False)
+
+        config = service.service_file.get_config(requirement_check=False)
+        # Nice= has no effect on real-time tasks.
+        assert "Nice" not in config["Service"]
+        assert config["Service"]["CPUSchedulingPolicy"] == "rr"
+        assert config["Service"]["CPUSchedulingPriority"] == 10
+        assert config["Service"]["CPUSchedulingResetOnFork"] is True
+        assert config["Service"]["IOSchedulingClass"] == "best-effort"
+        assert config["Service"]["IOSchedulingPriority"] == 0
+
+
+class TestApplyProfile:
+    """Test cases for applying profiles to many services."""
+
+    def test_unknown_profile(self):
+        """Test that unknown profile names raise a ValueError."""
+        with pytest.raises(ValueError, match="Unknown profile"):
+            apply_profile(make_services(1), "turbo")
+
+    def test_unknown_directive(self):
+        """Test that custom profiles with unknown directives raise a ValueError."""
+        with pytest.raises(ValueError, match="Unknown Service directive"):
+            apply_profile(make_services(1), {"niceness": 5}, write=False)
+
+    def test_custom_profile(self):
+        """Test applying a dictionary of directives."""
+        services = make_services(2)
+        apply_profile(services, {"nice": 5}, write=False)
+        assert [s.service_file.service.nice for s in services] == [5, 5]
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_batched_write(self, mock_run_command, _, mock_service_location):
+        """Test that hundreds of services are written in one batch."""
+        services = make_services(300)
+        apply_profile(services, "background")
+
+        commands = [c.args[0] for c in mock_run_command.call_args_list]
+        assert commands[0] == "systemctl daemon-reload"
+        assert len(commands) == 3
+        assert all(command.startswith("systemctl restart ") for command in commands[1:])
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_reapplying_is_noop(self, mock_run_command, _, mock_service_location):
+        """Test that re-applying the same profile runs nothing."""
+        services = make_services(2)
+        apply_profile(services, "throughput-batch")
+        mock_run_command.reset_mock()
+
+        apply_profile(services, "throughput-batch")
+        mock_run_command.assert_not_called()
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_write_keeps_other_directives(
+        self, mock_run_command, _, mock_service_location
+    ):
+        """Test that the profile is written as a drop-in next to the unit file."""
+        path = os.path.join(mock_service_location, "app0.service")
+        with open(path, "w") as file:
+            file.write("[Service]\nExecStart=/usr/bin/app0\nUser=app\n")
+
+        apply_profile(
+            [Service("app0", service_location=ServiceLocation.TEST)], "background"
+        )
+
+        assert read_config(path) == {
+            "Service": {"ExecStart": ["/usr/bin/app0"], "User": ["app"]}
+        }
+        drop_in = os.path.join(mock_service_location, "app0.service.d", "profile.conf")
+        assert read_config(drop_in)["Service"]["Nice"] == ["19"]
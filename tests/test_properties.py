@@ -0,0 +1,117 @@
+import subprocess
+import sys
+from unittest.mock import call, patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation, TemplateService
+from service_config_foundry.properties import property_assignments, set_properties
+
+properties_module = sys.modules[set_properties.__module__]
+
+SUCCESS = subprocess.CompletedProcess("", 0, "", "")
+
+
+class TestPropertyAssignments:
+    """Test cases for converting directives into set-property assignments."""
+
+    def test_assignments(self):
+        """Test that attribute names become directive assignments."""
+        assert property_assignments(
+            {"c_p_u_quota": "50%", "memory_high": "1G", "i_o_accounting": True}
+        ) == ["CPUQuota=50%", "MemoryHigh=1G", "IOAccounting=true"]
+
+    def test_multiple_values(self):
+        """Test that list directives are assigned once per value."""
+        assert property_assignments(
+            {"i_o_read_bandwidth_max": ["/dev/sda 10M", "/dev/sdb 20M"]}
+        ) == ["IOReadBandwidthMax=/dev/sda 10M", "IOReadBandwidthMax=/dev/sdb 20M"]
+
+    def test_rejects_other_directives(self):
+        """Test that directives outside resource control are rejected."""
+        with pytest.raises(ValueError, match="ExecStart cannot be changed"):
+            property_assignments({"exec_start": "/usr/bin/example"})
+
+
+class TestSetProperties:
+    """Test cases for changing properties of running units."""
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_one_call_per_unit(self, mock_run_command):
+        """Test that all properties of a unit are set in one call."""
+        service = Service("web", service_location=ServiceLocation.TEST)
+        service.set_properties(c_p_u_quota="50%", memory_high="1G")
+        mock_run_command.assert_called_once_with(
+            "systemctl set-property web CPUQuota=50% MemoryHigh=1G"
+        )
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_runtime_and_quoting(self, mock_run_command):
+        """Test runtime-only changes and values with spaces."""
+        set_properties(
+            {"prod-db.slice": {"i_o_weight": 200, "i_o_device_weight": "/dev/sda 50"}},
+            runtime=True,
+        )
+        mock_run_command.assert_called_once_with(
+            "systemctl set-property --runtime prod-db.slice IOWeight=200 "
+            "'IODeviceWeight=/dev/sda 50'"
+        )
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_model_kept_in_sync(self, mock_run_command):
+        """Test that the [Service] section matches what systemd runs."""
+        service = Service("web", service_location=ServiceLocation.TEST)
+        service.set_properties(memory_max="2G")
+        assert service.service_file.service.memory_max == "2G"
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_template_instances(self, mock_run_command):
+        """Test that a template's properties go to every managed instance."""
+        template = TemplateService(
+            "worker", instances=[1, 2], service_location=ServiceLocation.TEST
+        )
+        web = Service("web", service_location=ServiceLocation.TEST)
+        set_properties({template: {"c_p_u_weight": 50}, web: {"tasks_max": 64}})
+        assert mock_run_command.call_args_list == [
+            call("systemctl set-property worker@1.service CPUWeight=50"),
+            call("systemctl set-property worker@2.service CPUWeight=50"),
+            call("systemctl set-property web TasksMax=64"),
+        ]
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_invalid_directive_changes_nothing(self, mock_run_command):
+        """Test that an invalid directive fails before any unit is changed."""
+        web = Service("web", service_location=ServiceLocation.TEST)
+        db = Service("db", service_location=ServiceLocation.TEST)
+        with pytest.raises(ValueError):
+            set_properties({web: {"c_p_u_weight": 50}, db: {"user": "db"}})
+        mock_run_command.assert_not_called()
+        assert web.service_file.service.c_p_u_weight is None
+
+    @patch.object(properties_module, "run_command")
+    def test_failed_call_keeps_model(self, mock_run_command):
+        """Test that a failed call raises and leaves its service unchanged."""
+        mock_run_command.side_effect = [
+            SUCCESS,
+            SUCCESS,
+            subprocess.CompletedProcess("", 1, "", "Unit web.service not found.\n"),
+        ]
+        template = TemplateService(
+            "worker", instances=[1, 2], service_location=ServiceLocation.TEST
+        )
+        web = Service("web", service_location=ServiceLocation.TEST)
+
+        with pytest.raises(RuntimeError, match="web: Unit web.service not found."):
+            set_properties({template: {"c_p_u_weight": 50}, web: {"tasks_max": 64}})
+
+        assert mock_run_command.call_count == 3
+        assert template.service_file.service.c_p_u_weight == 50
+        assert web.service_file.service.tasks_max is None
+
+    @patch.object(properties_module, "run_command", return_value=SUCCESS)
+    def test_unit_name_is_quoted(self, mock_run_command):
+        """Test that unit names are quoted for the shell."""
+        set_properties({"a b.slice": {"c_p_u_weight": 50}})
+        mock_run_command.assert_called_once_with(
+            "systemctl set-property 'a b.slice' CPUWeight=50"
+        )
@@ -0,0 +1,249 @@
+import os
+import sys
+from unittest.mock import patch
+
+from service_config_foundry import ServiceLocation, UnitResolver
+from service_config_foundry.enablement import location_directory
+from service_config_foundry.resolver import template_of
+
+resolver_module = sys.modules[UnitResolver.__module__]
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def bump_mtime(path):
+    """Move a file's modification time forward so changes are always seen."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestUnitResolver:
+    """Test cases for UnitResolver."""
+
+    def _dirs(self, root):
+        return {
+            location: location_directory(location, root)
+            for location in (
+                ServiceLocation.GLOBAL,
+                ServiceLocation.RUNTIME,
+                ServiceLocation.DEFAULT,
+            )
+        }
+
+    def test_template_of(self):
+        """Test finding the template of an instance."""
+        assert template_of("worker@1.service") == "worker@.service"
+        assert template_of("worker@.service") is None
+        assert template_of("app.service") is None
+
+    def test_precedence(self, tmp_path):
+        """Test that /etc wins over /run, which wins over /usr/lib."""
+        dirs = self._dirs(str(tmp_path))
+        write(f"{dirs[ServiceLocation.DEFAULT]}/app.service", "[Unit]\n")
+        write(f"{dirs[ServiceLocation.RUNTIME]}/app.service", "[Unit]\n")
+        write(f"{dirs[ServiceLocation.DEFAULT]}/db.service", "[Unit]\n")
+        write(f"{dirs[ServiceLocation.GLOBAL]}/web.service", "[Unit]\n")
+
+        resolver = UnitResolver(root=str(tmp_path))
+
+        assert resolver.resolve("app.service") == (
+            f"{dirs[ServiceLocation.RUNTIME]}/app.service"
+        )
+        assert resolver.resolve("db.service") == (
+            f"{dirs[ServiceLocation.DEFAULT]}/db.service"
+        )
+        assert resolver.resolve("missing.service") is None
+        assert resolver.units() == ["app.service", "db.service", "web.service"]
+
+    def test_effective_config_merges_drop_ins(self, tmp_path):
+        """Test that drop-ins from all locations are merged in name order."""
+        dirs = self._dirs(str(tmp_path))
+        write(
+            f"{dirs[ServiceLocation.DEFAULT]}/app.service",
+            "[Service]\nExecStart=/usr/bin/app\nNice=0\n",
+        )
+        write(
+            f"{dirs[ServiceLocation.DEFAULT]}/app.service.d/10-nice.conf",
+            "[Service]\nNice=5\n",
+        )
+        # Same fragment name in /etc hides the vendor fragment.
+        write(
+            f"{dirs[ServiceLocation.GLOBAL]}/app.service.d/10-nice.conf",
+            "[Service]\nNice=10\n",
+        )
+        write(
+            f"{dirs[ServiceLocation.RUNTIME]}/app.service.d/20-exec.conf",
+            "[Service]\nExecStart=\nExecStart=/usr/bin/app --fast\n",
+        )
+
+        resolver = UnitResolver(root=str(tmp_path))
+
+        assert [os.path.basename(p) for p in resolver.drop_ins("app.service")] == [
+            "10-nice.conf",
+            "20-exec.conf",
+        ]
+        assert resolver.effective_config("app.service") == {
+            "Service": {"ExecStart": ["/usr/bin/app --fast"], "Nice": ["10"]}
+        }
+
+    def test_instances_use_template_and_its_drop_ins(self, tmp_path):
+        """Test that instances resolve to the template and its drop-ins."""
+        dirs = self._dirs(str(tmp_path))
+        etc = dirs[ServiceLocation.GLOBAL]
+        write(f"{etc}/worker@.service", "[Service]\nExecStart=/usr/bin/worker %i\n")
+        write(f"{etc}/worker@.service.d/10-nice.conf", "[Service]\nNice=5\n")
+        write(f"{etc}/worker@2.service.d/10-cpu.conf", "[Service]\nCPUAffinity=2\n")
+
+        resolver = UnitResolver(root=str(tmp_path))
+
+        assert resolver.resolve("worker@2.service") == f"{etc}/worker@.service"
+        assert resolver.effective_config("worker@2.service") == {
+            "Service": {
+                "ExecStart": ["/usr/bin/worker %i"],
+                "Nice": ["5"],
+                "CPUAffinity": ["2"],
+            }
+        }
+
+    def test_masked_unit(self, tmp_path):
+        """Test that units linked to /dev/null are masked."""
+        dirs = self._dirs(str(tmp_path))
+        write(f"{dirs[ServiceLocation.DEFAULT]}/app.service", "[Unit]\n")
+        os.makedirs(dirs[ServiceLocation.GLOBAL])
+        os.symlink(os.devnull, f"{dirs[ServiceLocation.GLOBAL]}/app.service")
+
+        resolver = UnitResolver(root=str(tmp_path))
+
+        assert resolver.is_masked("app.service")
+        assert resolver.effective_config("app.service") is None
+
+    def test_effective_config_is_cached(self, tmp_path):
+        """Test that unchanged units are not parsed again."""
+        dirs = self._dirs(str(tmp_path))
+        write(f"{dirs[ServiceLocation.GLOBAL]}/app.service", "[Unit]\n")
+        resolver = UnitResolver(root=str(tmp_path))
+
+        with patch.object(
+            resolver_module, "read_config", wraps=resolver_module.read_config
+        ) as mock_read:
+            first = resolver.effective_config("app.service")
+            second = resolver.effective_config("app.service")
+
+        assert first == second
+        assert mock_read.call_count == 1
+
+    def test_effective_config_returns_copies(self, tmp_path):
+        """Test that callers cannot change the cached configuration."""
+        dirs = self._dirs(str(tmp_path))
+        write(f"{dirs[ServiceLocation.GLOBAL]}/app.service", "[Unit]\nDescription=A\n")
+        resolver = UnitResolver(root=str(tmp_path))
+
+        resolver.effective_config("app.service")["Unit"]["Description"].append("B")
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["A"]}
+        }
+
+    def test_instance_and_template_fragments_interleave(self, tmp_path):
+        """Test that fragments are sorted together and instances hide names."""
+        dirs = self._dirs(str(tmp_path))
+        etc = dirs[ServiceLocation.GLOBAL]
+        usr = dirs[ServiceLocation.DEFAULT]
+        write(f"{etc}/worker@.service", "[Service]\nExecStart=/usr/bin/worker\n")
+        write(f"{etc}/worker@.service.d/10-a.conf", "[Service]\nNice=1\n")
+        write(f"{etc}/worker@.service.d/30-c.conf", "[Service]\nNice=3\n")
+        write(f"{etc}/worker@.service.d/override.conf", "[Service]\nUser=tmpl\n")
+        write(f"{etc}/worker@2.service.d/20-b.conf", "[Service]\nNice=2\n")
+        write(f"{etc}/worker@2.service.d/override.conf", "[Service]\nGroup=inst\n")
+        write(f"{usr}/worker@2.service.d/30-c.conf", "[Service]\nNice=9\n")
+
+        resolver = UnitResolver(root=str(tmp_path))
+
+        assert resolver.drop_ins("worker@2.service") == [
+            f"{etc}/worker@.service.d/10-a.conf",
+            f"{etc}/worker@2.service.d/20-b.conf",
+            f"{etc}/worker@.service.d/30-c.conf",
+            f"{etc}/worker@2.service.d/override.conf",
+        ]
+        assert resolver.effective_config("worker@2.service") == {
+            "Service": {
+                "ExecStart": ["/usr/bin/worker"],
+                "Nice": ["3"],
+                "Group": ["inst"],
+            }
+        }
+
+    def test_new_fragment_in_existing_drop_in_dir(self, tmp_path):
+        """Test that drop-in listings are refreshed when their mtime changes."""
+        dirs = self._dirs(str(tmp_path))
+        etc = dirs[ServiceLocation.GLOBAL]
+        write(f"{etc}/app.service", "[Unit]\nDescription=A\n")
+        write(f"{etc}/app.service.d/10-a.conf", "[Unit]\nDescription=B\n")
+        resolver = UnitResolver(root=str(tmp_path))
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["B"]}
+        }
+
+        with patch.object(
+            resolver_module.os, "listdir", wraps=resolver_module.os.listdir
+        ) as mock_listdir:
+            resolver.effective_config("app.service")
+        mock_listdir.assert_not_called()
+
+        write(f"{etc}/app.service.d/20-b.conf", "[Unit]\nDescription=C\n")
+        bump_mtime(f"{etc}/app.service.d")
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["C"]}
+        }
+
+    def test_only_changed_directories_are_rescanned(self, tmp_path):
+        """Test that only directories with a new mtime are rescanned."""
+        dirs = self._dirs(str(tmp_path))
+        for directory in dirs.values():
+            os.makedirs(directory)
+        resolver = UnitResolver(root=str(tmp_path))
+        resolver.refresh()
+
+        write(f"{dirs[ServiceLocation.RUNTIME]}/app.service", "[Unit]\n")
+        bump_mtime(dirs[ServiceLocation.RUNTIME])
+
+        with patch.object(
+            resolver_module.os, "scandir", wraps=resolver_module.os.scandir
+        ) as mock_scandir:
+            assert resolver.resolve("app.service") == (
+                f"{dirs[ServiceLocation.RUNTIME]}/app.service"
+            )
+            assert resolver.resolve("app.service")
+
+        mock_scandir.assert_called_once_with(dirs[ServiceLocation.RUNTIME])
+
+    def test_changes_invalidate_cache(self, tmp_path):
+        """Test that new files and edited fragments are picked up."""
+        dirs = self._dirs(str(tmp_path))
+        etc = dirs[ServiceLocation.GLOBAL]
+        write(f"{dirs[ServiceLocation.DEFAULT]}/app.service", "[Unit]\nDescription=A\n")
+        os.makedirs(etc)
+        resolver = UnitResolver(root=str(tmp_path))
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["A"]}
+        }
+
+        # An override in /etc now wins.
+        write(f"{etc}/app.service", "[Unit]\nDescription=B\n")
+        bump_mtime(etc)
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["B"]}
+        }
+
+        # Editing a drop-in in place is seen through its modification time.
+        fragment = write(f"{etc}/app.service.d/override.conf", "[Unit]\n")
+        bump_mtime(etc)
+        write(fragment, "[Unit]\nDescription=C\n")
+        bump_mtime(fragment)
+        assert resolver.effective_config("app.service") == {
+            "Unit": {"Description": ["C"]}
+        }
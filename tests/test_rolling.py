@@ -0,0 +1,159 @@
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from service_config_foundry import RollingRestart, Service, ServiceLocation
+from service_config_foundry.batch import systemctl
+from service_config_foundry.status import show_units
+
+rolling_module = sys.modules[RollingRestart.__module__]
+batch_module = sys.modules[systemctl.__module__]
+status_module = sys.modules[show_units.__module__]
+
+
+def make_service(name):
+    service = Service(name, service_location=ServiceLocation.TEST)
+    service.service_file.service.exec_start = f"/usr/bin/{name}"
+    return service
+
+
+class FakeSystemd:
+    """Answer `systemctl show` calls from a table of unit states."""
+
+    def __init__(self):
+        self.states = {}
+        # States units enter when restarted, "active" unless listed.
+        self.after_restart = {}
+        self.restarted = []
+
+    def show(self, command, use_sudo=True):
+        units = command.split()[4:]
+        stdout = "\n\n".join(
+            f"ActiveState={self.states.get(unit, 'active')}" for unit in units
+        )
+        return subprocess.CompletedProcess(command, 0, stdout=stdout, stderr="")
+
+    def systemctl(self, command, use_sudo=True):
+        if command.startswith("systemctl restart "):
+            units = command.split()[2:]
+            self.restarted.append(units)
+            for unit in units:
+                self.states[unit] = self.after_restart.get(unit, "active")
+
+
+@pytest.fixture
+def systemd(mock_service_location, monkeypatch):
+    """Replace systemctl with a fake systemd for the whole rollout."""
+    fake = FakeSystemd()
+    monkeypatch.setattr(status_module, "run_command", fake.show)
+    monkeypatch.setattr(batch_module, "run_command", fake.systemctl)
+    monkeypatch.setattr(rolling_module, "run_command", MagicMock())
+    return fake
+
+
+class TestRollingRestart:
+    """Test cases for restarting services in waves."""
+
+    def test_waves_of_batch_size(self, systemd):
+        """Test that services are restarted in waves of batch_size."""
+        services = [make_service(f"web-{i}") for i in range(5)]
+        waves = RollingRestart(services, batch_size=2).run()
+        assert waves == [["web-0", "web-1"], ["web-2", "web-3"], ["web-4"]]
+        assert systemd.restarted == [
+            ["web-0", "web-1"],
+            ["web-2", "web-3"],
+            ["web-4"],
+        ]
+
+    def test_writes_each_wave(self, systemd, mock_service_location):
+        """Test that configuration is written wave by wave."""
+        services = [make_service(f"web-{i}") for i in range(2)]
+        RollingRestart(services).run()
+        for service in services:
+            assert service.snapshot()[f"{mock_service_location}/{service.name}.service"]
+
+    def test_units_already_down_are_not_counted(self, systemd):
+        """Test that units down before the rollout do not use up the budget."""
+        systemd.states.update({"web-0": "inactive", "web-3": "activating"})
+        services = [make_service(f"web-{i}") for i in range(4)]
+        waves = RollingRestart(services, batch_size=3, max_unavailable=3).run()
+        assert waves == [["web-0", "web-1", "web-2"], ["web-3"]]
+
+    def test_stopped_units_need_not_become_active(self, systemd):
+        """Test that a oneshot unit that exits again passes its wave."""
+        systemd.states["job"] = "inactive"
+        systemd.after_restart["job"] = "inactive"
+        services = [make_service("job"), make_service("web")]
+        waves = RollingRestart(services, timeout=0).run()
+        assert waves == [["job"], ["web"]]
+
+    def test_max_unavailable_counts_units_going_down(self, systemd):
+        """Test that active units going down during the rollout stop it."""
+        services = [make_service(f"web-{i}") for i in range(3)]
+
+        def health(service):
+            systemd.states["web-2"] = "failed"
+            return True
+
+        with pytest.raises(RuntimeError, match="Too many units are unavailable"):
+            RollingRestart(services, health=health).run()
+        assert ["web-1"] not in systemd.restarted
+
+    def test_template_instances_count_as_units(self, systemd):
+        """Test that the instances of one service are split across waves."""
+        service = make_service("web@")
+        service.restart_units = lambda: [f"web@{i}.service" for i in range(3)]
+        waves = RollingRestart([service], batch_size=2).run()
+        assert waves == [["web@0.service", "web@1.service"], ["web@2.service"]]
+
+    def test_health_failure_rolls_back(self, systemd, mock_service_location):
+        """Test that an unhealthy wave restores every written service."""
+        services = [make_service(f"web-{i}") for i in range(3)]
+        for service in services:
+            service.write()
+            service.service_file.service.exec_start = "/usr/bin/new"
+
+        def health(service):
+            return service.name != "web-1"
+
+        with pytest.raises(RuntimeError, match="Wave 2 failed for web-1"):
+            RollingRestart(services, health=health).run()
+
+        for i in range(3):
+            with open(f"{mock_service_location}/web-{i}.service") as file:
+                assert f"ExecStart=/usr/bin/web-{i}" in file.read()
+        assert systemd.restarted[-1] == ["web-0", "web-1"]
+
+    def test_failed_unit_rolls_back(self, systemd):
+        """Test that a unit entering failed stops the rollout."""
+        systemd.after_restart["web-0"] = "failed"
+        services = [make_service(f"web-{i}") for i in range(2)]
+        with pytest.raises(RuntimeError, match="Wave 1 failed for web-0"):
+            RollingRestart(services, max_unavailable=2).run()
+        assert ["web-1"] not in systemd.restarted
+
+    def test_rollback_permission_denied(self, systemd, monkeypatch):
+        """Test that a rollback without write access exits cleanly."""
+        systemd.after_restart["web-0"] = "failed"
+        service = make_service("web-0")
+
+        def restore(snapshot):
+            raise PermissionError
+
+        monkeypatch.setattr(service, "restore", restore)
+        with pytest.raises(SystemExit):
+            RollingRestart([service]).run()
+
+    def test_restart_only(self, systemd, mock_service_location):
+        """Test that write=False only restarts and never rolls back files."""
+        services = [make_service(f"web-{i}") for i in range(2)]
+        RollingRestart(services, write=False).run()
+        assert systemd.restarted == [["web-0"], ["web-1"]]
+        assert not services[0].snapshot()[f"{mock_service_location}/web-0.service"]
+
+    def test_invalid_batch_size(self):
+        """Test that empty waves are rejected."""
+        with pytest.raises(ValueError, match="batch_size"):
+            RollingRestart([], batch_size=0)
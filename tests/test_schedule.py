@@ -0,0 +1,367 @@
+import pytest
+
+from service_config_foundry import Service
+from service_config_foundry.schedule import (
+    compile_calendar,
+    firing_counts,
+    monotonic_elapses,
+    next_elapses,
+    parse_timespan,
+    plan_timers,
+    shift_calendar,
+    spread_timers,
+)
+
+np = pytest.importorskip("numpy")
+
+START = "2024-01-01T00:00:00"  # A Monday
+
+
+def as_strings(elapses):
+    return [str(value) for value in elapses]
+
+
+class TestParseTimespan:
+    """Test cases for parsing systemd time spans."""
+
+    def test_single_units(self):
+        """Test spans with a single unit."""
+        assert parse_timespan("5s") == 5
+        assert parse_timespan("100ms") == 0.1
+        assert parse_timespan("2h") == 7200
+        assert parse_timespan("1week") == 604800
+
+    def test_combined_units(self):
+        """Test spans combining several units, with or without spaces."""
+        assert parse_timespan("1h 30min") == 5400
+        assert parse_timespan("1h30min") == 5400
+        assert parse_timespan("1d 2h 3m 4s") == 93784
+
+    def test_bare_number_is_seconds(self):
+        """Test that a number without a unit is read as seconds."""
+        assert parse_timespan("90") == 90
+        assert parse_timespan(30) == 30
+
+    def test_infinity(self):
+        """Test the special value infinity."""
+        assert parse_timespan("infinity") == float("inf")
+
+    @pytest.mark.parametrize("text", ["", "soon", "5 parsecs", "1h x"])
+    def test_invalid(self, text):
+        """Test that malformed spans raise a ValueError."""
+        with pytest.raises(ValueError):
+            parse_timespan(text)
+
+
+class TestCompileCalendar:
+    """Test cases for compiling OnCalendar expressions."""
+
+    def test_shortcut_matches_expanded_form(self):
+        """Test that shortcuts compile to the same schedule as their expansion."""
+        assert (
+            compile_calendar("daily").key() == compile_calendar("*-*-* 00:00:00").key()
+        )
+        assert compile_calendar("weekly").key() == compile_calendar("Mon").key()
+
+    def test_fields(self):
+        """Test ranges, lists and repetitions in the individual fields."""
+        spec = compile_calendar("Mon..Fri 2024-*-1,15 08..10:0/20")
+
+        assert spec.weekdays == [0, 1, 2, 3, 4]
+        assert spec.years == [2024]
+        assert spec.months is None
+        assert spec.days == [1, 15]
+        assert spec.hours == [8, 9, 10]
+        assert spec.minutes == [0, 20, 40]
+        assert spec.seconds == [0]
+
+    def test_time_only(self):
+        """Test that an expression with only a time fires every day."""
+        spec = compile_calendar("*:*")
+
+        assert spec.days is None
+        assert spec.minutes == list(range(60))
+        assert spec.seconds == [0]
+
+    def test_is_cached(self):
+        """Test that compiling the same expression returns the cached result."""
+        assert compile_calendar("hourly") is compile_calendar("hourly")
+
+    @pytest.mark.parametrize(
+        "expression", ["every day", "*-*-* 25:00", "*-02~03", "Mon 1:2:3:4"]
+    )
+    def test_invalid(self, expression):
+        """Test that unsupported or malformed expressions raise a ValueError."""
+        with pytest.raises(ValueError):
+            compile_calendar(expression)
+
+
+class TestNextElapses:
+    """Test cases for computing calendar elapse times."""
+
+    def test_shape_and_values(self):
+        """Test the elapse times of several expressions at once."""
+        elapses = next_elapses(["daily", "Mon..Fri 09:00", "*:0/15"], START, count=3)
+
+        assert elapses.shape == (3, 3)
+        assert as_strings(elapses[0]) == [
+            "2024-01-02T00:00:00",
+            "2024-01-03T00:00:00",
+            "2024-01-04T00:00:00",
+        ]
+        assert as_strings(elapses[1]) == [
+            "2024-01-01T09:00:00",
+            "2024-01-02T09:00:00",
+            "2024-01-03T09:00:00",
+        ]
+        assert as_strings(elapses[2]) == [
+            "2024-01-01T00:15:00",
+            "2024-01-01T00:30:00",
+            "2024-01-01T00:45:00",
+        ]
+
+    def test_weekends_are_skipped(self):
+        """Test that weekday restrictions skip the weekend."""
+        elapses = next_elapses(["Mon..Fri 09:00"], "2024-01-05T10:00:00", count=1)
+
+        assert as_strings(elapses[0]) == ["2024-01-08T09:00:00"]
+
+    def test_rare_expression_extends_horizon(self):
+        """Test that rare schedules are found beyond the initial horizon."""
+        elapses = next_elapses(["*-02-29 12:00"], START, count=3)
+
+        assert as_strings(elapses[0]) == [
+            "2024-02-29T12:00:00",
+            "2028-02-29T12:00:00",
+            "2032-02-29T12:00:00",
+        ]
+
+    def test_past_expression_is_padded(self):
+        """Test that schedules that never elapse again are padded with NaT."""
+        elapses = next_elapses(["2020-01-01"], START, count=2, max_years=2)
+
+        assert np.isnat(elapses).all()
+
+    def test_equivalent_expressions_share_results(self):
+        """Test that many equivalent expressions produce identical rows."""
+        expressions = ["hourly", "*-*-* *:00:00"] * 1000
+        elapses = next_elapses(expressions, START, count=2)
+
+        assert elapses.shape == (2000, 2)
+        assert (elapses == elapses[0]).all()
+
+
+class TestMonotonicElapses:
+    """Test cases for computing monotonic timer elapse times."""
+
+    def test_boot_and_unit_active(self):
+        """Test repeating and one-shot monotonic timers."""
+        elapses = monotonic_elapses(START, ["5min", "10s"], ["1h", None], count=3)
+
+        assert as_strings(elapses[0]) == [
+            "2024-01-01T00:05:00",
+            "2024-01-01T01:05:00",
+            "2024-01-01T02:05:00",
+        ]
+        assert as_strings(elapses[1][:1]) == ["2024-01-01T00:00:10"]
+        assert np.isnat(elapses[1][1:]).all()
+
+
+class TestPlanTimers:
+    """Test cases for planning the timers of services."""
+
+    def test_merges_multiple_expressions(self):
+        """Test that a timer with several expressions gets the earliest elapses."""
+        backup = Service("backup")
+        backup.timer_file.timer.on_calendar = ["*-*-* 12:00", "*-*-* 06:00"]
+        report = Service("report")
+        report.timer_file.timer.on_calendar = "hourly"
+        plain = Service("plain")
+
+        plans = plan_timers([backup, report, plain], START, count=3)
+
+        assert set(plans) == {"backup.timer", "report.timer"}
+        assert as_strings(plans["backup.timer"]) == [
+            "2024-01-01T06:00:00",
+            "2024-01-01T12:00:00",
+            "2024-01-02T06:00:00",
+        ]
+        assert len(plans["report.timer"]) == 3
+
+
+class TestFiringCounts:
+    """Test cases for finding timers that fire together."""
+
+    def test_counts_per_second(self):
+        """Test counting elapses that fall into the same second."""
+        elapses = next_elapses(["hourly", "*:00/30", "daily"], START, count=2)
+        times, counts = firing_counts(elapses)
+
+        assert as_strings(times[:2]) == [
+            "2024-01-01T00:30:00",
+            "2024-01-01T01:00:00",
+        ]
+        assert counts[:2].tolist() == [1, 2]
+
+    def test_resolution_widens_buckets(self):
+        """Test that a coarser resolution such as AccuracySec= merges elapses."""
+        elapses = next_elapses(["*:05:00", "*:05:30"], START, count=1)
+
+        _, per_second = firing_counts(elapses)
+        _, per_minute = firing_counts(elapses, "1min")
+
+        assert per_second.tolist() == [1, 1]
+        assert per_minute.tolist() == [2]
+
+
+def make_timers(count, on_calendar="*-*-* *:00:00"):
+    services = []
+    for index in range(count):
+        service = Service(f"job{index}")
+        service.timer_file.timer.on_calendar = on_calendar
+        services.append(service)
+    return services
+
+
+class TestShiftCalendar:
+    """Test cases for shifting OnCalendar expressions."""
+
+    def test_shift_within_hour(self):
+        """Test shifting an hourly schedule by minutes and seconds."""
+        assert shift_calendar("hourly", 754) == "*-*-* *:12:34"
+        assert shift_calendar("Mon..Fri *:30", 60) == "Mon..Fri *:31:00"
+
+    def test_shift_carries_into_fixed_hour(self):
+        """Test that offsets carry into the hour when the hour is fixed."""
+        assert shift_calendar("daily", 5400) == "*-*-* 01:30:00"
+        assert shift_calendar("*-*-* 02:00 UTC", 30) == "*-*-* 02:00:30 UTC"
+
+    def test_shift_past_hour_raises(self):
+        """Test that hourly schedules cannot be shifted past the hour."""
+        with pytest.raises(ValueError):
+            shift_calendar("hourly", 3600)
+
+    def test_varying_minutes_raise(self):
+        """Test that schedules with several minutes cannot be shifted."""
+        with pytest.raises(ValueError):
+            shift_calendar("*:0/15", 10)
+
+
+class TestSpreadTimers:
+    """Test cases for spreading timers across a window."""
+
+    def test_offsets_are_stable(self):
+        """Test that offsets depend on unit names, not on the input order."""
+        first = spread_timers(make_timers(50), window="10min")
+        second = spread_timers(list(reversed(make_timers(50))), window="10min")
+
+        assert first == second
+        assert len(set(first.values())) == 50
+
+    def test_rewrites_on_calendar(self):
+        """Test that timers are shifted by their offsets."""
+        services = make_timers(3)
+        offsets = spread_timers(services, window="1h")
+
+        for service in services:
+            offset = offsets[f"{service.name}.timer"]
+            expected = f"*-*-* *:{offset // 60:02d}:{offset % 60:02d}"
+            assert service.timer_file.timer.on_calendar == expected
+            assert service.timer_file.timer.accuracy_sec == "1s"
+
+    def test_limit_per_interval(self):
+        """Test that no interval receives more than the allowed firings."""
+        services = make_timers(300)
+        spread_timers(services, window="1min", max_per_interval=5)
+
+        elapses = plan_timers(services, START, count=1)
+        _, counts = firing_counts(elapses)
+        assert counts.max() <= 5
+        assert counts.sum() == 300
+
+    def test_accuracy_occupies_intervals(self):
+        """Test that a timer's AccuracySec= window blocks the intervals it covers."""
+        services = make_timers(4)
+        for service in services:
+            service.timer_file.timer.accuracy_sec = "10s"
+
+        offsets = sorted(spread_timers(services, window="2min").values())
+
+        assert all(b - a >= 10 for a, b in zip(offsets, offsets[1:]))
+
+    def test_window_too_small_raises(self):
+        """Test that a full window raises a ValueError."""
+        with pytest.raises(ValueError):
+            spread_timers(make_timers(11), window="10s")
+
+    def test_respread_with_base_is_stable(self):
+        """Test that spreading again from the base gives the same schedule."""
+        services = make_timers(20)
+        first = spread_timers(services, window="10min")
+        calendars = [service.timer_file.timer.on_calendar for service in services]
+
+        second = spread_timers(services, window="10min", base="*-*-* *:00:00")
+
+        assert second == first
+        assert [s.timer_file.timer.on_calendar for s in services] == calendars
+
+    def test_respread_without_base_raises(self):
+        """Test that spread timers are not shifted a second time."""
+        services = make_timers(3)
+        spread_timers(services, window="10min")
+        calendars = [service.timer_file.timer.on_calendar for service in services]
+
+        with pytest.raises(ValueError, match="share one schedule"):
+            spread_timers(services, window="10min")
+        assert [s.timer_file.timer.on_calendar for s in services] == calendars
+
+    def test_different_schedules_raise(self):
+        """Test that timers with different schedules are rejected."""
+        services = make_timers(2) + make_timers(1, on_calendar="daily")
+        services[-1].name = "nightly"
+
+        with pytest.raises(ValueError, match="share one schedule"):
+            spread_timers(services, window="10min")
+
+    def test_equivalent_schedules_share_base(self):
+        """Test that equivalent expressions count as one schedule."""
+        services = make_timers(1) + make_timers(1, on_calendar="hourly")
+        services[-1].name = "other"
+
+        spread_timers(services, window="10min")
+
+        assert all(
+            s.timer_file.timer.on_calendar.startswith("*-*-* *:") for s in services
+        )
+
+    def test_cannot_fit_leaves_timers_untouched(self):
+        """Test that a full window changes no timer."""
+        services = make_timers(11)
+        with pytest.raises(ValueError, match="Cannot fit"):
+            spread_timers(services, window="10s")
+
+        for service in services:
+            assert service.timer_file.timer.on_calendar == "*-*-* *:00:00"
+            assert service.timer_file.timer.accuracy_sec is None
+
+    def test_cannot_shift_leaves_timers_untouched(self):
+        """Test that a shift past the hour changes no timer."""
+        services = make_timers(50, on_calendar="*-*-* *:30:00")
+        with pytest.raises(ValueError, match="Cannot shift"):
+            spread_timers(services, window="1h")
+
+        for service in services:
+            assert service.timer_file.timer.on_calendar == "*-*-* *:30:00"
+            assert service.timer_file.timer.accuracy_sec is None
+
+    def test_randomized(self):
+        """Test delegating the spreading to systemd."""
+        services = make_timers(2)
+        offsets = spread_timers(services, window="30min", randomized=True)
+
+        assert offsets == {"job0.timer": None, "job1.timer": None}
+        for service in services:
+            timer = service.timer_file.timer
+            assert timer.on_calendar == "*-*-* *:00:00"
+            assert timer.randomized_delay_sec == "30min"
+            assert timer.fixed_random_delay is True
@@ -1,8 +1,10 @@
+from service_config_foundry.file_type import File, FileType
 from service_config_foundry.sections import (
     Automount,
     Install,
     Mount,
     Path,
+    ResourceControl,
     Scope,
     ServiceSection,
     Slice,
@@ -84,6 +86,7 @@ class TestInstall:
         assert hasattr(install, "required_by")
         assert hasattr(install, "alias")
         assert hasattr(install, "also")
+        assert hasattr(install, "default_instance")
 
     def test_install_attribute_setting(self):
         """Test setting Install section attributes."""
@@ -126,6 +129,31 @@ class TestSocket:
         assert socket.socket_group == "www-data"
         assert socket.socket_mode == "0660"
 
+    def test_socket_tuning_directive_names(self):
+        """Test that socket tuning attributes map to systemd directive names."""
+        file = File(FileType.SOCKET)
+        file.socket.backlog = 4096
+        file.socket.reuse_port = True
+        file.socket.no_delay = True
+        file.socket.receive_buffer = "4M"
+        file.socket.send_buffer = "4M"
+        file.socket.max_connections = 1024
+        file.socket.defer_accept_sec = "5s"
+        file.socket.file_descriptor_name = "http"
+        file.socket.bind_i_pv6_only = "both"
+
+        assert list(file.get_config(requirement_check=False)["Socket"]) == [
+            "Backlog",
+            "BindIPv6Only",
+            "ReusePort",
+            "NoDelay",
+            "ReceiveBuffer",
+            "SendBuffer",
+            "MaxConnections",
+            "DeferAcceptSec",
+            "FileDescriptorName",
+        ]
+
 
 class TestTimer:
     """Test cases for Timer section."""
@@ -141,6 +169,8 @@ class TestTimer:
         assert hasattr(timer, "on_unit_inactive_sec")
         assert hasattr(timer, "on_calendar")
         assert hasattr(timer, "accuracy_sec")
+        assert hasattr(timer, "randomized_delay_sec")
+        assert hasattr(timer, "fixed_random_delay")
         assert hasattr(timer, "persistent")
         assert hasattr(timer, "wake_system")
         assert hasattr(timer, "unit")
@@ -269,6 +299,16 @@ class TestSlice:
         assert hasattr(slice_obj, "memory_accounting")
         assert hasattr(slice_obj, "block_i_o_accounting")
 
+    def test_slice_resource_control(self):
+        """Test that Slice supports the resource-control directives."""
+        slice_obj = Slice()
+        slice_obj.c_p_u_weight = 100
+        slice_obj.memory_max = "1G"
+
+        assert isinstance(slice_obj, ResourceControl)
+        assert slice_obj.c_p_u_weight == 100
+        assert slice_obj.memory_max == "1G"
+
     def test_slice_is_instantiable(self):
         """Test that Slice can be instantiated."""
         slice_obj = Slice()
@@ -294,3 +334,43 @@ class TestScope:
 
         assert scope.c_p_u_accounting is True
         assert scope.memory_accounting is True
+
+    def test_scope_resource_control(self):
+        """Test that Scope supports resource control and slice placement."""
+        scope = Scope()
+        assert isinstance(scope, ResourceControl)
+        assert hasattr(scope, "slice")
+        assert hasattr(scope, "tasks_max")
+
+
+class TestResourceControl:
+    """Test cases for the resource-control directives."""
+
+    def test_service_section_resource_control(self):
+        """Test that ServiceSection supports the resource-control directives."""
+        service = ServiceSection()
+        assert isinstance(service, ResourceControl)
+        for attribute in [
+            "slice",
+            "c_p_u_weight",
+            "c_p_u_quota",
+            "memory_max",
+            "memory_high",
+            "i_o_weight",
+            "tasks_max",
+            "allowed_c_p_us",
+        ]:
+            assert hasattr(service, attribute)
+
+    def test_directive_names(self):
+        """Test that the attributes map to systemd directive names."""
+        file = File(FileType.SERVICE)
+        file.service.c_p_u_weight = 200
+        file.service.allowed_c_p_us = "0-3"
+        file.service.i_o_read_i_o_p_s_max = "/dev/sda 1000"
+
+        assert file.get_config(requirement_check=False)["Service"] == {
+            "CPUWeight": 200,
+            "AllowedCPUs": "0-3",
+            "IOReadIOPSMax": "/dev/sda 1000",
+        }
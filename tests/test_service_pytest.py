@@ -1,6 +1,7 @@
 # Import the actual service module to get the correct reference
+import os
 import sys
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import MagicMock, call, mock_open, patch
 
 import pytest
 
@@ -125,6 +126,17 @@ class TestServiceSystemctlCommands:
         service.enable_service_at_startup()
         mock_run_command.assert_called_once_with("systemctl enable test-service")
 
+    @patch("os.path.exists", return_value=True)
+    @patch.object(service_module, "run_command")
+    def test_disable_service_at_startup(self, mock_run_command, mock_exists):
+        """Test disabling a service and its timer at startup."""
+        service = Service("test-service")
+        service.disable_service_at_startup()
+        assert mock_run_command.call_args_list == [
+            call("systemctl disable test-service"),
+            call("systemctl disable test-service.timer"),
+        ]
+
     @patch("os.path.exists", return_value=False)
     @patch.object(service_module, "run_command")
     def test_start_service(self, mock_run_command, mock_exists):
@@ -141,6 +153,24 @@ class TestServiceSystemctlCommands:
         service.start_service()
         mock_run_command.assert_called_once_with("systemctl restart test-service.timer")
 
+    @patch.object(service_module, "run_command")
+    def test_start_socket_only_service(self, mock_run_command, mock_service_location):
+        """Test that a service writing only a socket restarts the socket."""
+        service = Service("test-service", service_location=ServiceLocation.TEST)
+        service.socket_file.socket.listen_stream = "8080"
+        service.write()
+        assert service.restart_units() == ["test-service.socket"]
+        assert service.reload_units() == ["test-service.socket"]
+
+    def test_scope_file_not_written(self, mock_service_location):
+        """Test that scopes, which are transient only, are never written."""
+        service = Service("test-service", service_location=ServiceLocation.TEST)
+        service.service_file.service.exec_start = "/usr/bin/test"
+        service.scope_file.scope.slice = "example.slice"
+        service.write()
+        assert not os.path.exists(f"{mock_service_location}/test-service.scope")
+        assert "test-service.scope" not in service.unit_configs()
+
     @patch.object(service_module, "run_command")
     def test_status(self, mock_run_command):
         """Test getting service status."""
@@ -279,6 +309,94 @@ class TestServiceReplace:
         mock_enable.assert_called_once()
 
 
+class TestServiceImpacts:
+    """Test cases for picking the cheapest action after a change."""
+
+    def _write_existing(self, directory, content):
+        with open(f"{directory}/test-service.service", "w") as f:
+            f.write(content)
+
+    def _service(self, **kwargs):
+        service = Service(
+            "test-service", service_location=ServiceLocation.TEST, **kwargs
+        )
+        service.service_file.unit.description = "Test"
+        service.service_file.service.exec_start = "/usr/bin/app"
+        service.service_file.install.wanted_by = "multi-user.target"
+        return service
+
+    @patch.object(service_module, "run_command")
+    def test_unchanged_config_does_nothing(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that rewriting identical files neither reloads nor restarts."""
+        self._write_existing(
+            mock_service_location,
+            "[Unit]\nDescription=Test\n[Service]\nExecStart=/usr/bin/app\n"
+            "[Install]\nWantedBy=multi-user.target\n",
+        )
+        self._service().replace()
+        mock_run_command.assert_not_called()
+
+    @patch.object(service_module, "run_command")
+    def test_description_change_only_reloads_daemon(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that a metadata change does not restart the service."""
+        self._write_existing(
+            mock_service_location,
+            "[Unit]\nDescription=Old\n[Service]\nExecStart=/usr/bin/app\n"
+            "[Install]\nWantedBy=multi-user.target\n",
+        )
+        self._service().replace()
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
+
+    @patch.object(service_module, "run_command")
+    def test_install_change_reenables(self, mock_run_command, mock_service_location):
+        """Test that an [Install] change re-enables instead of restarting."""
+        self._write_existing(
+            mock_service_location,
+            "[Unit]\nDescription=Test\n[Service]\nExecStart=/usr/bin/app\n"
+            "[Install]\nWantedBy=graphical.target\n",
+        )
+        self._service(enable_at_startup=True).replace()
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl reenable test-service"),
+        ]
+
+    @patch.object(service_module, "run_command")
+    def test_reload_file_change_reloads(self, mock_run_command, mock_service_location):
+        """Test that a reload-only change reloads instead of restarting."""
+        self._write_existing(
+            mock_service_location,
+            "[Unit]\nDescription=Test\n[Service]\nExecStart=/usr/bin/app\n"
+            "ReloadFile=/etc/app/old.conf\n"
+            "[Install]\nWantedBy=multi-user.target\n",
+        )
+        service = self._service()
+        service.service_file.service.reload_file = "/etc/app/new.conf"
+        service.replace()
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl reload-or-restart test-service"),
+        ]
+
+    @patch.object(service_module, "run_command")
+    def test_exec_start_change_restarts(self, mock_run_command, mock_service_location):
+        """Test that a change to the running process restarts the service."""
+        self._write_existing(
+            mock_service_location,
+            "[Unit]\nDescription=Test\n[Service]\nExecStart=/usr/bin/old\n"
+            "[Install]\nWantedBy=multi-user.target\n",
+        )
+        self._service().replace()
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart test-service"),
+        ]
+
+
 class TestServiceUpdate:
     """Test cases for service updates."""
 
@@ -291,32 +409,71 @@ class TestServiceUpdate:
         with pytest.raises(ValueError, match="No service found for test-service"):
             service.update()
 
-    @patch("os.listdir")
-    @patch.object(service_module, "CaseSensitiveConfigParser")
-    @patch.object(Service, "_Service__file_configs")
-    @patch.object(Service, "_Service__add_attributes")
-    @patch.object(Service, "replace")
-    @patch.object(service_module, "merge_dicts")
-    def test_update_existing_service(
-        self,
-        mock_merge,
-        mock_replace,
-        mock_add_attrs,
-        mock_file_configs,
-        mock_config_parser,
-        mock_listdir,
-    ):
-        """Test updating an existing service."""
-        mock_listdir.return_value = ["test-service.service"]
-        mock_file_configs.return_value = []
-        mock_merge.return_value = {}
+    @patch.object(service_module, "run_command")
+    def test_update_existing_service(self, mock_run_command, mock_service_location):
+        """Test that update patches the set directives into the file on disk."""
+        with open(f"{mock_service_location}/test-service.service", "w") as f:
+            f.write(
+                "[Unit]\nDescription=Old\n\n[Service]\nType=simple\n"
+                "ExecStart=/usr/bin/app\n"
+            )
 
         service = Service("test-service", service_location=ServiceLocation.TEST)
+        service.service_file.unit.description = "New"
         service.update()
 
-        # Verify configuration was read and service was replaced
-        mock_config_parser.assert_called()
-        mock_replace.assert_called_once()
+        with open(f"{mock_service_location}/test-service.service") as f:
+            content = f.read()
+        assert "Description=New" in content
+        assert "Type=simple" in content
+        assert "ExecStart=/usr/bin/app" in content
+
+        # Only a daemon-reload is needed for a description change.
+        mock_run_command.assert_called_once_with("systemctl daemon-reload")
+
+        # The instance now mirrors the merged configuration.
+        assert service.service_file.service.type == "simple"
+
+    @patch.object(service_module, "run_command")
+    def test_update_leaves_untouched_files_alone(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that files without set directives are neither read nor rewritten."""
+        timer_path = f"{mock_service_location}/test-service.timer"
+        with open(f"{mock_service_location}/test-service.service", "w") as f:
+            f.write("[Service]\nExecStart=/usr/bin/app\n")
+        with open(timer_path, "w") as f:
+            f.write("[Timer]\nOnCalendar=daily\n")
+        timer_mtime = os.stat(timer_path).st_mtime_ns
+
+        service = Service(
+            "test-service", service_location=ServiceLocation.TEST, auto_start=False
+        )
+        service.service_file.service.user = "app"
+        service.update()
+
+        assert os.path.exists(timer_path)
+        assert os.stat(timer_path).st_mtime_ns == timer_mtime
+
+    @patch.object(service_module, "run_command")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_update_skips_unchanged_files(
+        self, mock_file, mock_run_command, mock_service_location
+    ):
+        """Test that a no-op update writes nothing and runs no commands."""
+        with patch.object(
+            service_module,
+            "read_config",
+            return_value={"Service": {"ExecStart": ["/usr/bin/app"]}},
+        ), patch("os.path.isfile", return_value=True), patch(
+            "os.listdir", return_value=["test-service.service"]
+        ):
+            service = Service("test-service", service_location=ServiceLocation.TEST)
+            service.service_file.service.exec_start = "/usr/bin/app"
+            service.update()
+
+        mock_file.assert_not_called()
+        mock_run_command.assert_not_called()
 
 
 class TestServiceFileConfigs:
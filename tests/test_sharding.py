@@ -0,0 +1,179 @@
+import os
+import sys
+from unittest.mock import patch
+
+from service_config_foundry import ServiceLocation
+from service_config_foundry.config_parser import read_config
+from service_config_foundry.sharding import ShardedSocket
+
+batch_module = sys.modules["service_config_foundry.batch"]
+
+
+def make_shards(**options):
+    sharded = ShardedSocket(
+        "front",
+        "0.0.0.0:8080",
+        shards=4,
+        service_location=ServiceLocation.TEST,
+        **options,
+    )
+    sharded.socket_file.socket.backlog = 4096
+    sharded.service_file.service.exec_start = "/usr/bin/front"
+    return sharded
+
+
+class TestShardedSocket:
+    """Test cases for building sharded socket-activated services."""
+
+    def test_default_shards_per_cpu(self):
+        """Test that there is one shard per CPU by default."""
+        assert ShardedSocket("front", "8080").shards == os.cpu_count()
+
+    @patch("os.cpu_count", return_value=8)
+    def test_pairs(self, _):
+        """Test that every shard gets its own socket and pinned service."""
+        services = make_shards().services()
+
+        assert [service.name for service in services] == [
+            "front-0",
+            "front-1",
+            "front-2",
+            "front-3",
+        ]
+        configs = services[2].unit_configs()
+        assert configs["front-2.socket"] == {
+            "Socket": {
+                "ListenStream": "0.0.0.0:8080",
+                "Backlog": 4096,
+                "ReusePort": True,
+            },
+            "Install": {"WantedBy": "sockets.target"},
+        }
+        assert configs["front-2.service"]["Service"]["CPUAffinity"] == 2
+
+    @patch("os.cpu_count", return_value=2)
+    def test_more_shards_than_cpus(self, _):
+        """Test that shards wrap around the CPUs."""
+        services = make_shards().services()
+        assert [s.service_file.service.c_p_u_affinity for s in services] == [
+            0,
+            1,
+            0,
+            1,
+        ]
+
+    def test_shared_settings_are_copied(self):
+        """Test that shards do not share section objects."""
+        services = make_shards().services()
+        services[0].socket_file.socket.backlog = 16
+        assert services[1].socket_file.socket.backlog == 4096
+
+    def test_template(self):
+        """Test that template shards use one template with an instance each."""
+        sharded = make_shards(template=True)
+        (template,) = sharded.services()
+
+        assert template.instances == [0, 1, 2, 3]
+        assert set(template.unit_configs()) == {"front@.socket", "front@.service"}
+        assert template.service_file.service.c_p_u_affinity is None
+        assert sharded.socket_units()[0] == "front@0.socket"
+
+    def test_without_pinning(self):
+        """Test that pinning can be turned off."""
+        services = make_shards(pin_cpus=False).services()
+        assert services[0].service_file.service.c_p_u_affinity is None
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_write(self, mock_run_command, _, mock_service_location):
+        """Test that shards are written in one batch and their sockets started."""
+        make_shards().write()
+
+        path = os.path.join(mock_service_location, "front-3.socket")
+        assert read_config(path)["Socket"]["ReusePort"] == ["true"]
+        assert [c.args[0] for c in mock_run_command.call_args_list] == [
+            "systemctl daemon-reload",
+            "systemctl enable front-0.socket front-1.socket front-2.socket "
+            "front-3.socket",
+            "systemctl restart front-0.socket front-1.socket front-2.socket "
+            "front-3.socket",
+            "systemctl try-restart front-0.service front-1.service front-2.service "
+            "front-3.service",
+        ]
+
+    @patch("service_config_foundry.service.run_command")
+    @patch("service_config_foundry.template.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_rewrite_unchanged(
+        self, mock_run_command, mock_template_run_command, _, mock_service_location
+    ):
+        """Test that rewriting unchanged shards runs nothing."""
+        make_shards(template=True).write()
+        mock_run_command.reset_mock()
+        mock_template_run_command.reset_mock()
+
+        make_shards(template=True).write()
+        mock_run_command.assert_not_called()
+        mock_template_run_command.assert_not_called()
+
+    @patch("os.cpu_count", return_value=2)
+    @patch("service_config_foundry.service.run_command")
+    @patch("service_config_foundry.template.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_write_template_pins_instances(
+        self, mock_run_command, mock_template_run_command, _, __, mock_service_location
+    ):
+        """Test that template instances are pinned like pairs, with drop-ins."""
+        make_shards(template=True).write()
+
+        affinities = [
+            read_config(
+                os.path.join(
+                    mock_service_location, f"front@{shard}.service.d", "affinity.conf"
+                )
+            )["Service"]["CPUAffinity"]
+            for shard in range(4)
+        ]
+        assert affinities == [["", "0"], ["", "1"], ["", "0"], ["", "1"]]
+        mock_template_run_command.assert_called_once_with("systemctl daemon-reload")
+
+    @patch("service_config_foundry.service.run_command")
+    @patch("service_config_foundry.template.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_rewrite_restarts_running_services(
+        self, mock_run_command, mock_template_run_command, _, mock_service_location
+    ):
+        """Test that a change needing a restart also restarts running shards."""
+        make_shards(template=True).write()
+        mock_run_command.reset_mock()
+
+        sharded = make_shards(template=True)
+        sharded.service_file.service.exec_start = "/usr/bin/front --v2"
+        sharded.write()
+
+        sockets = " ".join(f"front@{shard}.socket" for shard in range(4))
+        services = " ".join(f"front@{shard}.service" for shard in range(4))
+        assert [c.args[0] for c in mock_run_command.call_args_list] == [
+            "systemctl daemon-reload",
+            f"systemctl enable {sockets}",
+            f"systemctl restart {sockets}",
+            f"systemctl try-restart {services}",
+        ]
+
+    @patch("service_config_foundry.service.run_command")
+    @patch("service_config_foundry.template.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_new_affinity_restarts_running_shards(
+        self, mock_run_command, mock_template_run_command, _, mock_service_location
+    ):
+        """Test that shards whose CPU changed are restarted if running."""
+        with patch("os.cpu_count", return_value=4):
+            make_shards(template=True).write()
+        mock_run_command.reset_mock()
+
+        with patch("os.cpu_count", return_value=2):
+            make_shards(template=True).write()
+
+        assert [c.args[0] for c in mock_run_command.call_args_list] == [
+            "systemctl try-restart front@2.service front@3.service",
+        ]
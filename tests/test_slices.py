@@ -0,0 +1,116 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation, SliceTree
+from service_config_foundry.config_parser import read_config
+from service_config_foundry.slices import slice_unit
+
+batch_module = sys.modules["service_config_foundry.batch"]
+
+
+class TestSliceUnit:
+    """Test cases for slice unit names."""
+
+    def test_nested_path(self):
+        """Test that path components are joined with dashes."""
+        assert slice_unit("prod") == "prod.slice"
+        assert slice_unit("prod/db") == "prod-db.slice"
+        assert slice_unit("/prod/db/replica/") == "prod-db-replica.slice"
+
+    @pytest.mark.parametrize("path", ["", "prod//db", "batch-jobs"])
+    def test_invalid_path(self, path):
+        """Test that empty components and dashes are rejected."""
+        with pytest.raises(ValueError, match="Invalid slice path"):
+            slice_unit(path)
+
+
+class TestSliceTree:
+    """Test cases for building and writing slice trees."""
+
+    def test_add_slice_creates_parents(self):
+        """Test that adding a nested slice adds its parents."""
+        tree = SliceTree()
+        tree.add_slice("prod/db/replica", c_p_u_weight=500)
+
+        assert tree.slices() == [
+            "prod.slice",
+            "prod-db.slice",
+            "prod-db-replica.slice",
+        ]
+
+    def test_add_slice_sets_directives(self):
+        """Test that resource-control settings are applied to the slice."""
+        tree = SliceTree()
+        section = tree.add_slice("batch", memory_high="2G", c_p_u_quota="50%")
+
+        assert section.memory_high == "2G"
+        assert section.c_p_u_quota == "50%"
+
+    def test_unknown_directive(self):
+        """Test that unknown directives raise a ValueError."""
+        with pytest.raises(ValueError, match="Unknown resource-control"):
+            SliceTree().add_slice("prod", cpu_weight=100)
+
+    def test_assign(self):
+        """Test that assigning a service sets its Slice= directive."""
+        tree = SliceTree()
+        service = Service("db")
+        tree.assign(service, "prod/db")
+
+        assert service.service_file.service.slice == "prod-db.slice"
+        assert "prod-db.slice" in tree.slices()
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_write(self, mock_run_command, _, mock_service_location):
+        """Test writing slices and services with a single daemon-reload."""
+        tree = SliceTree(ServiceLocation.TEST)
+        tree.add_slice("prod", description="Production", memory_max="16G")
+        tree.add_slice("prod/db", c_p_u_weight=1000)
+        tree.add_slice("batch", c_p_u_weight=20, i_o_weight=10)
+        for name, path in [("db", "prod/db"), ("report", "batch")]:
+            service = Service(name, service_location=ServiceLocation.TEST)
+            service.service_file.service.exec_start = f"/usr/bin/{name}"
+            tree.assign(service, path)
+
+        tree.write()
+
+        assert sorted(os.listdir(mock_service_location)) == [
+            "batch.slice",
+            "db.service",
+            "prod-db.slice",
+            "prod.slice",
+            "report.service",
+        ]
+        assert read_config(os.path.join(mock_service_location, "prod.slice")) == {
+            "Unit": {"Description": ["Production"]},
+            "Slice": {"MemoryMax": ["16G"]},
+        }
+        assert read_config(os.path.join(mock_service_location, "db.service"))[
+            "Service"
+        ]["Slice"] == ["prod-db.slice"]
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart db report"),
+        ]
+
+    @patch("service_config_foundry.service.run_command")
+    @patch.object(batch_module, "run_command")
+    def test_rewrite_slice_only_reloads(
+        self, mock_run_command, _, mock_service_location
+    ):
+        """Test that changing slice limits needs only a daemon-reload."""
+        tree = SliceTree(ServiceLocation.TEST)
+        service = Service("db", service_location=ServiceLocation.TEST)
+        service.service_file.service.exec_start = "/usr/bin/db"
+        tree.assign(service, "prod")
+        tree.write()
+        mock_run_command.reset_mock()
+
+        tree.add_slice("prod", memory_high="4G")
+        tree.write()
+
+        assert mock_run_command.call_args_list == [call("systemctl daemon-reload")]
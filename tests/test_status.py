@@ -0,0 +1,264 @@
+import asyncio
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation
+from service_config_foundry.status import (
+    StatusCache,
+    UnitStatus,
+    async_wait_for_state,
+    convert_property,
+    parse_show,
+    show_units,
+    status_many,
+    wait_for_state,
+)
+
+status_module = sys.modules[show_units.__module__]
+
+
+def show_output(*states):
+    """Build the output of `systemctl show` for units in the given states."""
+    stdout = "\n\n".join(
+        f"ActiveState={state}\nSubState={'running' if state == 'active' else 'dead'}"
+        for state in states
+    )
+    return subprocess.CompletedProcess("", 0, stdout=stdout + "\n", stderr="")
+
+
+class TestShowUnits:
+    """Test cases for reading unit properties in batches."""
+
+    def test_parse_show(self):
+        """Test that blocks are split on blank lines."""
+        output = "ActiveState=active\nMainPID=12\n\nActiveState=failed\nMainPID=0\n"
+        assert parse_show(output) == [
+            {"ActiveState": "active", "MainPID": "12"},
+            {"ActiveState": "failed", "MainPID": "0"},
+        ]
+
+    def test_parse_show_keeps_equals_in_values(self):
+        """Test that values containing '=' are kept whole."""
+        assert parse_show("Environment=A=1 B=2\n") == [{"Environment": "A=1 B=2"}]
+
+    @patch.object(status_module, "run_command")
+    def test_single_call_per_chunk(self, mock_run_command):
+        """Test that all units are read with one call."""
+        mock_run_command.return_value = show_output("active", "inactive")
+        states = show_units(["a.service", "b.service"])
+        mock_run_command.assert_called_once_with(
+            "systemctl show -p ActiveState,SubState a.service b.service",
+            use_sudo=False,
+        )
+        assert states["a.service"]["ActiveState"] == "active"
+        assert states["b.service"]["SubState"] == "dead"
+
+    @patch.object(status_module, "run_command")
+    def test_chunks_many_units(self, mock_run_command):
+        """Test that many units are split into chunked calls."""
+        mock_run_command.side_effect = lambda command, use_sudo: show_output(
+            *["active"] * (len(command.split()) - 4)
+        )
+        states = show_units([f"u{i}.service" for i in range(300)])
+        assert mock_run_command.call_count == 2
+        assert len(states) == 300
+
+    @patch.object(status_module, "run_command")
+    def test_unexpected_output(self, mock_run_command):
+        """Test that missing blocks raise a ValueError."""
+        mock_run_command.return_value = show_output("active")
+        with pytest.raises(ValueError, match="Unexpected systemctl show output"):
+            show_units(["a.service", "b.service"])
+
+
+class TestStatusMany:
+    """Test cases for typed, cached unit statuses."""
+
+    def test_convert_property(self):
+        """Test the conversion of property values."""
+        assert convert_property("1234") == 1234
+        assert convert_property("yes") is True
+        assert convert_property("no") is False
+        assert convert_property("[not set]") is None
+        assert convert_property("") is None
+        assert convert_property(str(2**64 - 1)) is None
+        assert convert_property("running") == "running"
+
+    def test_unit_status_attributes(self):
+        """Test that properties are available as snake_case attributes."""
+        status = UnitStatus(
+            "web.service",
+            {"ActiveState": "active", "MainPID": "42", "MemoryCurrent": "[not set]"},
+        )
+        assert status.active_state == "active"
+        assert status.main_p_i_d == 42
+        assert status.memory_current is None
+        assert status.is_active()
+
+    def test_reserved_attributes_are_kept(self):
+        """Test that properties cannot overwrite the record's own attributes."""
+        status = UnitStatus(
+            "backup.timer",
+            {"Unit": "backup.service", "ActiveState": "active", "Properties": "x"},
+        )
+        assert status.unit == "backup.timer"
+        assert status.properties["Unit"] == "backup.service"
+        assert status.properties["Properties"] == "x"
+        assert status.active_state == "active"
+
+    @patch.object(status_module, "run_command")
+    def test_timer_unit_property(self, mock_run_command):
+        """Test reading the Unit property of a timer through the cache."""
+        mock_run_command.return_value = subprocess.CompletedProcess(
+            "", 0, stdout="Unit=backup.service\nActiveState=active\n", stderr=""
+        )
+        cache = StatusCache(ttl=60)
+        properties = ("Unit", "ActiveState")
+        statuses = status_many(["backup.timer"], properties, cache=cache)
+        assert statuses["backup.timer"].unit == "backup.timer"
+        assert statuses["backup.timer"].properties["Unit"] == "backup.service"
+        assert cache.get("backup.timer", properties) is statuses["backup.timer"]
+        assert cache.get("backup.service", properties) is None
+
+    @patch.object(status_module, "run_command")
+    def test_single_call_for_all_units(self, mock_run_command):
+        """Test that all units are read with one call and typed."""
+        mock_run_command.return_value = subprocess.CompletedProcess(
+            "",
+            0,
+            stdout="ActiveState=active\nMainPID=12\n\n"
+            "ActiveState=failed\nMainPID=0\n",
+            stderr="",
+        )
+        statuses = status_many(
+            ["a.service", "b.service"], ["ActiveState", "MainPID"], cache=None
+        )
+        mock_run_command.assert_called_once_with(
+            "systemctl show -p ActiveState,MainPID a.service b.service",
+            use_sudo=False,
+        )
+        assert statuses["a.service"].main_p_i_d == 12
+        assert not statuses["b.service"].is_active()
+
+    @patch.object(status_module, "run_command")
+    def test_cache_reads_only_missing_units(self, mock_run_command):
+        """Test that cached units are not read again within the TTL."""
+        cache = StatusCache(ttl=60)
+        mock_run_command.return_value = show_output("active")
+        status_many(["a.service"], cache=cache)
+        mock_run_command.return_value = show_output("inactive")
+        statuses = status_many(["a.service", "b.service"], cache=cache)
+
+        assert mock_run_command.call_count == 2
+        assert mock_run_command.call_args[0][0].endswith(" b.service")
+        assert statuses["a.service"].active_state == "active"
+        assert statuses["b.service"].active_state == "inactive"
+        assert list(statuses) == ["a.service", "b.service"]
+
+    @patch.object(status_module, "run_command")
+    def test_cache_expires(self, mock_run_command):
+        """Test that expired entries are read again."""
+        cache = StatusCache(ttl=0)
+        mock_run_command.return_value = show_output("active")
+        status_many(["a.service"], cache=cache)
+        status_many(["a.service"], cache=cache)
+        assert mock_run_command.call_count == 2
+
+    @patch.object(status_module, "run_command")
+    def test_cache_is_per_property_set(self, mock_run_command):
+        """Test that other properties are not served from the cache."""
+        cache = StatusCache(ttl=60)
+        mock_run_command.return_value = show_output("active")
+        status_many(["a.service"], ["ActiveState", "SubState"], cache=cache)
+        status_many(["a.service"], ["ActiveState"], cache=cache)
+        assert mock_run_command.call_count == 2
+
+
+class TestWaitForState:
+    """Test cases for waiting until units reach a state."""
+
+    @patch.object(status_module.time, "sleep")
+    @patch.object(status_module, "run_command")
+    def test_polls_pending_units_only(self, mock_run_command, mock_sleep):
+        """Test that every tick polls the remaining units in one call."""
+        mock_run_command.side_effect = [
+            show_output("active", "activating"),
+            show_output("active"),
+        ]
+        assert wait_for_state(["a.service", "b.service"]) == []
+        assert mock_run_command.call_count == 2
+        assert mock_run_command.call_args[0][0].endswith(" b.service")
+        mock_sleep.assert_called_once_with(0.1)
+
+    @patch.object(status_module.time, "sleep")
+    @patch.object(status_module, "run_command")
+    def test_backoff(self, mock_run_command, mock_sleep):
+        """Test that the delay doubles up to the maximum interval."""
+        mock_run_command.side_effect = [show_output("activating")] * 5 + [
+            show_output("active")
+        ]
+        wait_for_state(["a.service"], interval=0.5, max_interval=2.0)
+        assert [args[0] for args, _ in mock_sleep.call_args_list] == [
+            0.5,
+            1.0,
+            2.0,
+            2.0,
+            2.0,
+        ]
+
+    @patch.object(status_module, "run_command")
+    def test_failed_units_stop_waiting(self, mock_run_command):
+        """Test that failed units are returned right away."""
+        mock_run_command.return_value = show_output("failed", "active")
+        assert wait_for_state(["a.service", "b.service"]) == ["a.service"]
+
+    @patch.object(status_module, "run_command")
+    def test_timeout(self, mock_run_command):
+        """Test that units still pending at the deadline are returned."""
+        mock_run_command.return_value = show_output("activating")
+        assert wait_for_state(["a.service"], timeout=0.05, interval=0.01) == [
+            "a.service"
+        ]
+
+    @patch.object(status_module, "run_command")
+    def test_wait_for_stop(self, mock_run_command):
+        """Test waiting for units to become inactive."""
+        mock_run_command.return_value = show_output("inactive")
+        assert wait_for_state(["a.service"], state="inactive") == []
+
+    @patch.object(status_module, "run_command")
+    def test_async_wait(self, mock_run_command):
+        """Test the asynchronous variant."""
+        mock_run_command.side_effect = [
+            show_output("activating"),
+            show_output("active"),
+        ]
+        result = asyncio.run(async_wait_for_state(["a.service"], interval=0.001))
+        assert result == []
+        assert mock_run_command.call_count == 2
+
+
+class TestServiceWaitUntil:
+    """Test cases for waiting on a service."""
+
+    @patch.object(status_module, "run_command")
+    def test_waits_for_started_units(self, mock_run_command, mock_service_location):
+        """Test that a service with a timer waits for the timer."""
+        mock_run_command.return_value = show_output("active")
+        service = Service("example", service_location=ServiceLocation.TEST)
+        service.service_file.service.exec_start = "/usr/bin/example"
+        service.timer_file.timer.on_calendar = "daily"
+        service.write()
+        assert service.wait_until() is True
+        assert mock_run_command.call_args[0][0].endswith(" example.timer")
+
+    @patch.object(status_module, "run_command")
+    def test_failed_service(self, mock_run_command):
+        """Test that a failed service returns False."""
+        mock_run_command.return_value = show_output("failed")
+        service = Service("example", service_location=ServiceLocation.TEST)
+        assert service.wait_until() is False
+        assert asyncio.run(service.async_wait_until()) is False
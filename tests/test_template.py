@@ -0,0 +1,134 @@
+import os
+import sys
+from unittest.mock import call, patch
+
+from service_config_foundry import File, FileType, ServiceLocation, TemplateService
+
+template_module = sys.modules[TemplateService.__module__]
+
+
+class TestTemplateServiceFiles:
+    """Test cases for template unit files."""
+
+    def test_template_file_names(self):
+        """Test that the template writes `name@.<type>` files."""
+        template = TemplateService("worker", service_location=ServiceLocation.TEST)
+        assert template.name == "worker@"
+        assert template.service_file._file_type.file_name(template.name) == (
+            "worker@.service"
+        )
+
+    def test_instance_name(self):
+        """Test generating instance unit names."""
+        template = TemplateService("worker")
+        assert template.instance_name(3) == "worker@3.service"
+        assert template.instance_name("eu", FileType.TIMER) == "worker@eu.timer"
+
+    @patch.object(template_module, "run_command")
+    def test_create_writes_single_file(self, mock_run_command, mock_service_location):
+        """Test that many instances share one template file."""
+        with patch("service_config_foundry.service.run_command"):
+            template = TemplateService(
+                "worker",
+                instances=range(1, 65),
+                service_location=ServiceLocation.TEST,
+            )
+            template.service_file.service.exec_start = "/usr/bin/worker %i"
+            template.create()
+
+        assert os.listdir(mock_service_location) == ["worker@.service"]
+        # One batched restart covers all 64 instances.
+        mock_run_command.assert_called_once()
+        command = mock_run_command.call_args.args[0]
+        assert command.startswith("systemctl restart worker@1.service ")
+        assert command.endswith(" worker@64.service")
+
+
+class TestTemplateServiceLifecycle:
+    """Test cases for batched instance lifecycle operations."""
+
+    @patch.object(template_module, "run_command")
+    def test_start_instances_in_chunks(self, mock_run_command):
+        """Test that instances are started in chunked systemctl calls."""
+        template = TemplateService("worker", instances=range(600))
+        template.start_instances()
+        assert mock_run_command.call_count == 3
+        assert all(
+            c.args[0].startswith("systemctl start ")
+            for c in mock_run_command.call_args_list
+        )
+        assert (
+            sum(len(c.args[0].split()) - 2 for c in mock_run_command.call_args_list)
+            == 600
+        )
+
+    @patch.object(template_module, "run_command")
+    def test_stop_selected_instances(self, mock_run_command):
+        """Test stopping an explicit set of instances."""
+        template = TemplateService("worker", instances=range(10))
+        template.stop_instances([1, 2])
+        mock_run_command.assert_called_once_with(
+            "systemctl stop worker@1.service worker@2.service"
+        )
+
+    @patch("os.path.exists", return_value=True)
+    @patch.object(template_module, "run_command")
+    def test_enable_instances_with_timer(self, mock_run_command, mock_exists):
+        """Test that timer instances are enabled together with services."""
+        template = TemplateService("worker", instances=[1, 2])
+        template.enable_service_at_startup()
+        mock_run_command.assert_called_once_with(
+            "systemctl enable worker@1.service worker@2.service "
+            "worker@1.timer worker@2.timer"
+        )
+
+    @patch("os.path.exists", return_value=True)
+    @patch.object(template_module, "run_command")
+    def test_start_service_restarts_timers(self, mock_run_command, mock_exists):
+        """Test that a timer-driven template restarts its timer instances."""
+        template = TemplateService("worker", instances=[1, 2])
+        template.start_service()
+        mock_run_command.assert_called_once_with(
+            "systemctl restart worker@1.timer worker@2.timer"
+        )
+
+
+class TestTemplateServiceOverrides:
+    """Test cases for per-instance drop-in overrides."""
+
+    @patch.object(template_module, "run_command")
+    def test_override_instances(self, mock_run_command, mock_service_location):
+        """Test that overrides are drop-ins and only affected instances restart."""
+        template = TemplateService(
+            "worker", instances=range(4), service_location=ServiceLocation.TEST
+        )
+        pinned = File(FileType.SERVICE)
+        pinned.service.c_p_u_affinity = "2"
+        described = File(FileType.SERVICE)
+        described.unit.description = "Worker 3"
+
+        template.override_instances({2: pinned, 3: described})
+
+        path = os.path.join(
+            mock_service_location, "worker@2.service.d", "override.conf"
+        )
+        with open(path) as f:
+            assert f.read() == "[Service]\nCPUAffinity=2\n\n"
+        assert mock_run_command.call_args_list == [
+            call("systemctl daemon-reload"),
+            call("systemctl restart worker@2.service"),
+        ]
+
+    @patch.object(template_module, "run_command")
+    def test_unchanged_override_is_skipped(
+        self, mock_run_command, mock_service_location
+    ):
+        """Test that rewriting an identical override does nothing."""
+        template = TemplateService("worker", service_location=ServiceLocation.TEST)
+        override = File(FileType.SERVICE)
+        override.service.nice = "5"
+        template.override_instances({1: override})
+        mock_run_command.reset_mock()
+
+        template.override_instances({1: override})
+        mock_run_command.assert_not_called()
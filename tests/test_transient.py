@@ -0,0 +1,169 @@
+import shlex
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from service_config_foundry import Service, ServiceLocation
+from service_config_foundry.transient import run_transient, transient_command
+
+transient_module = sys.modules[run_transient.__module__]
+
+
+def make_job(name, **options):
+    service = Service(name, **options)
+    service.service_file.service.exec_start = f"/usr/bin/{name} --once"
+    return service
+
+
+class TestTransientCommand:
+    """Test cases for building systemd-run commands."""
+
+    def test_service_properties(self):
+        """Test that [Unit] and [Service] become inline properties."""
+        job = make_job("backup")
+        job.service_file.unit.description = "Nightly backup"
+        job.service_file.service.environment = ["MODE=full", "TARGET=/srv b"]
+        job.service_file.install.wanted_by = "multi-user.target"
+        assert transient_command(job) == (
+            "systemd-run --unit=backup --collect --no-block "
+            "'--description=Nightly backup' --property=Environment=MODE=full "
+            "'--property=Environment=TARGET=/srv b' -- /usr/bin/backup --once",
+            True,
+        )
+
+    def test_timer(self):
+        """Test that a configured timer makes the unit timer-driven."""
+        job = make_job("backup")
+        job.timer_file.timer.on_calendar = "daily"
+        job.timer_file.timer.randomized_delay_sec = "5m"
+        command, _ = transient_command(job)
+        assert "--on-calendar=daily --timer-property=RandomizedDelaySec=5m" in command
+
+    def test_scope(self):
+        """Test that a scope runs the command with [Scope] properties."""
+        job = make_job("build")
+        job.scope_file.scope.memory_max = "2G"
+        job.scope_file.scope.slice = "batch.slice"
+        command, _ = transient_command(job, scope=True, command="make -j8")
+        assert command == (
+            "systemd-run --unit=build --collect --scope "
+            "--property=Slice=batch.slice --property=MemoryMax=2G -- make -j8"
+        )
+
+    def test_shell_syntax_is_not_interpreted(self):
+        """Test that shell metacharacters reach the unit as literal arguments."""
+        job = Service("backup")
+        job.service_file.service.exec_start = (
+            "/usr/bin/backup --pid $MAINPID > /tmp/out; echo done"
+        )
+        command, _ = transient_command(job)
+        assert command.endswith(
+            "-- /usr/bin/backup --pid '$MAINPID' '>' '/tmp/out;' echo done"
+        )
+        assert shlex.split(command)[-7:] == [
+            "/usr/bin/backup",
+            "--pid",
+            "$MAINPID",
+            ">",
+            "/tmp/out;",
+            "echo",
+            "done",
+        ]
+
+    def test_quoted_arguments(self):
+        """Test that quoted arguments of the command stay whole."""
+        command, _ = transient_command(
+            make_job("report"), command="/bin/sh -c 'echo \"a b\"'"
+        )
+        assert shlex.split(command)[-3:] == ["/bin/sh", "-c", 'echo "a b"']
+
+    def test_user_units(self):
+        """Test that user services run with --user and without sudo."""
+        job = make_job("sync", service_location=ServiceLocation.USER)
+        command, use_sudo = transient_command(job)
+        assert "--user" in command
+        assert use_sudo is False
+
+    def test_requires_one_command(self):
+        """Test that a unit without a single command is rejected."""
+        with pytest.raises(ValueError, match="needs exactly one command"):
+            transient_command(Service("empty"))
+
+        job = make_job("multi")
+        job.service_file.service.exec_start = ["/bin/a", "/bin/b"]
+        with pytest.raises(ValueError, match="needs exactly one command"):
+            transient_command(job)
+
+
+class TestRunTransient:
+    """Test cases for launching transient units."""
+
+    @patch.object(transient_module.subprocess, "Popen")
+    def test_batched_launch(self, mock_popen):
+        """Test that every job is launched without writing files."""
+        mock_popen.return_value.returncode = 0
+        jobs = [make_job(f"job-{i}") for i in range(5)]
+        results = run_transient(jobs)
+        assert list(results) == [f"job-{i}" for i in range(5)]
+        commands = [args[0] for args, _ in mock_popen.call_args_list]
+        assert all(
+            command.startswith("sudo systemd-run --unit=job-") for command in commands
+        )
+        assert not any("daemon-reload" in command for command in commands)
+        assert all(
+            kwargs["start_new_session"] and "preexec_fn" not in kwargs
+            for _, kwargs in mock_popen.call_args_list
+        )
+
+    @patch.object(transient_module.subprocess, "Popen")
+    def test_invalid_job_launches_nothing(self, mock_popen):
+        """Test that all commands are validated before launching."""
+        with pytest.raises(ValueError):
+            run_transient([make_job("good"), Service("bad")])
+        mock_popen.assert_not_called()
+
+    @patch.object(transient_module.subprocess, "Popen")
+    def test_launches_are_bounded(self, mock_popen):
+        """Test that no more than max_processes run at once."""
+        running = []
+
+        def popen(command, **_):
+            process = MagicMock(returncode=0)
+            process.wait.side_effect = lambda: running.remove(process)
+            running.append(process)
+            assert len(running) <= 2
+            return process
+
+        mock_popen.side_effect = popen
+        results = run_transient(
+            [make_job(f"job-{i}") for i in range(5)], max_processes=2
+        )
+        assert len(results) == 5
+        assert not running
+
+    def test_output_is_collected(self):
+        """Test that the output of the launched commands is returned."""
+        with patch.object(
+            transient_module,
+            "transient_command",
+            side_effect=lambda service, *_: (
+                f"echo {service.name}; echo oops >&2",
+                False,
+            ),
+        ):
+            results = run_transient([make_job("a"), make_job("b")])
+
+        assert results["a"].returncode == 0
+        assert results["a"].stdout == "a\n"
+        assert results["b"].stderr == "oops\n"
+
+    @patch.object(transient_module.subprocess, "Popen")
+    def test_service_run_transient(self, mock_popen):
+        """Test launching a single service as a scope."""
+        mock_popen.return_value.returncode = 0
+        result = make_job("build").run_transient(scope=True)
+        assert result.returncode == 0
+        assert mock_popen.call_args.args[0] == (
+            "sudo systemd-run --unit=build --collect --scope -- /usr/bin/build --once"
+        )
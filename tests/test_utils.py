@@ -4,6 +4,7 @@ from service_config_foundry.utils import (
     convert_to_camel_case,
     convert_to_snake_case,
     merge_dicts,
+    normalize_values,
     run_command,
 )
 
@@ -113,6 +114,23 @@ class TestMergeDicts:
         assert result == {}
 
 
+class TestNormalizeValues:
+    """Test cases for normalize_values function."""
+
+    def test_none(self):
+        """Test that None normalizes to an empty list."""
+        assert normalize_values(None) == []
+
+    def test_scalar(self):
+        """Test that a scalar becomes a single-element list."""
+        assert normalize_values(5) == ["5"]
+
+    def test_booleans_lowercased(self):
+        """Test that booleans are lowercased, including inside lists."""
+        assert normalize_values(True) == ["true"]
+        assert normalize_values([False, "a"]) == ["false", "a"]
+
+
 class TestRunCommand:
     """Test cases for run_command function."""
 